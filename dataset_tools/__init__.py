@@ -0,0 +1,6 @@
+"""
+데이터셋 제작 스크립트들이 함께 쓰는 공용 모듈 모음.
+
+각 스크립트는 폴더 이름에 공백/한글이 있어 패키지로 import할 수 없으므로,
+저장소 루트를 sys.path에 추가한 뒤 `from dataset_tools.<모듈> import ...` 형태로 사용합니다.
+"""
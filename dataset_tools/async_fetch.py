@@ -0,0 +1,102 @@
+"""
+공유 커넥션 풀을 쓰는 비동기 HTTP 페처 (httpx).
+
+- 동시에 진행하는 요청 수를 semaphore로 제한
+- 호스트별 토큰 버킷으로 초당 요청 수 제한
+- 연결 오류/429/5xx는 지수 백오프(+Retry-After)로 재시도
+- cache(dataset_tools.http_cache.CachedSession)를 주면 직렬 크롤러와 같은 디스크 캐시를 거침
+  (캐시에서 돌려준 응답은 requests.Response, content/headers/status_code는 httpx.Response와 같게 쓸 수 있음)
+
+    async with AsyncFetcher(concurrency=8, rate=4.0) as fetcher:
+        r = await fetcher.get(url, params={"dataId": "123"})
+"""
+
+import asyncio
+import random
+
+import httpx
+
+from dataset_tools.ratelimit import HostRateLimiter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class AsyncFetcher:
+    def __init__(self, concurrency=8, rate=None, burst=1, retries=3, backoff=1.0, headers=None, timeout=20,
+                 cache=None):
+        """
+        Args:
+            concurrency (int): 동시에 진행할 최대 요청 수 (커넥션 풀 크기도 같음)
+            rate (float): 호스트당 초당 최대 요청 수 (None이면 제한 없음)
+            burst (int): 토큰 버킷 최대 크기
+            retries (int): 실패 시 재시도 횟수
+            backoff (float): 첫 재시도 대기 시간(초). 재시도마다 두 배
+            headers (dict): 모든 요청에 붙일 헤더
+            timeout (float): 기본 요청 타임아웃(초)
+            cache (CachedSession): 주면 이 세션의 디스크 캐시를 같이 씀 (cache_dir가 없는 세션이면 무시)
+        """
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = HostRateLimiter(rate, burst)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            headers=dict(headers or {}),
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.retry_count = 0
+        self.cache = cache if cache is not None and cache.cache_dir is not None else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+
+    async def get(self, url, params=None, headers=None, timeout=None):
+        """
+        GET 요청을 보내고 httpx.Response를 반환합니다.
+        재시도할 수 없는 상태 코드(404 등)는 그대로 돌려주고,
+        재시도를 모두 소진하면 마지막 예외(httpx.HTTPError)를 발생시킵니다.
+        cache가 있으면 캐시 응답을 먼저 확인하고, 네트워크 응답은 캐시에 반영한 뒤 돌려줍니다.
+        """
+        if self.cache is None:
+            return await self._fetch(url, params, headers, timeout)
+        cached, headers, pending = self.cache.lookup(url, params, headers)
+        if cached is not None:
+            return cached
+        return self.cache.settle(pending, await self._fetch(url, params, headers, timeout))
+
+    async def _fetch(self, url, params, headers, timeout):
+        kwargs = {"params": params, "headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire(url)
+            try:
+                async with self._semaphore:
+                    response = await self._client.get(url, **kwargs)
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                if attempt == self.retries:
+                    response.raise_for_status()
+                delay = self._retry_delay(attempt, response)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            self.retry_count += 1
+            await asyncio.sleep(delay)
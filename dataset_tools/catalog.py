@@ -0,0 +1,213 @@
+"""
+모든 원본 문서의 메타데이터를 한곳에 모으는 SQLite 카탈로그.
+
+추출 스크립트(NIKL 텍스트 추출.py, 세종 xml2txt.py, 고문서 txt 추출.py)가 --catalog로 문서를 처리하면서 행을 남기므로,
+시기/연도/출처/길이로 거르거나 데이터셋을 만들 때 XML을 다시 파싱하거나 텍스트를 다시 읽지 않고 카탈로그만 조회하면 됩니다.
+시기 구분 규칙은 컬렉션마다 다르므로(세종 1592년 이하, NIKL 1591년 이하, 고문서 1592년 미만이 중세국어)
+배정된 시기와 함께 원본에서 읽은 연도를 모두 남깁니다.
+
+행 (FIELDS) - (collection, source, kind)마다 한 행:
+    collection   출처 컬렉션 (NIKL, 세종 한글 고전, 고문서)
+    source       컬렉션 안의 문서 ID (dataset_tools.corpus_pack의 source와 같음)
+    kind         문서 안의 종류 (언해/번역문, 원문/번역, 없으면 "")
+    path         원본 위치 (XML 파일 경로, 편지 URL)
+    title        제목
+    years        원본에서 읽은 연도 전체 (JSON 배열)
+    year         시기를 정할 때 쓴 연도 (없으면 null)
+    period       배정된 시기 (중세국어/근대국어, 범위 밖이면 null)
+    parts        텍스트 조각 수 (NIKL 문장 그룹 수, 세종 원문·언해/번역문 조각 수 등)
+    chars        글자 수 (조각 사이 구분자 포함)
+    jamo         첫가끝 자모 수
+    tokens       tiktoken 토큰 수 (조각별 합, 세지 않았으면 null)
+    sha256       조각을 구분자로 이은 텍스트의 해시 (txt 파일로 쓰는 문서는 파일 내용의 해시)
+
+    with Catalog("catalog.sqlite") as catalog:
+        stats = TextStats()
+        for text in texts:
+            stats.add(text)
+        catalog.put({"collection": "NIKL", "source": "HXRW2320000001", "year": 1876, "period": "근대국어",
+                     "years": [1876], **stats.values()})
+    for row in read_catalog("catalog.sqlite", period="중세국어", max_year=1500):
+        row["source"], row["chars"]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+
+FIELDS = ("collection", "source", "kind", "path", "title", "years", "year", "period",
+          "parts", "chars", "jamo", "tokens", "sha256")
+
+_COLUMNS = ", ".join(FIELDS)
+_CREATE = ("CREATE TABLE IF NOT EXISTS documents (collection TEXT NOT NULL, source TEXT NOT NULL, "
+           "kind TEXT NOT NULL DEFAULT '', path TEXT, title TEXT, years TEXT, year INTEGER, period TEXT, "
+           "parts INTEGER, chars INTEGER, jamo INTEGER, tokens INTEGER, sha256 TEXT, "
+           "PRIMARY KEY (collection, source, kind))")
+_INDEXES = ("CREATE INDEX IF NOT EXISTS documents_period_year ON documents (period, year)",
+            "CREATE INDEX IF NOT EXISTS documents_sha256 ON documents (sha256)")
+
+# 첫가끝 자모 (초성/중성/종성과 확장 A/B 구간). 한 글자가 자모 여러 개이므로 이어진 자모를 한 번에 찾아 길이를 더함
+JAMO_RE = re.compile("[\u1100-\u11ff\ua960-\ua97f\ud7b0-\ud7ff]+")
+# 이만큼 put할 때마다 커밋 (크롤러처럼 오래 도는 작업이 멈춰도 그때까지의 행은 남음)
+COMMIT_EVERY = 100
+
+
+class TextStats:
+    """문서 하나의 텍스트 조각을 차례로 받아 parts/chars/jamo/tokens/sha256을 셉니다 (텍스트는 들고 있지 않음)."""
+
+    def __init__(self, separator="\n\n", count_tokens=None):
+        """
+        Args:
+            separator (str): 조각을 이을 때 쓰는 구분자 (txt 파일로 쓸 때와 같게)
+            count_tokens: 텍스트 -> 토큰 수 함수 (None이면 tokens는 null)
+        """
+        self.separator = separator
+        self.count_tokens = count_tokens
+        self.parts = 0
+        self.chars = 0
+        self.jamo = 0
+        self.tokens = 0 if count_tokens else None
+        self._hash = hashlib.sha256()
+
+    def add(self, text):
+        if self.parts:
+            self._hash.update(self.separator.encode("utf-8"))
+            self.chars += len(self.separator)
+        self._hash.update(text.encode("utf-8"))
+        self.parts += 1
+        self.chars += len(text)
+        self.jamo += sum(map(len, JAMO_RE.findall(text)))
+        if self.count_tokens:
+            self.tokens += self.count_tokens(text)
+
+    def values(self):
+        return {"parts": self.parts, "chars": self.chars, "jamo": self.jamo, "tokens": self.tokens,
+                "sha256": self._hash.hexdigest()}
+
+
+def text_stats(texts, separator="\n\n", count_tokens=None):
+    """TextStats에 texts를 모두 넣은 결과 (dict)"""
+    stats = TextStats(separator, count_tokens)
+    for text in texts:
+        stats.add(text)
+    return stats.values()
+
+
+def token_counter(enabled):
+    """enabled면 dataset_tools.token_counts.count_tokens (tiktoken은 쓸 때만 불러옴), 아니면 None"""
+    if not enabled:
+        return None
+    from dataset_tools.token_counts import count_tokens
+    return count_tokens
+
+
+class Catalog:
+    def __init__(self, path, commit_every=COMMIT_EVERY):
+        """
+        Args:
+            path (str): SQLite 파일 (없으면 만듦). 같은 (collection, source, kind) 행은 덮어씀
+            commit_every (int): put 몇 번마다 커밋할지 (close할 때도 커밋)
+        """
+        self.path = os.fspath(path)
+        self.commit_every = commit_every
+        self.count = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(_CREATE)
+        for index in _INDEXES:
+            self._db.execute(index)
+        self._db.commit()
+
+    def put(self, record):
+        """행 하나를 저장합니다 (FIELDS에 없는 키는 버리고, 없는 필드는 null, years는 JSON 배열로)."""
+        values = dict.fromkeys(FIELDS)
+        values.update((k, v) for k, v in record.items() if k in values)
+        values["kind"] = values["kind"] or ""
+        values["years"] = json.dumps(sorted(set(values["years"] or ())))
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO documents ({_COLUMNS}) VALUES ({', '.join('?' * len(FIELDS))})",
+                             [values[f] for f in FIELDS])
+            self.count += 1
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._db.commit()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_catalog(path, collection=None, period=None, kind=None, min_year=None, max_year=None):
+    """
+    카탈로그 행을 dict로 냅니다 (years는 목록, kind가 없으면 None).
+
+    Args:
+        path (str): Catalog 파일
+        collection / period / kind (str): 주면 그 값인 행만
+        min_year / max_year (int): 주면 year가 이 범위(양 끝 포함)인 행만 (year가 없는 행은 빠짐)
+    """
+    conditions, params = [], []
+    for field, value in (("collection", collection), ("period", period), ("kind", kind)):
+        if value is not None:
+            conditions.append(f"{field} = ?")
+            params.append(value)
+    if min_year is not None:
+        conditions.append("year >= ?")
+        params.append(min_year)
+    if max_year is not None:
+        conditions.append("year <= ?")
+        params.append(max_year)
+    query = f"SELECT {_COLUMNS} FROM documents"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    db = sqlite3.connect(path)
+    try:
+        for row in db.execute(query + " ORDER BY collection, source, kind", params):
+            record = dict(zip(FIELDS, row))
+            record["years"] = json.loads(record["years"]) if record["years"] else []
+            record["kind"] = record["kind"] or None
+            yield record
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카탈로그 요약: 컬렉션/시기/종류별 문서 수와 글자·자모·토큰 수")
+    parser.add_argument("catalog", help="Catalog SQLite 파일")
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--period", default=None)
+    parser.add_argument("--min-year", type=int, default=None)
+    parser.add_argument("--max-year", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = {}
+    for row in read_catalog(args.catalog, args.collection, args.period, None, args.min_year, args.max_year):
+        key = (row["collection"], row["period"] or "-", row["kind"] or "-")
+        totals = summary.setdefault(key, {"documents": 0, "chars": 0, "jamo": 0, "tokens": 0})
+        totals["documents"] += 1
+        for field in ("chars", "jamo", "tokens"):
+            totals[field] += row[field] or 0
+    print(f"{'컬렉션':<12} {'시기':<6} {'종류':<6} {'문서':>8} {'글자':>14} {'자모':>14} {'토큰':>12}")
+    for (collection, period, kind), totals in sorted(summary.items()):
+        print(f"{collection:<12} {period:<6} {kind:<6} {totals['documents']:>8,} {totals['chars']:>14,} "
+              f"{totals['jamo']:>14,} {totals['tokens']:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+{"messages": [{"role": ..., "content": ...}]} 형식 채팅 JSONL 레코드용 타입 레이어.
+
+- msgspec이 설치되어 있으면 msgspec.Struct로 바로 디코딩하면서 스키마를 검증합니다.
+- 없으면 orjson(없으면 표준 json)으로 파싱한 뒤 slots dataclass로 변환하며 같은 검증을 합니다.
+- 인코딩은 중간 dict 없이 레코드에서 바로 UTF-8 바이트를 만듭니다.
+
+    from dataset_tools.chat_records import read_records, write_records
+
+    records = list(read_records("train.jsonl"))
+    write_records("copy.jsonl", records)
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+ROLES = ("system", "user", "assistant", "function")
+
+
+class RecordError(ValueError):
+    """JSON 파싱 또는 스키마 검증에 실패한 레코드."""
+
+
+def _check_record(record):
+    """디코딩 후에만 확인할 수 있는 레코드 단위 규칙을 검사합니다."""
+    if not any(message.role == "assistant" for message in record.messages):
+        raise RecordError("assistant 메시지가 없습니다")
+    return record
+
+
+try:
+    import msgspec
+    from typing import Annotated, Literal
+
+    BACKEND = "msgspec"
+
+    class Message(msgspec.Struct, forbid_unknown_fields=True, omit_defaults=True):
+        role: Literal["system", "user", "assistant", "function"]
+        content: Annotated[str, msgspec.Meta(min_length=1)]
+        name: Optional[str] = None
+        weight: Optional[int] = None
+
+    class ChatRecord(msgspec.Struct):
+        messages: Annotated[List[Message], msgspec.Meta(min_length=1)]
+
+    _decoder = msgspec.json.Decoder(ChatRecord)
+    _encoder = msgspec.json.Encoder()
+
+    def decode_record(line):
+        """JSONL 한 줄(str 또는 bytes)을 ChatRecord로 디코딩합니다."""
+        try:
+            record = _decoder.decode(line)
+        except (msgspec.DecodeError, ValueError) as e:  # ValidationError, 잘못된 UTF-8(UnicodeDecodeError) 포함
+            raise RecordError(str(e)) from None
+        return _check_record(record)
+
+    def encode_record(record) -> bytes:
+        """ChatRecord를 줄바꿈 없는 JSON 바이트로 인코딩합니다."""
+        return _encoder.encode(record)
+
+except ImportError:
+    import json
+
+    try:
+        import orjson
+
+        BACKEND = "orjson"
+        _loads = orjson.loads
+        _JSONError = orjson.JSONDecodeError
+    except ImportError:
+        BACKEND = "json"
+        _loads = json.loads
+        _JSONError = json.JSONDecodeError
+
+    @dataclass(slots=True)
+    class Message:
+        role: str
+        content: str
+        name: Optional[str] = None
+        weight: Optional[int] = None
+
+    @dataclass(slots=True)
+    class ChatRecord:
+        messages: List[Message]
+
+    _MESSAGE_KEYS = frozenset(("role", "content", "name", "weight"))
+
+    def _message_from_obj(obj, index):
+        where = f"$.messages[{index}]"
+        if not isinstance(obj, dict):
+            raise RecordError(f"Expected `object` - at `{where}`")
+        unknown = obj.keys() - _MESSAGE_KEYS
+        if unknown:
+            raise RecordError(f"Object contains unknown field `{sorted(unknown)[0]}` - at `{where}`")
+        role = obj.get("role")
+        if role not in ROLES:
+            raise RecordError(f"Invalid enum value {role!r} - at `{where}.role`")
+        content = obj.get("content")
+        if not isinstance(content, str) or not content:
+            raise RecordError(f"Expected non-empty `str` - at `{where}.content`")
+        name = obj.get("name")
+        if name is not None and not isinstance(name, str):
+            raise RecordError(f"Expected `str | null` - at `{where}.name`")
+        weight = obj.get("weight")
+        if weight is not None and (not isinstance(weight, int) or isinstance(weight, bool)):
+            raise RecordError(f"Expected `int | null` - at `{where}.weight`")
+        return Message(role, content, name, weight)
+
+    def decode_record(line):
+        """JSONL 한 줄(str 또는 bytes)을 ChatRecord로 디코딩합니다."""
+        try:
+            obj = _loads(line)
+        except (_JSONError, ValueError) as e:  # 잘못된 UTF-8(UnicodeDecodeError) 포함
+            raise RecordError(str(e)) from None
+        if not isinstance(obj, dict):
+            raise RecordError("Expected `object` - at `$`")
+        messages = obj.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise RecordError("Expected non-empty `array` - at `$.messages`")
+        record = ChatRecord([_message_from_obj(m, i) for i, m in enumerate(messages)])
+        return _check_record(record)
+
+    def _dumps(value):
+        return json.dumps(value, ensure_ascii=False)
+
+    def encode_record(record) -> bytes:
+        """ChatRecord를 줄바꿈 없는 JSON 바이트로 인코딩합니다."""
+        parts = []
+        for m in record.messages:
+            s = '{"role":' + _dumps(m.role) + ',"content":' + _dumps(m.content)
+            if m.name is not None:
+                s += ',"name":' + _dumps(m.name)
+            if m.weight is not None:
+                s += ',"weight":' + str(m.weight)
+            parts.append(s + "}")
+        return ('{"messages":[' + ",".join(parts) + "]}").encode("utf-8")
+
+
+def translation_record(source_lang, target_lang, source_text, target_text):
+    """번역 방향 system 프롬프트가 붙은 user/assistant 한 쌍의 레코드를 만듭니다."""
+    return ChatRecord([
+        Message("system", f"사용자의 입력을 {source_lang}에서 {target_lang}로 번역해줘."),
+        Message("user", source_text),
+        Message("assistant", target_text),
+    ])
+
+
+def message_content(record, role):
+    """레코드에서 주어진 role의 첫 메시지 내용을 반환합니다. 없으면 빈 문자열."""
+    for message in record.messages:
+        if message.role == role:
+            return message.content
+    return ""
+
+
+def read_records(path, on_error=None) -> Iterator[ChatRecord]:
+    """
+    JSONL 파일에서 ChatRecord를 차례로 읽습니다.
+
+    Args:
+        path: 입력 JSONL 파일 경로.
+        on_error: 잘못된 줄을 만났을 때 호출할 함수 (line_num, line, error).
+                  None이면 RecordError를 그대로 발생시킵니다.
+    """
+    with open(path, "rb") as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield decode_record(line)
+            except RecordError as e:
+                if on_error is None:
+                    raise RecordError(f"{path}:{line_num}: {e}") from None
+                on_error(line_num, line, e)
+
+
+def write_records(path, records: Iterable[ChatRecord]) -> int:
+    """ChatRecord들을 JSONL 파일로 기록하고 기록한 줄 수를 반환합니다."""
+    count = 0
+    with open(path, "wb") as f:
+        for record in records:
+            f.write(encode_record(record) + b"\n")
+            count += 1
+    return count
@@ -0,0 +1,203 @@
+"""
+작은 txt 파일 수만 개 대신 말뭉치 텍스트를 파일 두 개로 묶어 저장하는 컨테이너.
+
+폴더 구성:
+    texts.bin     모든 텍스트를 UTF-8로 이어 붙인 데이터
+    index.jsonl   항목마다 한 줄: FIELDS와 texts.bin 안의 바이트 위치(offset, length)
+
+항목 필드 (FIELDS):
+    source   원본 문서 ID (NIKL 파일명, 세종 XML 상대 경로, 고문서 dataId 등)
+    part     문서 안의 번호 (NIKL _partNNN, 나머지는 1)
+    kind     같은 문서 안의 종류 (언해/번역문, 원문/번역 등, 없으면 null)
+    period   중세국어/근대국어
+    year     연도 (없으면 null)
+
+- 텍스트를 texts.bin에 쓴 뒤 index.jsonl에 줄을 더하므로, 중간에 멈춰도 그때까지의 항목은 읽힘
+  (잘린 줄이나 texts.bin 밖을 가리키는 줄은 건너뜀)
+- mode="w"는 임시 파일에 새로 써서 close할 때 바꿔 넣고, mode="a"는 기존 팩 뒤에 이어 씀
+- 같은 (source, part, kind)가 여러 번 나오면 마지막 항목이 유효
+- 순회는 texts.bin을 앞에서부터 한 번 읽고, pack[i] / pack.get(...)은 그 위치만 읽음
+
+    with CorpusPackWriter("nikl_pack") as writer:
+        writer.add("HXRW2320000001", 1, text, period="근대국어", year=1876)
+    with CorpusPack("nikl_pack") as pack:
+        for entry in pack.iter(period="중세국어"):
+            entry.source, entry.part, entry.text
+        pack.get("HXRW2320000001", 1).text
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+
+FIELDS = ("source", "part", "kind", "period", "year")
+DATA_FILE = "texts.bin"
+INDEX_FILE = "index.jsonl"
+# 순회할 때 texts.bin을 읽는 버퍼 크기
+READ_BUFFER = 1024 * 1024
+
+
+@dataclass(slots=True)
+class Entry:
+    source: str
+    part: int
+    kind: str | None
+    period: str | None
+    year: int | None
+    text: str
+
+
+def is_pack(path):
+    return os.path.isfile(os.path.join(path, INDEX_FILE)) and os.path.isfile(os.path.join(path, DATA_FILE))
+
+
+class CorpusPackWriter:
+    def __init__(self, path, mode="w"):
+        """
+        Args:
+            path (str): 팩 폴더 (없으면 만듦)
+            mode (str): "w"면 새로 쓰고(close할 때 기존 팩을 바꿈), "a"면 기존 팩 뒤에 이어 씀
+        """
+        if mode not in ("w", "a"):
+            raise ValueError(f"mode must be 'w' or 'a', not {mode!r}")
+        self.path = os.fspath(path)
+        self.mode = mode
+        self.count = 0
+        self.keys = set()  # 팩에 있는 (source, part, kind) (mode="a"면 기존 항목 포함)
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        data_path, index_path = os.path.join(self.path, DATA_FILE), os.path.join(self.path, INDEX_FILE)
+        if mode == "w":
+            self._tmp_data, self._tmp_index = data_path + ".tmp", index_path + ".tmp"
+            self._data = open(self._tmp_data, "wb")
+            self._index = open(self._tmp_index, "w", encoding="utf-8")
+        else:
+            if is_pack(self.path):
+                size = os.path.getsize(data_path)
+                self.keys = {(r["source"], r["part"], r["kind"]) for r in _read_index(self.path, size)}
+            self._tmp_data = self._tmp_index = None
+            self._data = open(data_path, "ab")
+            self._index = open(index_path, "a", encoding="utf-8")
+        self._offset = self._data.seek(0, os.SEEK_END)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def add(self, source, part, text, kind=None, period=None, year=None):
+        """텍스트 하나를 항목으로 추가합니다."""
+        data = text.encode("utf-8")
+        with self._lock:
+            self._data.write(data)
+            record = {"source": source, "part": part, "kind": kind, "period": period, "year": year,
+                      "offset": self._offset, "length": len(data)}
+            self._index.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._offset += len(data)
+            self.count += 1
+            self.keys.add((source, part, kind))
+            if self.mode == "a":
+                self._data.flush()
+                self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+        if self._tmp_data is not None:
+            os.replace(self._tmp_data, os.path.join(self.path, DATA_FILE))
+            os.replace(self._tmp_index, os.path.join(self.path, INDEX_FILE))
+            self._tmp_data = self._tmp_index = None
+
+    def discard(self):
+        """mode="w"로 쓰던 내용을 버리고 기존 팩은 그대로 둡니다 (mode="a"는 이미 쓴 항목이 남음)."""
+        self._data.close()
+        self._index.close()
+        for tmp_path in (self._tmp_data, self._tmp_index):
+            if tmp_path is not None:
+                os.remove(tmp_path)
+        self._tmp_data = self._tmp_index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _read_index(path, data_size):
+    """(source, part, kind)별 마지막 항목을 처음 나온 순서대로 (잘린 줄, 데이터 밖을 가리키는 줄은 건너뜀)"""
+    entries = {}
+    with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                end = record["offset"] + record["length"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if end <= data_size:
+                entries[(record["source"], record["part"], record["kind"])] = record
+    return list(entries.values())
+
+
+class CorpusPack:
+    def __init__(self, path):
+        """
+        Args:
+            path (str): CorpusPackWriter로 만든 팩 폴더
+        """
+        self.path = os.fspath(path)
+        self._data = open(os.path.join(self.path, DATA_FILE), "rb")
+        self.records = _read_index(self.path, os.fstat(self._data.fileno()).st_size)
+        self._keys = {(r["source"], r["part"], r["kind"]): i for i, r in enumerate(self.records)}
+
+    def __len__(self):
+        return len(self.records)
+
+    def _entry(self, record, data):
+        return Entry(*(record[f] for f in FIELDS), data.decode("utf-8"))
+
+    def __getitem__(self, i):
+        record = self.records[i]
+        self._data.seek(record["offset"])
+        return self._entry(record, self._data.read(record["length"]))
+
+    def get(self, source, part=1, kind=None):
+        """(source, part, kind) 항목 (없으면 KeyError)"""
+        return self[self._keys[(source, part, kind)]]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def iter(self, period=None, kind=None):
+        """
+        항목을 texts.bin 순서대로 냅니다 (파일을 앞에서부터 한 번 읽음).
+
+        Args:
+            period (str): 주면 이 시기의 항목만
+            kind (str): 주면 이 종류의 항목만
+        """
+        records = [r for r in self.records
+                   if (period is None or r["period"] == period) and (kind is None or r["kind"] == kind)]
+        records.sort(key=lambda r: r["offset"])
+        with open(os.path.join(self.path, DATA_FILE), "rb", buffering=READ_BUFFER) as f:
+            position = 0
+            for record in records:
+                if record["offset"] != position:
+                    f.seek(record["offset"])
+                data = f.read(record["length"])
+                position = record["offset"] + record["length"]
+                yield self._entry(record, data)
+
+    def __iter__(self):
+        return self.iter()
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,185 @@
+"""
+원문/번역 텍스트 쌍을 열 기반 Arrow/Parquet 데이터셋으로 저장하고 읽습니다.
+
+열 구성 (SCHEMA):
+    collection     출처 컬렉션 (예: "고문서", "학술제 뉴 데이터셋")
+    period         시기 (중세국어/근대국어)
+    title          파일명에서 "(n)" 접미사를 뺀 제목
+    version        "(n)" 번호 (접미사가 없으면 1)
+    source_lang / target_lang
+    source_text / target_text
+    source_chars / target_chars
+    source_tokens / target_tokens   (토큰 수를 세지 않으면 null)
+    source_path / target_path
+
+.parquet은 필요한 열만 읽고, .arrow(Arrow IPC 파일)는 메모리 매핑으로 복사 없이 읽습니다.
+
+    table = read_corpus("corpus.parquet", columns=["period", "source_tokens"])
+"""
+
+import os
+import re
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PERIODS = ("중세국어", "근대국어")
+
+SCHEMA = pa.schema([
+    ("collection", pa.string()),
+    ("period", pa.string()),
+    ("title", pa.string()),
+    ("version", pa.int32()),
+    ("source_lang", pa.string()),
+    ("target_lang", pa.string()),
+    ("source_text", pa.large_string()),
+    ("target_text", pa.large_string()),
+    ("source_chars", pa.int32()),
+    ("target_chars", pa.int32()),
+    ("source_tokens", pa.int32()),
+    ("target_tokens", pa.int32()),
+    ("source_path", pa.string()),
+    ("target_path", pa.string()),
+])
+
+_VERSION_RE = re.compile(r"^(.*?)\((\d+)\)$")
+
+
+def split_title_version(filename):
+    """'제목(3).txt' -> ('제목', 3), '제목.txt' -> ('제목', 1)"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    m = _VERSION_RE.match(stem)
+    if m:
+        return m.group(1), int(m.group(2))
+    return stem, 1
+
+
+def period_from_path(path, default=None):
+    """경로 안의 중세국어/근대국어 폴더 이름으로 시기를 판단합니다."""
+    parts = os.path.normpath(path).split(os.sep)
+    for period in PERIODS:
+        if period in parts:
+            return period
+    return default
+
+
+def iter_filename_pairs(source_dir, target_dir):
+    """
+    utils/json 만들기.py와 같은 규칙으로 동일한 파일명의 (원문 경로, 번역 경로)를 찾습니다.
+    파일명이 중복되면 원문 쪽은 처음 찾은 경로를 사용합니다.
+    """
+    source_files = {}
+    for root, _, files in os.walk(source_dir):
+        for filename in files:
+            if filename.endswith(".txt") and filename not in source_files:
+                source_files[filename] = os.path.join(root, filename)
+
+    for root, _, files in os.walk(target_dir):
+        for filename in files:
+            if filename.endswith(".txt") and filename in source_files:
+                yield source_files[filename], os.path.join(root, filename)
+
+
+def collect_pairs(collection, source_dir, target_dir, source_lang, target_lang, period=None, count_tokens=None):
+    """
+    한 컬렉션의 텍스트 쌍을 SCHEMA 순서의 행(dict) 목록으로 읽습니다.
+    count_tokens가 주어지면 원문/번역 토큰 수도 채웁니다. 빈 텍스트 쌍은 건너뜁니다.
+    """
+    rows = []
+    for source_path, target_path in iter_filename_pairs(source_dir, target_dir):
+        try:
+            with open(source_path, "r", encoding="utf-8") as f:
+                source_text = f.read().strip()
+            with open(target_path, "r", encoding="utf-8") as f:
+                target_text = f.read().strip()
+        except Exception as e:
+            print(f"파일 처리 중 오류 발생: {source_path}, {target_path} - {e}")
+            continue
+        if not source_text or not target_text:
+            continue
+
+        title, version = split_title_version(target_path)
+        rows.append({
+            "collection": collection,
+            "period": period_from_path(source_path, period),
+            "title": title,
+            "version": version,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "source_text": source_text,
+            "target_text": target_text,
+            "source_chars": len(source_text),
+            "target_chars": len(target_text),
+            "source_tokens": count_tokens(source_text) if count_tokens else None,
+            "target_tokens": count_tokens(target_text) if count_tokens else None,
+            "source_path": source_path,
+            "target_path": target_path,
+        })
+    return rows
+
+
+def collect_store_pairs(collection, store_path, target_lang, count_tokens=None):
+    """
+    고문서 크롤러의 편지 저장소(dataset_tools.letter_store)에서 바로 행을 만듭니다.
+    파일명 짝짓기 없이 dataId별 원문/번역을 쓰고, 원문 언어와 period는 레코드의 시기를 따릅니다.
+    텍스트는 고문서_완성형/번역본_완성형 폴더와 같게 바꿉니다 (dataset_tools.letter_text).
+    """
+    from dataset_tools.letter_store import read_letters
+    from dataset_tools.letter_text import complete_original, complete_translation
+
+    rows = []
+    for letter in read_letters(store_path):
+        source_text = complete_original(letter.get("원문") or "").strip()
+        target_text = complete_translation(letter.get("번역") or "").strip()
+        if not source_text or not target_text:
+            continue
+        title, version = split_title_version(letter.get("unique_base") or letter["dataId"])
+        path = f"{store_path}#{letter['dataId']}"
+        rows.append({
+            "collection": collection,
+            "period": letter["period"],
+            "title": title,
+            "version": version,
+            "source_lang": letter["period"],
+            "target_lang": target_lang,
+            "source_text": source_text,
+            "target_text": target_text,
+            "source_chars": len(source_text),
+            "target_chars": len(target_text),
+            "source_tokens": count_tokens(source_text) if count_tokens else None,
+            "target_tokens": count_tokens(target_text) if count_tokens else None,
+            "source_path": path,
+            "target_path": path,
+        })
+    return rows
+
+
+def write_corpus(rows, path):
+    """행 목록을 .parquet 또는 .arrow 파일로 저장합니다. 확장자로 형식을 고릅니다."""
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+    if path.endswith(".arrow"):
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, path, compression="zstd")
+    return table.num_rows
+
+
+def read_corpus(path, columns=None, filter=None):
+    """
+    write_corpus 결과를 읽습니다.
+
+    Args:
+        path (str): .parquet 또는 .arrow 파일
+        columns (list): 읽을 열 이름 (None이면 전체). 필요한 열만 디스크에서 읽습니다.
+        filter: pyarrow.dataset 필터 식 (예: pyarrow.dataset.field("period") == "중세국어")
+    """
+    if path.endswith(".arrow"):
+        source = pa.memory_map(path, "r")
+        table = pa.ipc.open_file(source).read_all()
+        if filter is not None:
+            table = table.filter(filter)
+        return table.select(columns) if columns else table
+    dataset = ds.dataset(path, format="parquet")
+    return dataset.to_table(columns=columns, filter=filter)
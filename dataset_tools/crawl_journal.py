@@ -0,0 +1,117 @@
+"""
+문서 단위로 이어받기 위한 추가 전용(append-only) JSONL 크롤링 기록.
+
+한 줄에 기록 하나이며, 같은 키가 여러 번 나오면 마지막 줄이 유효합니다.
+    {"key": "<detail URL>", "status": "done", "path": "고전/파일.xml", "size": 1234, "sha256": "...", ...}
+
+실행 시작 때 한 번만 읽어 메모리에 두고, 이후에는 줄을 덧붙이기만 합니다.
+
+    journal = CrawlJournal("download_journal.jsonl")
+    if journal.is_done(url, base_dir):   # 파일 크기/해시까지 확인
+        ...
+    journal.mark_done(url, base_dir / "고전/파일.xml", base_dir, record_id="123")
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+DONE = "done"
+FAILED = "failed"
+
+
+def file_digest(path, block_size=1 << 20):
+    """파일의 sha256 16진 문자열"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CrawlJournal:
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 중단으로 잘린 마지막 줄
+                if isinstance(entry, dict) and "key" in entry:
+                    self.entries[entry["key"]] = entry
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, key, status, **fields):
+        """기록 한 줄을 덧붙이고 바로 flush합니다."""
+        entry = {"key": key, "status": status, **fields, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.entries[key] = entry
+        return entry
+
+    def mark_done(self, key, path, base_dir, **fields):
+        """저장한 파일의 (base_dir 기준 상대) 경로, 크기, 해시를 기록합니다."""
+        return self.record(key, DONE,
+                           path=os.path.relpath(path, base_dir),
+                           size=os.path.getsize(path),
+                           sha256=file_digest(path),
+                           **fields)
+
+    def mark_failed(self, key, **fields):
+        return self.record(key, FAILED, **fields)
+
+    def is_done(self, key, base_dir, check_hash=True):
+        """
+        완료 기록이 있고 파일이 그대로 남아 있는지 확인합니다.
+
+        Args:
+            key (str): 문서 키 (detail URL 등)
+            base_dir (str): mark_done에 넘겼던 기준 폴더
+            check_hash (bool): 크기뿐 아니라 sha256까지 비교
+
+        Returns:
+            str | None: 확인된 파일의 전체 경로 (없거나 달라졌으면 None)
+        """
+        entry = self.entries.get(key)
+        if not entry or entry.get("status") != DONE:
+            return None
+        path = os.path.join(base_dir, entry["path"])
+        try:
+            if os.path.getsize(path) != entry["size"]:
+                return None
+        except OSError:
+            return None
+        if check_hash and file_digest(path) != entry["sha256"]:
+            return None
+        return path
+
+    def counts(self):
+        """상태별 문서 수"""
+        result = {}
+        for entry in self.entries.values():
+            result[entry["status"]] = result.get(entry["status"], 0) + 1
+        return result
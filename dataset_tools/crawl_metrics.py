@@ -0,0 +1,156 @@
+"""
+크롤러 계측: 단계별 소요 시간 히스토그램과 카운터 (바이트, 재시도, 실패 경로, 캐시 적중 등).
+
+- 이벤트마다 JSON 한 줄씩 기록할 수 있고 (path를 주면), 끝에 요약 줄을 덧붙임
+- print_summary는 단계별 p50/p95/p99와 카운터를 출력
+
+    metrics = CrawlMetrics("crawl_metrics.jsonl")
+    with metrics.timer("direct.download"):
+        ...
+    metrics.count("bytes", len(body), path="direct")
+    metrics.print_summary()
+    metrics.close()
+"""
+
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# 히스토그램 구간 상한(초). 마지막 구간은 그보다 큰 값 전부
+HISTOGRAM_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def metric_key(name, labels):
+    """'download{outcome=ok,path=direct}' 형태의 카운터 키"""
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}"
+
+
+def percentile(sorted_values, q):
+    """정렬된 값에서 nearest-rank 방식 q 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def histogram(values, bounds=HISTOGRAM_BOUNDS):
+    """구간 상한별 개수 목록 (마지막 원소는 bounds[-1] 초과)"""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        for i, bound in enumerate(bounds):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+class CrawlMetrics:
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): 이벤트를 덧붙일 JSONL 파일 (None이면 메모리에만 집계)
+        """
+        self.path = path
+        self.durations = defaultdict(list)
+        self.counters = Counter()
+        self.first_seen = {}  # 카운터 키 -> (name, labels, 처음 기록된 시점: 시작 후 초)
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def _emit(self, event):
+        if self._file is None:
+            return
+        event["ts"] = round(time.time(), 3)
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def observe(self, phase, seconds, **labels):
+        """단계 phase의 소요 시간 하나를 기록합니다."""
+        with self._lock:
+            self.durations[phase].append(seconds)
+            self._emit({"type": "timing", "name": phase, "seconds": round(seconds, 6), **labels})
+
+    @contextmanager
+    def timer(self, phase, **labels):
+        """with 블록의 소요 시간을 phase로 기록 (예외가 나도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start, **labels)
+
+    def count(self, name, value=1, **labels):
+        """카운터 name{labels}를 value만큼 올립니다."""
+        key = metric_key(name, labels)
+        with self._lock:
+            self.counters[key] += value
+            if key not in self.first_seen:
+                self.first_seen[key] = (name, labels, time.perf_counter() - self.started)
+            self._emit({"type": "count", "name": name, "value": value, **labels})
+
+    def add_counts(self, name, counts):
+        """다른 곳에서 센 Counter/dict를 name{kind=...} 카운터로 더합니다 (예: HTTP 캐시 통계)."""
+        for kind, value in counts.items():
+            if value:
+                self.count(name, value, kind=kind)
+
+    def first_time(self, name, **labels):
+        """
+        labels가 모두 일치하는 카운터 name이 처음 기록된 시점 (예: 첫 문서까지 걸린 시간)
+
+        Returns:
+            float | None: 시작 후 초 (기록이 없으면 None)
+        """
+        times = [t for n, l, t in self.first_seen.values()
+                 if n == name and all(l.get(k) == v for k, v in labels.items())]
+        return min(times) if times else None
+
+    def summary(self):
+        """단계별 통계와 카운터를 dict로 돌려줍니다."""
+        with self._lock:
+            phases = {}
+            for phase, values in sorted(self.durations.items()):
+                ordered = sorted(values)
+                phases[phase] = {
+                    "count": len(ordered),
+                    "total": sum(ordered),
+                    "p50": percentile(ordered, 50),
+                    "p95": percentile(ordered, 95),
+                    "p99": percentile(ordered, 99),
+                    "max": ordered[-1],
+                    "histogram": dict(zip([str(b) for b in HISTOGRAM_BOUNDS] + ["inf"], histogram(ordered))),
+                }
+            return {
+                "elapsed": time.perf_counter() - self.started,
+                "phases": phases,
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n=== 크롤링 계측 요약 (경과 {summary['elapsed']:.1f}초) ===")
+        if summary["phases"]:
+            width = max(len(phase) for phase in summary["phases"])
+            print(f"{'단계':<{width}}  {'횟수':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'최대':>8}  {'합계':>9}")
+            for phase, s in summary["phases"].items():
+                print(f"{phase:<{width}}  {s['count']:>6}  {s['p50']:>7.3f}s  {s['p95']:>7.3f}s  "
+                      f"{s['p99']:>7.3f}s  {s['max']:>7.3f}s  {s['total']:>8.1f}s")
+        for key, value in summary["counters"].items():
+            print(f"  {key}: {value:,}")
+
+    def close(self):
+        """요약 줄을 덧붙이고 JSONL 파일을 닫습니다."""
+        if self._file is None:
+            return
+        summary = self.summary()
+        with self._lock:
+            self._emit({"type": "summary", **summary})
+            self._file.close()
+            self._file = None
@@ -0,0 +1,320 @@
+"""
+크롤러 시험/벤치마크용 로컬 고정 응답(fixture) 서버.
+
+세종 한글 고전(chron.do, booklist.do, contentlist.do, detail.do, xmlDown.do)과
+한국 고문서 자료관(letter/list.do, letter/view.do) 페이지를 실제 사이트 대신 로컬에서 돌려줍니다.
+
+- load_recorded: CachedSession 캐시 폴더(--cache-dir)에 기록된 실제 응답을 그대로 재생
+  (본문의 원래 사이트 주소는 이 서버 주소로 바꿔서 응답)
+- sejong_fixtures / letter_fixtures: 기록이 없을 때 쓰는 사이트 구조를 흉내 낸 예시 페이지
+- latency/jitter로 응답 지연, error_rate로 일부 요청에 5xx 응답을 섞음 (seed로 재현 가능)
+- ETag/If-None-Match를 지원하므로 캐시 재검증(304)도 확인 가능
+
+    with FixtureServer(sejong_fixtures(classics=3, docs=10), latency=0.02, error_rate=0.05) as server:
+        crawler = SejongClassicCrawler(base_url=server.base_url, ...)
+
+    python -m dataset_tools.fixture_server --sejong 5 --letters 100 --latency 0.05 --port 8800
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+# 크롤러가 요청하는 목록 주소의 쿼리 (크롤러 코드의 주소와 같아야 함)
+SEJONG_MAIN_QUERY = "type=db&currentPage=1&recordsPerPage=100&cate=table"
+LETTER_LIST_QUERY = "itemId=letter&gubun=lettername&pageIndex=1&pageUnit=1000"
+
+HTML_TYPE = "text/html; charset=utf-8"
+XML_TYPE = "application/xml"
+
+
+def route_key(url):
+    """경로 + 정렬한 쿼리 (요청마다 쿼리 순서가 달라도 같은 응답을 찾도록)"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return parts.path + ("?" + query if query else "")
+
+
+def load_recorded(cache_dir):
+    """
+    CachedSession 캐시 폴더의 응답을 고정 응답으로 읽습니다.
+
+    Returns:
+        tuple: (route_key -> (상태 코드, 헤더, 본문) dict, 기록된 원래 사이트 주소 set)
+    """
+    fixtures, origins = {}, set()
+    index_dir = os.path.join(cache_dir, "index")
+    for name in os.listdir(index_dir):
+        try:
+            with open(os.path.join(index_dir, name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(os.path.join(cache_dir, "bodies", entry["body"][:2], entry["body"]), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            continue
+        headers = {k: v for k, v in entry["headers"].items() if k in ("Content-Type", "Content-Disposition")}
+        for url in (entry["url"], entry["final_url"]):
+            parts = urlsplit(url)
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+        fixtures[route_key(entry["final_url"])] = (entry["status"], headers, body)
+        # 리다이렉트된 요청은 원래 주소에서 최종 주소로 보냄 (determine_link_type이 최종 URL을 봄)
+        if route_key(entry["url"]) != route_key(entry["final_url"]):
+            fixtures.setdefault(route_key(entry["url"]), (302, {"Location": route_key(entry["final_url"])}, b""))
+    return fixtures, origins
+
+
+def _html(body, title=""):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>'
+            f'<body>{body}</body></html>').encode("utf-8")
+
+
+def _sejong_xml(book, record_id, paragraphs):
+    """세종 한글 고전 XML과 같은 구조 (원본의 여는 </저자정보> 태그 오류도 그대로)"""
+    articles = []
+    for i in range(paragraphs):
+        articles.append(
+            "\t\t<기사>\n"
+            f'\t\t\t<원문><원본위치 imgFile="{record_id}_{i:03d}a.jpg">{book}:{i + 1}ㄱ</원본위치>'
+            f"{'天地玄黃宇宙洪荒' * 8}</원문>\n"
+            f"\t\t\t<언해>하ᄂᆞᆯ과 ᄯᅡ{'ᄂᆞᆫ 검고 누르니 ' * 6}{record_id} {i}</언해>\n"
+            "\t\t\t</저자정보>\n\t\t\t\t<한글>저자</한글>\n"
+            f"\t\t\t\t<출판일>{1447 + sum(map(ord, record_id)) % 300}년 월 일</출판일>\n\t\t\t</저자정보>\n"
+            "\t\t</기사>\n")
+    return ("<내용>\n\t<위치>\n"
+            f"\t\t<서명>역주 {book}</서명>\n\t\t<기사제목>{record_id}</기사제목>\n"
+            "\t</위치>\n\n\t<본문>\n" + "".join(articles) + "\t</본문>\n</내용>\n").encode("utf-8")
+
+
+def sejong_fixtures(classics=4, volumes=2, docs=5, paragraphs=20):
+    """
+    세종 한글 고전 사이트 구조의 예시 페이지.
+    고전의 절반은 booklist.do(권 목록 -> contentlist.do), 나머지는 바로 contentlist.do로 연결됩니다.
+
+    Args:
+        classics (int): chron.do 표의 고전 수
+        volumes (int): booklist 고전의 권 수
+        docs (int): contentlist 한 쪽의 detail 문서 수
+        paragraphs (int): XML 한 개의 <기사> 수
+
+    Returns:
+        dict: route_key -> (상태 코드, 헤더, 본문)
+    """
+    fixtures = {}
+
+    def add(url, body, content_type=HTML_TYPE, **headers):
+        fixtures[route_key(url)] = (200, {"Content-Type": content_type, **headers}, body)
+
+    def add_contentlist(book_id, query):
+        items = []
+        for d in range(docs):
+            record_id = f"{query.replace('&', '_').replace('=', '')}_{d:03d}"
+            items.append(f'<li><a href="detail.do?recordId={record_id}">{d + 1}장</a></li>')
+            add(f"/front/detail.do?recordId={record_id}",
+                _html(f'<div class="view"><h3>{record_id}</h3>'
+                      f'<a class="btn_down" href="xmlDown.do?recordId={record_id}">XML 다운로드</a></div>'))
+            filename = quote(f"역주{book_id}-{record_id}.xml")
+            add(f"/front/xmlDown.do?recordId={record_id}", _sejong_xml(book_id, record_id, paragraphs), XML_TYPE,
+                **{"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"})
+        add(f"/front/contentlist.do?{query}",
+            _html(f'<ul class="dep_01"><li>{book_id}<ul>{"".join(items)}</ul></li></ul>'))
+
+    rows = []
+    for c in range(classics):
+        book_id = f"고전{c:03d}"
+        if c % 2 == 0:
+            href = f"booklist.do?bookId={c}"
+            links = "".join(f'<tr><td><a href="contentlist.do?bookId={c}&amp;vol={v}">{v + 1}권</a></td></tr>'
+                            for v in range(volumes))
+            add(f"/front/{href}", _html(f'<table class="bookListTable"><tbody>{links}</tbody></table>'))
+            for v in range(volumes):
+                add_contentlist(book_id, f"bookId={c}&vol={v}")
+        else:
+            href = f"contentlist.do?bookId={c}"
+            add_contentlist(book_id, f"bookId={c}")
+        rows.append(f'<tr><td>{1447 + c}</td><td><a href="{href}">{book_id}</a></td></tr>')
+    add(f"/front/chron.do?{SEJONG_MAIN_QUERY}", _html(f"<table><tbody>{''.join(rows)}</tbody></table>"))
+    return fixtures
+
+
+def letter_fixtures(letters=50):
+    """
+    한국 고문서 자료관 편지 목록/상세 페이지의 예시.
+    상세 페이지에는 연대 표, 주석이 섞인 원문, 각주가 있는 번역이 들어 있습니다.
+
+    Returns:
+        dict: route_key -> (상태 코드, 헤더, 본문)
+    """
+    fixtures = {}
+    items = []
+    for i in range(letters):
+        query = f"itemId=letter&gubun=lettername&dataId=LT_{i:05d}"
+        title = f"편지 {i}" if i % 10 else f"편지 {i // 10}"  # 같은 제목도 섞음
+        items.append(f'<li><div class="list__title"><a href="view.do?{query.replace("&", "&amp;")}">{title}</a></div></li>')
+        year = 1500 + i * 7 % 400
+        body = (f'<table class="htable"><tbody><tr><th>발신자</th><td>발신 {i}</td></tr>'
+                f"<tr><th>연대</th><td>{year}년〜{year + 3}년</td></tr></tbody></table>"
+                f'<div class="org_text"><p>원문 {i} 첫 줄 ᄒᆞ니</p><div class="comment_box">주석</div>'
+                f"<p>{'ᄀᆞᄅᆞᆷ ' * 30}</p></div>"
+                f'<div class="trans_text"><p>번역 {i}</p><dl class="jusok-dl"><dt>각주</dt><dd>설명</dd></dl>'
+                f"<p>{'강물 ' * 30}</p></div>")
+        fixtures[route_key(f"/letter/view.do?{query}")] = (200, {"Content-Type": HTML_TYPE}, _html(body, title))
+    fixtures[route_key(f"/letter/list.do?{LETTER_LIST_QUERY}")] = (
+        200, {"Content-Type": HTML_TYPE}, _html(f'<ul class="wrap__list">{"".join(items)}</ul>'))
+    return fixtures
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (Content-Length를 항상 보냄)
+
+    def do_GET(self):
+        self.server.fixture_server.handle(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, fixtures, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, seed=0, rewrite_origins=()):
+        """
+        Args:
+            fixtures (dict): route_key -> (상태 코드, 헤더, 본문)
+            port (int): 0이면 빈 포트를 자동으로 고름
+            latency (float): 모든 응답 전에 기다릴 시간(초)
+            jitter (float): latency에 더할 0~jitter초의 무작위 지연
+            error_rate (float): error_status로 응답할 요청의 비율 (0~1)
+            seed (int): 지연/오류 주입 난수 시드
+            rewrite_origins (iterable): HTML 본문에서 이 서버 주소로 바꿀 원래 사이트 주소
+        """
+        self.fixtures = fixtures
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rewrite_origins = tuple(rewrite_origins)
+        self.stats = Counter()  # served / not_modified / injected_error / missing
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self._served = {}
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fixture_server = self
+        self.port = self._httpd.server_address[1]
+        self._served = {key: self._prepare(*fixture) for key, fixture in self.fixtures.items()}
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _prepare(self, status, headers, body):
+        """원래 사이트 주소를 이 서버 주소로 바꾸고 ETag를 붙임"""
+        if self.rewrite_origins and "html" in headers.get("Content-Type", ""):
+            for origin in self.rewrite_origins:
+                body = body.replace(origin.encode("utf-8"), self.base_url.encode("utf-8"))
+        headers = dict(headers)
+        if status == 200:
+            headers["ETag"] = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return status, headers, body
+
+    def _draw(self):
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, fail
+
+    def handle(self, request):
+        delay, fail = self._draw()
+        if delay:
+            time.sleep(delay)
+
+        fixture = self._served.get(route_key(request.path))
+        if fail:
+            status, headers, body = self.error_status, {"Content-Type": HTML_TYPE}, _html("injected error")
+            kind = "injected_error"
+        elif fixture is None:
+            status, headers, body = 404, {"Content-Type": HTML_TYPE}, _html("not found")
+            kind = "missing"
+        else:
+            status, headers, body = fixture
+            kind = "served"
+            if status == 200 and request.headers.get("If-None-Match") == headers["ETag"]:
+                status, body, kind = 304, b"", "not_modified"
+        with self._lock:
+            self.stats[kind] += 1
+
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤러 시험용 로컬 고정 응답 서버")
+    parser.add_argument("--cache-dir", help="재생할 CachedSession 캐시 폴더 (크롤러의 --cache-dir)")
+    parser.add_argument("--sejong", type=int, default=0, help="예시 세종 한글 고전 고전 수")
+    parser.add_argument("--letters", type=int, default=0, help="예시 고문서 편지 수")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 무작위 지연 상한(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류로 응답할 요청 비율 (0~1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fixtures, origins = {}, set()
+    if args.cache_dir:
+        fixtures, origins = load_recorded(args.cache_dir)
+    if args.sejong:
+        fixtures.update(sejong_fixtures(classics=args.sejong))
+    if args.letters:
+        fixtures.update(letter_fixtures(args.letters))
+    if not fixtures:
+        parser.error("--cache-dir, --sejong, --letters 중 하나는 필요합니다")
+
+    server = FixtureServer(fixtures, args.host, args.port, args.latency, args.jitter,
+                           args.error_rate, args.error_status, args.seed, origins)
+    server.start()
+    print(f"고정 응답 {len(fixtures):,}개를 {server.base_url} 에서 제공합니다 (Ctrl+C로 종료)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+OldHangeul.hNFD(첫가끝 변환)와 글자 하나까지 같은 결과를 내는 빠른 변환.
+
+hNFD는 글자마다 파이썬 반복과 목록 검색(str(ord(글자)) in 목록)을 하므로 긴 텍스트에서 느립니다.
+여기서는 변환표(str.translate)와 NFD 정규화 한 번으로 바꾸고,
+자모(초성/중성/종성)가 있는 텍스트만 hNFD의 자모 묶음 처리를 그대로 따라 합니다:
+    - 옛한글 PUA 글자 -> 첫가끝 자모열 (OldHangeul의 ipf 표), '_' -> 공백
+    - 자모 묶음은 공백/완성형/PUA 글자가 나오면 내보내고 비움
+    - 그 밖의 글자(문장부호, 한자 등) 앞에서는 묶음을 내보내지만 비우지 않으므로 다음에 다시 나옴
+      (예: hNFD("ᄆᆞᆯ. 가") == "ᄆᆞᆯ.ᄆᆞᆯ 가")
+    - 텍스트 끝의 묶음은 마지막 글자가 (첫 글자가 아닌) 초성이면 버려짐
+
+    from dataset_tools.hnfd import hnfd, hnfd_many
+    hnfd("訓民正音")                 # hNFD("訓民正音")와 같음
+    hnfd_many(["원문 1", "원문 2"])  # [hNFD(t) for t in ...]와 같지만 정규화는 한 번
+"""
+
+import re
+import unicodedata
+
+from OldHangeul.make_dic import final_list, initial_list, ipf, medial_list
+
+# OldHangeul.old_hangeul.pua_to_ipf와 같은 PUA 구간 (시작, 끝, ipf 색인 기준)
+_PUA_RANGES = ((57532, 61439, 57532), (61696, 63086, 57788))
+
+TABLE = {ord("_"): " "}
+for _start, _end, _base in _PUA_RANGES:
+    for _code in range(_start, _end + 1):
+        TABLE[_code] = ipf[_code - _base]
+
+INITIALS = frozenset(chr(int(code)) for code in initial_list)
+JAMO = INITIALS | frozenset(chr(int(code)) for code in medial_list + final_list)
+
+_JAMO_RE = re.compile("[" + "".join(re.escape(c) for c in sorted(JAMO)) + "]")
+# 자모 묶음을 비우는 글자: 공백, 완성형 한글, 옛한글 PUA
+_FLUSH_RE = re.compile("[ 가-힣" + "".join(f"{chr(s)}-{chr(e)}" for s, e, _ in _PUA_RANGES) + "]")
+
+# hnfd_many가 텍스트를 이어 붙일 때 쓰는 구분자 (NFD에서 바뀌지 않고 앞뒤 글자와 재배열되지 않음)
+SEPARATOR = "\x00"
+
+
+def _run(run, pending, out):
+    """자모가 아닌 글자들 run을 out에 더하고 남은 자모 묶음을 돌려줌"""
+    if pending:
+        m = _FLUSH_RE.search(run)
+        k = m.start() if m else len(run)
+        out.extend(pending + c for c in run[:k].translate(TABLE))
+        if m is None:
+            return pending
+        out.append(pending)
+        run = run[k:]
+    out.append(run.translate(TABLE))
+    return ""
+
+
+def decompose(text):
+    """hNFD가 NFD 정규화 직전에 만드는 문자열"""
+    if _JAMO_RE.search(text) is None:
+        return text.translate(TABLE)
+    out = []
+    pending = ""  # hNFD의 text_tem (모으는 중인 자모 묶음)
+    pos = 0
+    last = len(text) - 1
+    for m in _JAMO_RE.finditer(text):
+        i = m.start()
+        if i > pos:
+            pending = _run(text[pos:i], pending, out)
+        c = text[i]
+        if i > 0 and c in INITIALS:
+            if pending:
+                out.append(pending)
+            pending = c
+        else:
+            pending += c
+            if i == last:
+                out.append(pending)
+        pos = i + 1
+    if pos < len(text):
+        _run(text[pos:], pending, out)
+    return "".join(out)
+
+
+def hnfd(text):
+    """OldHangeul.hNFD(text)와 같은 결과"""
+    return unicodedata.normalize("NFD", decompose(text))
+
+
+def hnfd_many(texts):
+    """
+    텍스트 여러 개를 한 번에 변환합니다 (문서 하나의 조각들을 모아 한 번에).
+
+    Returns:
+        list[str]: [hnfd(t) for t in texts]와 같은 목록
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    joined = SEPARATOR.join(decompose(text) for text in texts)
+    if joined.count(SEPARATOR) != len(texts) - 1:  # 텍스트 안에 구분자가 있으면 하나씩
+        return [hnfd(text) for text in texts]
+    return unicodedata.normalize("NFD", joined).split(SEPARATOR)
@@ -0,0 +1,225 @@
+"""
+크롤러 공용 HTML 추출 계층 (lxml).
+
+- parse_html: C 기반 lxml HTML 파서로 한 번만 파싱
+- compile_selector: 크롤러에서 쓰는 단순 CSS 셀렉터를 미리 컴파일한 XPath로 변환
+- SelectorSet: 필드별 후보 셀렉터 목록(우선순위 순)을 XPath 합집합 하나로 묶어
+  문서를 한 번만 훑고 셀렉터마다 첫 번째로 일치한 요소를 돌려줌 (select_one과 같은 의미)
+- element_text: BeautifulSoup get_text(separator, strip=True)와 같은 결과를
+  트리를 고치지 않고 계산 (제외할 하위 요소는 건너뛰고 뒤따르는 텍스트는 유지)
+
+    LETTER = SelectorSet({"원문": ["div.org_text", "div[class*='org']"], "iframe": ["iframe"]})
+    doc = parse_html(response.content, detect_encoding(response.content, response.headers.get("Content-Type")))
+    matches = LETTER.first_matches(doc)   # {"원문": [요소 또는 None, ...], "iframe": [...]}
+"""
+
+import re
+from functools import lru_cache
+
+from lxml import etree, html
+
+# BeautifulSoup get_text가 건너뛰는 요소 (내용이 텍스트로 나오지 않음)
+NON_TEXT_TAGS = frozenset(["script", "style", "template"])
+
+_COMPOUND_RE = re.compile(
+    r"(?P<tag>[A-Za-z][\w-]*|\*)?"
+    r"(?P<parts>(?:\.[\w-]+|#[\w-]+|\[[\w-]+(?:[*^$]?=\s*(?:'[^']*'|\"[^\"]*\"|[^\]\s]+))?\s*\])*)$"
+)
+_PART_RE = re.compile(r"\.([\w-]+)|#([\w-]+)|\[([\w-]+)(?:([*^$]?=)\s*('[^']*'|\"[^\"]*\"|[^\]\s]+))?\s*\]")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w-]+)", re.IGNORECASE)
+
+
+def _xpath_literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{p}'" for p in parts) + ")"
+
+
+def _compound_to_xpath(compound):
+    """'div.org_text', "a[href*='down']" 같은 단순 셀렉터 하나를 XPath 단계로 변환"""
+    m = _COMPOUND_RE.fullmatch(compound)
+    if not m or not compound:
+        raise ValueError(f"unsupported selector: {compound!r}")
+    tag = (m.group("tag") or "*").lower()
+    predicates = []
+    for cls, id_, attr, op, value in _PART_RE.findall(m.group("parts")):
+        if cls:
+            predicates.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')")
+        elif id_:
+            predicates.append(f"@id={_xpath_literal(id_)}")
+        elif not op:
+            predicates.append(f"@{attr}")
+        else:
+            literal = _xpath_literal(value.strip("'\""))
+            if op == "=":
+                predicates.append(f"@{attr}={literal}")
+            elif op == "*=":
+                predicates.append(f"contains(@{attr}, {literal})")
+            elif op == "^=":
+                predicates.append(f"starts-with(@{attr}, {literal})")
+            else:  # $= (XPath 1.0에는 ends-with가 없음)
+                predicates.append(f"substring(@{attr}, string-length(@{attr}) - string-length({literal}) + 1) = {literal}")
+    return tag + "".join(f"[{p}]" for p in predicates)
+
+
+def selector_xpath(css):
+    """
+    CSS 셀렉터를 XPath 식 문자열로 변환합니다.
+    BeautifulSoup select처럼 기준 요소 자신은 빼고 자손만 찾습니다.
+    지원 범위: 태그, .class, #id, [attr], [attr=v], [attr*=v], [attr^=v], [attr$=v],
+    공백(자손)/> (자식) 결합자, 쉼표 목록 (속성 값 안의 공백, >, 쉼표는 지원하지 않음)
+    """
+    paths = []
+    for group in css.split(","):
+        path, combinator = "", None
+        for token in re.findall(r">|[^\s>]+", group):
+            if token == ">":
+                combinator = "/"
+                continue
+            path += (combinator or "//") + _compound_to_xpath(token) if path else _compound_to_xpath(token)
+            combinator = None
+        if not path:
+            raise ValueError(f"empty selector in {css!r}")
+        paths.append("descendant::" + path)
+    return " | ".join(paths)
+
+
+@lru_cache(maxsize=None)
+def compile_selector(css):
+    """CSS 셀렉터를 컴파일된 etree.XPath로 (같은 셀렉터는 한 번만 컴파일)"""
+    return etree.XPath(selector_xpath(css))
+
+
+def select_one(element, css):
+    """BeautifulSoup select_one과 같이 문서 순서상 첫 번째 일치 요소 (없으면 None)"""
+    found = compile_selector(css)(element)
+    return found[0] if found else None
+
+
+class SelectorSet:
+    """
+    필드별 후보 셀렉터 목록을 한 번의 트리 순회로 평가합니다.
+    각 셀렉터는 자손 결합자 없는 단순 셀렉터여야 합니다.
+    """
+
+    def __init__(self, fields):
+        """
+        Args:
+            fields (dict): 필드 이름 -> 우선순위 순 CSS 셀렉터 목록
+        """
+        self.fields = {name: list(selectors) for name, selectors in fields.items()}
+        self._checks = []  # (필드, 순위, self:: 검사 XPath)
+        steps = []
+        for name, selectors in self.fields.items():
+            for rank, css in enumerate(selectors):
+                step = _compound_to_xpath(css)
+                steps.append(step)
+                self._checks.append((name, rank, etree.XPath(f"boolean(self::{step})")))
+        unique_steps = list(dict.fromkeys(steps))
+        self._candidates = etree.XPath(" | ".join(f"descendant::{step}" for step in unique_steps))
+
+    def first_matches(self, root):
+        """
+        Args:
+            root: parse_html 결과 (None이면 모든 필드가 None)
+
+        Returns:
+            dict: 필드 이름 -> 셀렉터 순위별 첫 번째 일치 요소 목록 (없는 순위는 None)
+        """
+        result = {name: [None] * len(selectors) for name, selectors in self.fields.items()}
+        if root is None:
+            return result
+        pending = list(self._checks)
+        for element in self._candidates(root):  # 문서 순서
+            still_pending = []
+            for check in pending:
+                name, rank, test = check
+                if test(element):
+                    result[name][rank] = element
+                else:
+                    still_pending.append(check)
+            pending = still_pending
+            if not pending:
+                break
+        return result
+
+
+def iter_text(element, skip=None):
+    """
+    element 아래의 텍스트 조각을 문서 순서로 냅니다 (element 자신의 tail은 제외).
+    주석/처리 명령과 script/style/template 내용, skip(child)가 참인 하위 요소 내용은
+    건너뛰지만 그 뒤에 이어지는 텍스트(tail)는 유지합니다.
+    """
+    if element.text and element.tag not in NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS and not (skip and skip(child)):
+            yield from iter_text(child, skip)
+        if child.tail:
+            yield child.tail
+
+
+def element_text(element, separator="", strip=True, skip=None):
+    """BeautifulSoup의 element.get_text(separator, strip)와 같은 문자열"""
+    pieces = iter_text(element, skip)
+    if strip:
+        pieces = (piece.strip() for piece in pieces)
+        pieces = (piece for piece in pieces if piece)
+    return separator.join(pieces)
+
+
+def has_text(element):
+    """get_text(strip=True)가 빈 문자열이 아닌지"""
+    return any(piece.strip() for piece in iter_text(element))
+
+
+def class_matcher(css_list):
+    """'div.comment_box, dl.jusok-dl' 같은 셀렉터 목록과 요소가 일치하는지 검사하는 함수 (element_text의 skip용)"""
+    return etree.XPath("boolean(" + " | ".join(f"self::{_compound_to_xpath(c.strip())}" for c in css_list.split(",")) + ")")
+
+
+def detect_encoding(content, content_type=None, default="utf-8"):
+    """
+    Content-Type의 charset, 문서 앞부분 <meta charset>, UTF-8 디코딩 가능 여부 순으로 인코딩을 정합니다.
+    모두 실패하면 cp949 (한국어 사이트의 옛 인코딩).
+    """
+    if content_type:
+        m = _HEADER_CHARSET_RE.search(content_type)
+        if m:
+            return m.group(1).lower()
+    m = _META_CHARSET_RE.search(content[:4096])
+    if m:
+        return m.group(1).decode("ascii").lower()
+    try:
+        content.decode(default)
+        return default
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+@lru_cache(maxsize=None)
+def _parser(encoding):
+    return html.HTMLParser(encoding=encoding, remove_comments=False)
+
+
+def parse_html(content, encoding=None):
+    """
+    HTML 바이트(또는 문자열)를 lxml 트리로 파싱합니다. 내용이 비어 있으면 None
+
+    Args:
+        content (bytes | str): 응답 본문
+        encoding (str): 바이트를 해석할 인코딩 (None이면 lxml이 <meta>로 판단)
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+        encoding = "utf-8"
+    if not content.strip():
+        return None
+    try:
+        return html.document_fromstring(content, parser=_parser(encoding))
+    except (etree.ParserError, ValueError):
+        return None
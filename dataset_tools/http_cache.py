@@ -0,0 +1,251 @@
+"""
+크롤러용 디스크 HTTP 응답 캐시 (requests.Session 대체).
+
+캐시 폴더 구성:
+    index/<키>.json        요청 URL별 메타데이터 (최종 URL, 상태 코드, 헤더, 본문 해시)
+    bodies/<해시 앞 2자리>/<해시>   본문. sha256으로 저장하므로 같은 내용은 한 번만 저장
+
+- 한 실행 안에서 같은 URL은 네트워크 없이 캐시에서 돌려줌
+- 다음 실행에서는 ETag/Last-Modified로 조건부 요청을 보내 304면 캐시 본문을 사용
+- offline=True면 모든 요청을 캐시에서만 돌려주고, 캐시에 없으면 requests.ConnectionError
+- stream=True 요청은 본문을 메모리에 모으지 않음: 받는 쪽이 읽는 대로 캐시 파일에도 쓰고(끝까지 읽힌 본문만 저장),
+  캐시에서 돌려줄 때도 본문 파일을 조금씩 읽음
+
+    session = CachedSession("http_cache")
+    r = session.get(url, timeout=15)
+    r.from_cache  # 캐시에서 돌려준 응답이면 True
+
+다른 HTTP 클라이언트(dataset_tools.async_fetch의 httpx)도 lookup -> (네트워크 요청) -> settle로 같은 캐시를 씀
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# 캐시 본문과 함께 저장할 응답 헤더 (Content-Encoding 등은 풀린 본문과 맞지 않으므로 제외)
+KEPT_HEADERS = ("Content-Type", "Content-Disposition", "ETag", "Last-Modified", "Date")
+
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _CachingReader:
+    """
+    stream=True 응답의 raw 대신 쓰는 읽기 객체: 읽히는 본문을 그대로 돌려주면서 캐시 임시 파일에 이어 쓰고,
+    끝까지 읽히면 해시 이름의 본문 파일로 옮긴 뒤 on_complete(해시)를 부름 (도중에 닫히면 임시 파일을 버림)
+    """
+
+    def __init__(self, raw, bodies_dir, body_path, on_complete):
+        self._raw = raw
+        self._body_path = body_path
+        self._on_complete = on_complete
+        self._hash = hashlib.sha256()
+        os.makedirs(bodies_dir, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=bodies_dir, suffix=".tmp")
+        self._f = os.fdopen(fd, "wb")
+
+    def read(self, amt=None, decode_content=True):
+        data = self._raw.read(amt, decode_content=True)
+        if self._f is not None:
+            if data:
+                self._f.write(data)
+                self._hash.update(data)
+            if not data or amt is None:
+                self._finish()
+        return data
+
+    def stream(self, amt=65536, decode_content=True):
+        while True:
+            data = self.read(amt)
+            if not data:
+                break
+            yield data
+
+    def _finish(self):
+        self._f.close()
+        self._f = None
+        digest = self._hash.hexdigest()
+        body_path = self._body_path(digest)
+        if os.path.exists(body_path):
+            os.remove(self._tmp_path)
+        else:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            os.replace(self._tmp_path, body_path)
+        self._on_complete(digest)
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+            os.remove(self._tmp_path)
+        self._raw.close()
+
+    def __getattr__(self, name):
+        # release_conn 등 나머지는 원래 raw에 맡김
+        return getattr(self._raw, name)
+
+
+class CachedSession(requests.Session):
+    def __init__(self, cache_dir=None, offline=False):
+        """
+        Args:
+            cache_dir (str): 캐시 폴더 (None이면 캐시 없이 일반 Session과 같음)
+            offline (bool): 네트워크 없이 캐시에서만 응답
+        """
+        super().__init__()
+        if offline and cache_dir is None:
+            raise ValueError("offline mode requires cache_dir")
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self._seen = set()  # 이번 실행에서 이미 받았거나 확인한 키
+        # hit: 이번 실행 중복 요청, revalidated: 304, stored: 새로 저장, offline: 오프라인 재생
+        self.stats = Counter()
+
+    def _key(self, url, params):
+        url = requests.Request("GET", url, params=params).prepare().url
+        return url, hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _index_path(self, key):
+        return os.path.join(self.cache_dir, "index", f"{key}.json")
+
+    def _body_path(self, digest):
+        return os.path.join(self.cache_dir, "bodies", digest[:2], digest)
+
+    def _load(self, key):
+        try:
+            with open(self._index_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _entry(self, url, response, digest):
+        return {
+            "url": url,
+            "final_url": str(response.url),
+            "status": response.status_code,
+            "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+            "body": digest,
+        }
+
+    def _store(self, key, url, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            _atomic_write(body_path, body)
+        entry = self._entry(url, response, digest)
+        _atomic_write(self._index_path(key), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        return entry
+
+    def _store_streaming(self, key, url, response):
+        """stream=True 응답: 본문은 받는 쪽이 끝까지 읽었을 때 저장 (_CachingReader)"""
+        def complete(digest):
+            entry = self._entry(url, response, digest)
+            _atomic_write(self._index_path(key), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            self._seen.add(key)
+            self.stats["stored"] += 1
+
+        response.raw = _CachingReader(response.raw, os.path.join(self.cache_dir, "bodies"), self._body_path, complete)
+
+    def _response(self, entry, stream=False):
+        """캐시 항목으로 requests.Response를 만듭니다. stream=True면 본문 파일을 열어 두고 iter_content로 조금씩 읽습니다."""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = "OK"
+        response.url = entry["final_url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if stream:
+            response.raw = open(self._body_path(entry["body"]), "rb")
+        else:
+            with open(self._body_path(entry["body"]), "rb") as f:
+                response._content = f.read()
+            response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def lookup(self, url, params=None, headers=None, stream=False):
+        """
+        GET 요청 전에 캐시를 확인합니다.
+
+        Returns:
+            tuple: (캐시 응답 또는 None, 네트워크로 보낼 헤더(조건부 요청 헤더 포함), settle에 넘길 상태)
+            캐시 응답이 None이 아니면 네트워크 요청 없이 그대로 쓰면 됨 (오프라인인데 캐시에 없으면 ConnectionError)
+        """
+        full_url, key = self._key(url, params)
+        entry = self._load(key)
+
+        if entry is not None and (self.offline or key in self._seen):
+            self.stats["offline" if self.offline else "hit"] += 1
+            return self._response(entry, stream), None, None
+        if self.offline:
+            raise requests.ConnectionError(f"offline mode: not cached: {full_url}")
+
+        # 이전 실행의 캐시가 있으면 조건부 요청
+        headers = dict(headers or {})
+        if entry is not None:
+            if "ETag" in entry["headers"]:
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return None, headers, (full_url, key, entry, stream)
+
+    def settle(self, pending, response):
+        """
+        lookup 뒤 네트워크 응답을 캐시에 반영하고 돌려줄 응답을 반환 (304면 캐시 본문, 200이면 저장).
+        304 응답을 닫는 것은 호출하는 쪽 몫 (httpx 비동기 응답은 이미 읽혀 닫혀 있음)
+        """
+        full_url, key, entry, stream = pending
+        if response.status_code == 304 and entry is not None:
+            self._seen.add(key)
+            self.stats["revalidated"] += 1
+            return self._response(entry, stream)
+        if response.status_code == 200 and stream:
+            self._store_streaming(key, full_url, response)
+        elif response.status_code == 200:
+            self._store(key, full_url, response)
+            self._seen.add(key)
+            self.stats["stored"] += 1
+        response.from_cache = False
+        return response
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if self.cache_dir is None or method.upper() != "GET":
+            if self.offline:
+                raise requests.ConnectionError(f"offline mode: {method} {url}")
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        cached, headers, pending = self.lookup(url, params, headers, kwargs.get("stream", False))
+        if cached is not None:
+            return cached
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+        settled = self.settle(pending, response)
+        if settled is not response:
+            response.close()
+        return settled
+
+    def hit_rate(self):
+        """본문을 네트워크에서 받지 않고 캐시에서 돌려준 요청의 비율 (요청이 없으면 None)"""
+        s = self.stats
+        served = s["hit"] + s["revalidated"] + s["offline"]
+        total = served + s["stored"]
+        return served / total if total else None
+
+    def summary(self):
+        """캐시 사용 통계를 한 줄 문자열로 돌려줍니다."""
+        s = self.stats
+        rate = self.hit_rate()
+        rate_text = f"{rate:.1%}" if rate is not None else "-"
+        return (f"HTTP 캐시: 중복 {s['hit']}회, 304 재검증 {s['revalidated']}회, "
+                f"새로 저장 {s['stored']}개, 오프라인 재생 {s['offline']}회 (적중률 {rate_text})")
@@ -0,0 +1,126 @@
+"""
+고문서 크롤러가 편지 한 통마다 레코드 하나를 남기는 저장소 (JSONL 또는 SQLite).
+
+레코드 필드 (FIELDS):
+    dataId        자료관의 편지 ID (키)
+    title         목록의 제목
+    year          연대에서 뽑은 가장 이른 연도 (없으면 null)
+    period        중세국어/근대국어
+    원문          hNFD(첫가끝)로 변환한 원문 (txt 파일과 같은 내용)
+    번역          현대어 번역 (크롤링한 그대로, 완성형)
+    url           상세 페이지 주소
+    unique_base   txt 파일명 (확장자 제외)
+
+- .jsonl: 추가 전용. 같은 dataId가 여러 번 나오면 마지막 줄이 유효
+- .sqlite / .sqlite3 / .db: dataId를 기본 키로 덮어씀
+
+데이터셋 빌더는 txt 파일을 파일명으로 짝짓는 대신 read_letters로 바로 읽습니다.
+
+    with LetterStore("letters.jsonl") as store:
+        store.put({"dataId": "LT_00001", "title": "...", "year": 1571, "period": "중세국어", ...})
+    for letter in read_letters("letters.jsonl", period="중세국어"):
+        letter["원문"], letter["번역"]
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+FIELDS = ("dataId", "title", "year", "period", "원문", "번역", "url", "unique_base")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+_COLUMNS = ", ".join(f'"{f}"' for f in FIELDS)
+_CREATE = (f'CREATE TABLE IF NOT EXISTS letters ("dataId" TEXT PRIMARY KEY, "title" TEXT, "year" INTEGER, '
+           f'"period" TEXT, "원문" TEXT, "번역" TEXT, "url" TEXT, "unique_base" TEXT)')
+
+
+def is_sqlite(path):
+    return os.fspath(path).lower().endswith(SQLITE_SUFFIXES)
+
+
+class LetterStore:
+    def __init__(self, path):
+        """
+        Args:
+            path (str): .jsonl 또는 .sqlite/.db 파일 (없으면 만듦)
+        """
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if is_sqlite(self.path):
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(_CREATE)
+            self.keys = {row[0] for row in self._db.execute('SELECT "dataId" FROM letters')}
+            self._file = None
+        else:
+            self._db = None
+            self.keys = {letter["dataId"] for letter in _read_jsonl(self.path)} if os.path.exists(self.path) else set()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def __contains__(self, data_id):
+        return data_id in self.keys
+
+    def put(self, record):
+        """레코드 하나를 저장합니다 (FIELDS에 없는 키는 버리고, 없는 필드는 null)."""
+        values = [record.get(f) for f in FIELDS]
+        with self._lock:
+            if self._db is not None:
+                self._db.execute(f"INSERT OR REPLACE INTO letters ({_COLUMNS}) VALUES ({', '.join('?' * len(FIELDS))})",
+                                 values)
+                self._db.commit()
+            else:
+                self._file.write(json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False) + "\n")
+                self._file.flush()
+            self.keys.add(record["dataId"])
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_jsonl(path):
+    """dataId별 마지막 레코드를 처음 나온 순서대로 (중단으로 잘린 줄은 건너뜀)"""
+    letters = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("dataId"):
+                letters[record["dataId"]] = record
+    return letters.values()
+
+
+def read_letters(path, period=None):
+    """
+    저장소의 편지 레코드를 dict로 냅니다.
+
+    Args:
+        path (str): LetterStore 파일 (.jsonl 또는 .sqlite/.db)
+        period (str): 주면 이 시기(중세국어/근대국어)의 편지만
+    """
+    if is_sqlite(path):
+        db = sqlite3.connect(path)
+        try:
+            query = f"SELECT {_COLUMNS} FROM letters"
+            rows = db.execute(query + ' WHERE "period" = ?', (period,)) if period else db.execute(query)
+            for row in rows:
+                yield dict(zip(FIELDS, row))
+        finally:
+            db.close()
+        return
+    for record in _read_jsonl(path):
+        if period is None or record.get("period") == period:
+            yield record
@@ -0,0 +1,139 @@
+"""
+고문서 편지 텍스트를 데이터셋용 완성형으로 바꾸는 변환 (utils의 폴더 단위 스크립트가 쓰는 것과 같은 함수).
+
+폴더 방식은 크롤러가 쓴 txt를 단계마다 새 폴더로 옮기며 바꿉니다:
+    고문서 -> process_dataset2_texts.py (정리) -> replace_old_jamo_dataset2.py (옛 자모 치환) -> 고문서_치환
+           -> compose_hcj_to_hangul_dataset2.py (완성형) -> 고문서_완성형
+    번역본 -> process_dataset2_texts.py (정리) -> compose_translation_to_hangul.py (완성형) -> 번역본_완성형
+
+편지 저장소(dataset_tools.letter_store)에서 바로 데이터셋을 만들 때는 레코드마다 같은 단계를 적용해
+폴더 방식과 같은 텍스트를 얻습니다.
+
+    from dataset_tools.letter_text import complete_original, complete_translation
+    complete_original(letter["원문"])     # 고문서_완성형 파일 내용과 같음
+    complete_translation(letter["번역"])  # 번역본_완성형 파일 내용과 같음
+"""
+
+import csv
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict
+
+# 옛 자모 -> 현대 자모 치환표 (replace_old_jamo_dataset2.py의 기본값)
+MAP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "map", "combined_old_mapped.csv")
+
+
+# ---- 정리 (process_dataset2_texts.py) ----
+def remove_square_brackets_content(text: str) -> str:
+    # Remove [ ... ] including content; repeat to handle multiple occurrences and nesting
+    pattern = re.compile(r"\[[^\[\]]*\]", re.DOTALL)
+    previous = None
+    current = text
+    while previous != current:
+        previous = current
+        current = pattern.sub("", current)
+    return current
+
+
+def remove_parentheses_content(text: str) -> str:
+    # Remove ( ... ) including content; repeat to handle multiple occurrences and nesting
+    pattern = re.compile(r"\([^()]*\)", re.DOTALL)
+    previous = None
+    current = text
+    while previous != current:
+        previous = current
+        current = pattern.sub("", current)
+    return current
+
+
+def clean_text_common(text: str) -> str:
+    # Remove 〃 symbol
+    text = text.replace("〃", "")
+    # Remove content within square brackets
+    text = remove_square_brackets_content(text)
+    # Remove tabs
+    text = text.replace("\t", "")
+    return text
+
+
+def clean_document_text(text: str) -> str:
+    cleaned = clean_text_common(text)
+    # Remove empty lines
+    lines = cleaned.splitlines()
+    non_empty_lines = [line for line in lines if line.strip() != ""]
+    return "\n".join(non_empty_lines)
+
+
+def clean_translation_text(text: str) -> str:
+    cleaned = clean_text_common(text)
+    # Additionally remove parentheses and their content for translations
+    cleaned = remove_parentheses_content(cleaned)
+    # Remove empty lines first, then replace line breaks with spaces
+    lines = cleaned.splitlines()
+    non_empty_lines = [line for line in lines if line.strip() != ""]
+    # Join with single spaces to replace all line breaks with spaces
+    joined = " ".join(non_empty_lines)
+    # Collapse runs of 7 or more spaces into a single space
+    joined = re.sub(r" {7,}", " ", joined)
+    # Replace double spaces with single space (iterate to handle longer runs)
+    while "  " in joined:
+        joined = joined.replace("  ", " ")
+    return joined
+
+
+# ---- 옛 자모 치환 (replace_old_jamo_dataset2.py) ----
+def load_mapping(csv_path: str) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    with open(csv_path, "r", encoding="utf-8", errors="ignore") as f:
+        reader = csv.DictReader(f)
+        if "old_char" not in reader.fieldnames or "mapped_char" not in reader.fieldnames:
+            raise ValueError("CSV must have headers: old_char,mapped_char")
+        for row in reader:
+            old = row["old_char"].strip()
+            new = row["mapped_char"].strip()
+            if not old:
+                continue
+            mapping[old] = new
+    return mapping
+
+
+def replace_text(text: str, mapping: Dict[str, str]) -> str:
+    # Per-codepoint replacement using the mapping
+    # Avoid str.translate because keys are not ord-int mapped consistently for non-BMP in all envs
+    return "".join(mapping.get(ch, ch) for ch in text)
+
+
+# ---- 완성형 (compose_hcj_to_hangul_dataset2.py, compose_translation_to_hangul.py) ----
+def compose_text(text: str) -> str:
+    # Convert compatibility jamo to canonical forms and compose
+    # NFKC maps HCJ (U+3130 block) to conjoining jamo, NFC then composes to precomposed Hangul
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFKC", text))
+
+
+# ---- 편지 저장소 레코드 ----
+@lru_cache(maxsize=None)
+def default_mapping():
+    """MAP_PATH 치환표 (처음 한 번만 읽음)"""
+    return load_mapping(MAP_PATH)
+
+
+def complete_original(text, mapping=None):
+    """
+    저장소의 원문(hNFD, 고문서 txt와 같은 내용)을 고문서_완성형 파일과 같은 텍스트로 바꿉니다.
+    mapping을 주지 않으면 MAP_PATH 치환표를 씁니다.
+    """
+    if mapping is None:
+        mapping = default_mapping()
+    return compose_text(replace_text(clean_document_text(text), mapping))
+
+
+def complete_translation(text):
+    """
+    저장소의 번역(크롤링한 그대로)을 번역본_완성형 파일과 같은 텍스트로 바꿉니다.
+    번역본 txt는 hNFD를 거쳐 저장되므로 여기서도 먼저 hNFD를 적용합니다.
+    """
+    from dataset_tools.hnfd import hnfd  # OldHangeul이 필요하므로 쓸 때만 import
+
+    return compose_text(clean_translation_text(hnfd(text)))
@@ -0,0 +1,56 @@
+"""
+크롤러용 asyncio 토큰 버킷 속도 제한기.
+
+    limiter = HostRateLimiter(rate=2.0, burst=4)
+    await limiter.acquire("https://archive.aks.ac.kr/letter/view.do?dataId=1")
+"""
+
+import asyncio
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 기다립니다. 대기 순서대로 토큰을 나눠 줍니다."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """호스트별로 따로 TokenBucket을 두는 속도 제한기. rate가 None이면 제한하지 않습니다."""
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+
+    async def acquire(self, url):
+        if not self.rate:
+            return
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
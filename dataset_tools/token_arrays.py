@@ -0,0 +1,133 @@
+"""
+채팅 JSONL을 한 번만 토큰화해 메모리 매핑 가능한 .npy 배열로 저장/로드합니다.
+
+출력 폴더 구성:
+    tokens.npy   uint32, 모든 예시의 토큰을 이어 붙인 평탄 배열
+    offsets.npy  int64, 길이 N+1. 예시 i의 토큰은 tokens[offsets[i]:offsets[i+1]]
+    roles.npy    uint8, 토큰별 메시지 role (ROLE_IDS). assistant 토큰이 loss 대상
+    meta.json    모델/인코딩 이름, 예시 수, 토큰 수, role 번호
+
+각 메시지는 내용만 인코딩하며 특수 토큰이나 role 헤더는 넣지 않습니다.
+
+    arrays = TokenArrays("train_tokens")
+    tokens, roles = arrays[0]          # 복사 없는 memmap 슬라이스
+    mask = arrays.loss_mask(0)         # assistant 토큰 위치
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from dataset_tools.chat_records import read_records
+from dataset_tools.token_counts import DEFAULT_MODEL, get_encoding
+
+ROLE_IDS = {"system": 0, "user": 1, "assistant": 2, "function": 3}
+LOSS_ROLE = ROLE_IDS["assistant"]
+
+
+class _NpyWriter:
+    """1차원 .npy 파일을 길이를 모르는 상태에서 조금씩 써 나가는 작성기."""
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        fd, self._tmp_path = tempfile.mkstemp(suffix=".bin", dir=os.path.dirname(path) or ".")
+        self._tmp = os.fdopen(fd, "wb")
+
+    def extend(self, values):
+        data = np.asarray(values, dtype=self.dtype)
+        self._tmp.write(data.tobytes())
+        self.count += data.size
+
+    def close(self):
+        self._tmp.close()
+        header = {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.count,)}
+        with open(self.path, "wb") as out, open(self._tmp_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, 1 << 20)
+        os.remove(self._tmp_path)
+
+
+def build_token_arrays(input_file, output_dir, model=DEFAULT_MODEL):
+    """
+    JSONL의 각 채팅 레코드를 토큰화해 tokens/offsets/roles .npy 배열로 저장합니다.
+
+    Returns:
+        dict: meta.json에 기록한 내용
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    encoding = get_encoding(model)
+
+    tokens = _NpyWriter(os.path.join(output_dir, "tokens.npy"), np.uint32)
+    roles = _NpyWriter(os.path.join(output_dir, "roles.npy"), np.uint8)
+    offsets = [0]
+    skipped = 0
+
+    def on_error(line_num, line, error):
+        nonlocal skipped
+        skipped += 1
+        print(f"레코드 형식 오류 (줄 {line_num}): {error}")
+
+    for record in read_records(input_file, on_error=on_error):
+        total = offsets[-1]
+        for message in record.messages:
+            ids = encoding.encode(message.content)
+            tokens.extend(ids)
+            roles.extend(np.full(len(ids), ROLE_IDS[message.role], dtype=np.uint8))
+            total += len(ids)
+        offsets.append(total)
+        if len(offsets) % 1000 == 1:
+            print(f"토큰화 중... {len(offsets) - 1}개")
+
+    tokens.close()
+    roles.close()
+    np.save(os.path.join(output_dir, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    meta = {
+        "source": os.path.abspath(input_file),
+        "model": model,
+        "encoding": encoding.name,
+        "num_examples": len(offsets) - 1,
+        "num_tokens": offsets[-1],
+        "skipped_records": skipped,
+        "role_ids": ROLE_IDS,
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+
+class TokenArrays:
+    """build_token_arrays 결과를 memmap으로 열어 예시별 슬라이스를 돌려줍니다."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.tokens = np.load(os.path.join(directory, "tokens.npy"), mmap_mode="r")
+        self.roles = np.load(os.path.join(directory, "roles.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        """예시 index의 (tokens, roles) 슬라이스. 둘 다 복사 없는 memmap 뷰입니다."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.tokens[start:end], self.roles[start:end]
+
+    def loss_mask(self, index):
+        """예시 index에서 loss를 계산할(assistant) 토큰 위치의 bool 배열."""
+        return self[index][1] == LOSS_ROLE
+
+    def lengths(self):
+        """모든 예시의 토큰 수 배열."""
+        return np.diff(self.offsets)
@@ -0,0 +1,48 @@
+"""
+채팅 레코드의 토큰 수 계산 (tiktoken).
+
+토큰 수는 OpenAI 채팅 포맷 기준으로 셉니다:
+메시지마다 3토큰(+ name이 있으면 1토큰) + 내용 토큰, 응답 시작용 3토큰.
+"""
+
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+TOKENS_PER_REPLY = 3
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model=DEFAULT_MODEL):
+    """모델 이름에 해당하는 tiktoken 인코딩을 한 번만 불러와 재사용합니다."""
+    return tiktoken.encoding_for_model(model)
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """텍스트의 토큰 수를 계산합니다."""
+    return len(get_encoding(model).encode(text))
+
+
+def message_token_counts(record, model=DEFAULT_MODEL):
+    """ChatRecord의 메시지별 내용 토큰 수 목록을 반환합니다."""
+    encoding = get_encoding(model)
+    return [len(encoding.encode(message.content)) for message in record.messages]
+
+
+def record_token_length(record, model=DEFAULT_MODEL, content_counts=None):
+    """
+    ChatRecord 하나가 학습 시 차지하는 전체 토큰 수를 계산합니다.
+    content_counts(message_token_counts 결과)를 넘기면 다시 인코딩하지 않습니다.
+    """
+    if content_counts is None:
+        content_counts = message_token_counts(record, model)
+    total = TOKENS_PER_REPLY
+    for message, count in zip(record.messages, content_counts):
+        total += TOKENS_PER_MESSAGE + count
+        if message.name is not None:
+            total += TOKENS_PER_NAME
+    return total
@@ -1,8 +1,11 @@
 import os
 import sys
-import unicodedata
+from pathlib import Path
 from typing import Callable
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.letter_text import compose_text
+
 # Ensure the dependency is declared and importable
 try:
     from jamo import j2h  # noqa: F401  # imported to enforce dependency presence
@@ -12,12 +15,6 @@ except Exception as e:
     ) from e
 
 
-def compose_text(text: str) -> str:
-    # Convert compatibility jamo to canonical forms and compose
-    # NFKC maps HCJ (U+3130 block) to conjoining jamo, NFC then composes to precomposed Hangul
-    return unicodedata.normalize("NFC", unicodedata.normalize("NFKC", text))
-
-
 def process_folder(src_dir: str, dst_dir: str, transform: Callable[[str], str]) -> None:
     for root, _, files in os.walk(src_dir):
         rel_root = os.path.relpath(root, src_dir)
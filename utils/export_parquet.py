@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.corpus_parquet import collect_pairs, collect_store_pairs, write_corpus
+
+# json 만들기.py와 같은 데이터셋 제작2 폴더
+script_dir = os.path.dirname(os.path.abspath(__file__))
+dataset2_dir = os.path.join(script_dir, "..", "데이터셋 제작2")
+
+# (컬렉션, 원문 폴더, 번역 폴더, 원문 언어, 번역 언어, 기본 시기) - json 만들기.py와 같은 매칭
+SOURCES = [
+    ("고문서",
+     os.path.join(dataset2_dir, "고문서_완성형"),
+     os.path.join(dataset2_dir, "번역본_완성형"),
+     "중세국어", "현대국어", "중세국어"),
+    ("학술제 뉴 데이터셋",
+     os.path.join(dataset2_dir, "학술제 뉴 데이터셋", "원문_완성형"),
+     os.path.join(dataset2_dir, "학술제 뉴 데이터셋", "번역_완성형"),
+     "중세국어", "현대국어", "중세국어"),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원문/번역 쌍을 Parquet(.parquet) 또는 Arrow(.arrow)로 내보내기")
+    parser.add_argument("output", nargs="?", default="통합_데이터셋.parquet", help="출력 파일 (.parquet 또는 .arrow)")
+    parser.add_argument("--no-tokens", action="store_true", help="토큰 수를 세지 않음 (tiktoken 불필요)")
+    parser.add_argument("--letters-store", default=None,
+                        help="고문서 폴더 대신 읽을 크롤러 편지 저장소 (txt 추출.py --store의 .jsonl/.sqlite)")
+    args = parser.parse_args()
+
+    count_tokens = None
+    if not args.no_tokens:
+        from dataset_tools.token_counts import count_tokens
+
+    rows = []
+    for collection, source_dir, target_dir, source_lang, target_lang, period in SOURCES:
+        if collection == "고문서" and args.letters_store:
+            pairs = collect_store_pairs(collection, args.letters_store, target_lang, count_tokens)
+        else:
+            pairs = collect_pairs(collection, source_dir, target_dir, source_lang, target_lang, period, count_tokens)
+        rows.extend(pairs)
+        print(f"{collection} 매칭 완료: {len(pairs)}개 쌍")
+
+    written = write_corpus(rows, args.output)
+    print(f"\n{args.output} 생성 완료! 총 {written}개 행")
@@ -1,5 +1,11 @@
 import os
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.chat_records import encode_record, translation_record
+from dataset_tools.letter_store import read_letters
+from dataset_tools.letter_text import complete_original, complete_translation
 
 def create_jsonl_file_by_filename(source_lang, target_lang, source_dir, target_dir, outfile):
     """
@@ -46,22 +52,35 @@ def create_jsonl_file_by_filename(source_lang, target_lang, source_dir, target_d
                         if not source_content or not target_content:
                             continue
                         
-                        # JSON 객체 생성
-                        data = {
-                            "messages": [
-                                {"role": "system", "content": f"사용자의 입력을 {source_lang}에서 {target_lang}로 번역해줘."},
-                                {"role": "user", "content": source_content},
-                                {"role": "assistant", "content": target_content}
-                            ]
-                        }
-                        # JSONL 파일에 기록
-                        outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                        # 레코드 생성 후 JSONL 파일에 기록
+                        record = translation_record(source_lang, target_lang, source_content, target_content)
+                        outfile.write(encode_record(record) + b'\n')
                         matched_count += 1
                     except Exception as e:
                         print(f"파일 처리 중 오류 발생: {source_filepath}, {target_filepath} - {e}")
     
     return matched_count
 
+def create_jsonl_file_from_store(target_lang, store_path, outfile):
+    """
+    고문서 크롤러의 편지 저장소(txt 추출.py --store)에서 dataId별 원문/번역을 바로 읽어 JSONL 파일에 추가합니다.
+    원문 언어는 레코드의 시기(중세국어/근대국어)를 씁니다.
+    저장소에는 크롤링한 텍스트가 있으므로 고문서_완성형/번역본_완성형 폴더와 같은 정리·치환·완성형 변환을 거칩니다.
+
+    Returns:
+        int: 기록한 편지 수.
+    """
+    matched_count = 0
+    for letter in read_letters(store_path):
+        source_content = complete_original(letter["원문"] or "").strip()
+        target_content = complete_translation(letter["번역"] or "").strip()
+        if not source_content or not target_content:
+            continue
+        record = translation_record(letter["period"], target_lang, source_content, target_content)
+        outfile.write(encode_record(record) + b'\n')
+        matched_count += 1
+    return matched_count
+
 def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_filename):
     """
     지정된 소스 및 대상 디렉토리에서 파일을 읽어 JSONL 파일을 생성합니다.
@@ -73,7 +92,7 @@ def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_f
         target_dir (str): 대상 파일이 있는 디렉토리 경로.
         output_filename (str): 생성될 JSONL 파일의 이름.
     """
-    with open(output_filename, 'w', encoding='utf-8') as outfile:
+    with open(output_filename, 'wb') as outfile:
         # 대상 디렉토리의 모든 하위 디렉토리를 순회합니다.
         for root, _, files in os.walk(target_dir):
             for filename in files:
@@ -91,16 +110,13 @@ def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_f
                             with open(target_filepath, 'r', encoding='utf-8') as f:
                                 target_content = f.read().strip()
                             
-                            # JSON 객체 생성
-                            data = {
-                                "messages": [
-                                    {"role": "system", "content": f"사용자의 입력을 {source_lang}에서 {target_lang}로 번역해줘."},
-                                    {"role": "user", "content": source_content},
-                                    {"role": "assistant", "content": target_content}
-                                ]
-                            }
-                            # JSONL 파일에 기록
-                            outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                            # 빈 내용은 검증을 통과하지 못하므로 건너뜁니다.
+                            if not source_content or not target_content:
+                                continue
+
+                            # 레코드 생성 후 JSONL 파일에 기록
+                            record = translation_record(source_lang, target_lang, source_content, target_content)
+                            outfile.write(encode_record(record) + b'\n')
                         except Exception as e:
                             print(f"파일 처리 중 오류 발생: {source_filepath}, {target_filepath} - {e}")
 
@@ -111,14 +127,20 @@ dataset2_dir = os.path.join(script_dir, "..", "데이터셋 제작2")
 # 하나의 JSONL 파일에 모든 데이터를 기록
 output_filename = "통합_데이터셋.jsonl"
 total_matched = 0
+# 첫 번째 인자로 편지 저장소(.jsonl/.sqlite)를 주면 고문서는 폴더 대신 저장소에서 읽음
+letters_store = sys.argv[1] if len(sys.argv) > 1 else None
 
-with open(output_filename, 'w', encoding='utf-8') as outfile:
+with open(output_filename, 'wb') as outfile:
     # 1. 고문서_완성형과 번역본_완성형 매칭
-    gomyunsoe_source_dir = os.path.join(dataset2_dir, "고문서_완성형")
-    beonyeokbon_target_dir = os.path.join(dataset2_dir, "번역본_완성형")
-    count1 = create_jsonl_file_by_filename("중세국어", "현대국어", gomyunsoe_source_dir, beonyeokbon_target_dir, outfile)
+    if letters_store:
+        count1 = create_jsonl_file_from_store("현대국어", letters_store, outfile)
+        print(f"고문서 저장소 읽기 완료: {count1}개 편지")
+    else:
+        gomyunsoe_source_dir = os.path.join(dataset2_dir, "고문서_완성형")
+        beonyeokbon_target_dir = os.path.join(dataset2_dir, "번역본_완성형")
+        count1 = create_jsonl_file_by_filename("중세국어", "현대국어", gomyunsoe_source_dir, beonyeokbon_target_dir, outfile)
+        print(f"고문서_완성형 매칭 완료: {count1}개 파일")
     total_matched += count1
-    print(f"고문서_완성형 매칭 완료: {count1}개 파일")
     
     # 2. 학술제 뉴 데이터셋/원문_완성형과 학술제 뉴 데이터셋/번역_완성형 매칭
     hakseolje_source_dir = os.path.join(dataset2_dir, "학술제 뉴 데이터셋", "원문_완성형")
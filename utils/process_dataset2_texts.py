@@ -1,63 +1,9 @@
 import os
-import re
 import sys
+from pathlib import Path
 
-
-def remove_square_brackets_content(text: str) -> str:
-    # Remove [ ... ] including content; repeat to handle multiple occurrences and nesting
-    pattern = re.compile(r"\[[^\[\]]*\]", re.DOTALL)
-    previous = None
-    current = text
-    while previous != current:
-        previous = current
-        current = pattern.sub("", current)
-    return current
-
-
-def remove_parentheses_content(text: str) -> str:
-    # Remove ( ... ) including content; repeat to handle multiple occurrences and nesting
-    pattern = re.compile(r"\([^()]*\)", re.DOTALL)
-    previous = None
-    current = text
-    while previous != current:
-        previous = current
-        current = pattern.sub("", current)
-    return current
-
-
-def clean_text_common(text: str) -> str:
-    # Remove 〃 symbol
-    text = text.replace("〃", "")
-    # Remove content within square brackets
-    text = remove_square_brackets_content(text)
-    # Remove tabs
-    text = text.replace("\t", "")
-    return text
-
-
-def clean_document_text(text: str) -> str:
-    cleaned = clean_text_common(text)
-    # Remove empty lines
-    lines = cleaned.splitlines()
-    non_empty_lines = [line for line in lines if line.strip() != ""]
-    return "\n".join(non_empty_lines)
-
-
-def clean_translation_text(text: str) -> str:
-    cleaned = clean_text_common(text)
-    # Additionally remove parentheses and their content for translations
-    cleaned = remove_parentheses_content(cleaned)
-    # Remove empty lines first, then replace line breaks with spaces
-    lines = cleaned.splitlines()
-    non_empty_lines = [line for line in lines if line.strip() != ""]
-    # Join with single spaces to replace all line breaks with spaces
-    joined = " ".join(non_empty_lines)
-    # Collapse runs of 7 or more spaces into a single space
-    joined = re.sub(r" {7,}", " ", joined)
-    # Replace double spaces with single space (iterate to handle longer runs)
-    while "  " in joined:
-        joined = joined.replace("  ", " ")
-    return joined
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.letter_text import clean_document_text, clean_translation_text
 
 
 def process_folder(folder_path: str, is_translation: bool) -> None:
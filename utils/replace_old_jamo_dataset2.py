@@ -1,28 +1,10 @@
-import csv
 import os
 import sys
+from pathlib import Path
 from typing import Dict
 
-
-def load_mapping(csv_path: str) -> Dict[str, str]:
-    mapping: Dict[str, str] = {}
-    with open(csv_path, "r", encoding="utf-8", errors="ignore") as f:
-        reader = csv.DictReader(f)
-        if "old_char" not in reader.fieldnames or "mapped_char" not in reader.fieldnames:
-            raise ValueError("CSV must have headers: old_char,mapped_char")
-        for row in reader:
-            old = row["old_char"].strip()
-            new = row["mapped_char"].strip()
-            if not old:
-                continue
-            mapping[old] = new
-    return mapping
-
-
-def replace_text(text: str, mapping: Dict[str, str]) -> str:
-    # Per-codepoint replacement using the mapping
-    # Avoid str.translate because keys are not ord-int mapped consistently for non-BMP in all envs
-    return "".join(mapping.get(ch, ch) for ch in text)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.letter_text import load_mapping, replace_text
 
 
 def process_documents_folder(docs_dir: str, out_dir: str, mapping: Dict[str, str]) -> None:
@@ -0,0 +1,137 @@
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.fixture_server import FixtureServer, letter_fixtures, load_recorded, sejong_fixtures
+
+SEJONG_SCRIPT = Path(__file__).parent / "세종 한글 고전" / "xml 추출.py"
+LETTER_SCRIPT = Path(__file__).parent / "한국 고문서 자료관" / "txt 추출.py"
+
+# serial+xml2txt: 크롤링이 끝난 뒤 xml2txt로 전체 변환 (기존 방식), pipeline: --convert로 크롤링과 동시에 변환
+SEJONG_MODES = ["serial", "async", "offline", "serial+xml2txt", "pipeline"]
+LETTER_MODES = ["serial", "concurrent", "offline"]
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    """크롤러가 현재 폴더에 만드는 파일(저장 폴더, 상태 파일, 임시 폴더)을 path 아래로 모음"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def quiet(enabled):
+    return contextlib.redirect_stdout(io.StringIO()) if enabled else contextlib.nullcontext()
+
+
+def run_sejong(base_url, mode, work, cache_dir, workers):
+    """세종 한글 고전 크롤러를 한 번 실행하고 (저장한 문서 수, 계측) 반환"""
+    crawler_module = runpy.run_path(str(SEJONG_SCRIPT), run_name="sejong_crawler")
+    crawler = crawler_module["SejongClassicCrawler"](
+        base_url=base_url, download_dir=str(work / "xml"), rate=1000.0, delay=0,
+        cache_dir=cache_dir, offline=mode == "offline", state_dir=work,
+        convert=mode == "pipeline", txt_dir=str(work / "txt"))
+    if mode == "async":
+        crawler.crawl_all_async(workers)
+    else:
+        crawler.crawl_all()
+    if mode == "serial+xml2txt":
+        xml2txt = crawler_module["xml2txt"]
+        for xml_path in sorted((work / "xml").rglob("*.xml")):
+            xml2txt.process_xml(str(xml_path), os.path.relpath(xml_path, work / "xml"), str(work / "txt"))
+    metrics = crawler.metrics
+    docs = sum(v for k, v in metrics.counters.items() if k.startswith("document{outcome=ok"))
+    return docs, metrics.first_time("document", outcome="ok")
+
+
+def run_letters(base_url, mode, work, cache_dir, concurrency):
+    """고문서 크롤러를 한 번 실행하고 (저장한 편지 수, 첫 편지까지 걸린 시간) 반환"""
+    crawler_module = runpy.run_path(str(LETTER_SCRIPT), run_name="letter_crawler")
+    main = crawler_module["main"]
+    argv = ["txt 추출.py", "--base-url", base_url, "--delay", "0", "--cache-dir", cache_dir]
+    if mode == "concurrent":
+        argv += ["--concurrency", str(concurrency), "--rate", "1000", "--burst", str(concurrency)]
+    elif mode == "offline":
+        argv += ["--offline"]
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        main()
+    finally:
+        sys.argv = saved_argv
+    metrics = main.__globals__["metrics"]  # main에서 다시 만든 모듈 전역
+    return metrics.counters.get("letter{outcome=saved}", 0), metrics.first_time("letter", outcome="saved")
+
+
+def bench(server, runner, site, modes, root, option, verbose):
+    """
+    모드별로 새 폴더에서 크롤러를 실행해 docs/sec와 첫 문서까지 걸린 시간을 측정합니다.
+    온라인 모드는 각자 빈 캐시로 시작하고, offline 모드는 serial 모드가 채운 캐시를 재생합니다.
+    """
+    results = []
+    for mode in modes:
+        work = Path(tempfile.mkdtemp(prefix=f"{site}_{mode}_", dir=root))
+        cache_dir = str(Path(root) / f"{site}_serial_cache" if mode in ("serial", "offline") else work / "cache")
+        before = server.stats.copy()
+        start = time.perf_counter()
+        try:
+            with working_dir(work), quiet(not verbose):
+                docs, first = runner(server.base_url, mode, work, cache_dir, option)
+        except Exception as e:
+            print(f"  {site}/{mode}: 실행 실패 - {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        served = server.stats - before
+        results.append((f"{site}/{mode}", docs, elapsed, first, sum(served.values()), served["injected_error"]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 고정 응답 서버로 크롤러 모드별 처리량(docs/sec)과 첫 문서까지 시간을 측정")
+    parser.add_argument("--site", choices=["sejong", "letters", "all"], default="all")
+    parser.add_argument("--cache-dir", help="예시 페이지 대신 재생할 크롤러 --cache-dir 캐시 폴더 (실제 기록)")
+    parser.add_argument("--classics", type=int, default=4, help="예시 세종 한글 고전 고전 수")
+    parser.add_argument("--docs", type=int, default=10, help="contentlist 한 쪽의 문서 수")
+    parser.add_argument("--letters", type=int, default=100, help="예시 고문서 편지 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="추가 무작위 지연 상한(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xx로 응답할 요청 비율")
+    parser.add_argument("--workers", type=int, default=4, help="세종 async 모드 작업자 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="고문서 concurrent 모드 동시 요청 수")
+    parser.add_argument("--verbose", action="store_true", help="크롤러 출력을 그대로 표시")
+    args = parser.parse_args()
+
+    if args.cache_dir:
+        fixtures, origins = load_recorded(args.cache_dir)
+    else:
+        fixtures, origins = {**sejong_fixtures(args.classics, docs=args.docs), **letter_fixtures(args.letters)}, ()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_crawl_") as root, \
+            FixtureServer(fixtures, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, rewrite_origins=origins) as server:
+        print(f"고정 응답 서버: {server.base_url} (응답 {len(fixtures):,}개, 지연 {args.latency}+{args.jitter}초, "
+              f"오류 비율 {args.error_rate:.0%})")
+        if args.site in ("sejong", "all"):
+            results += bench(server, run_sejong, "sejong", SEJONG_MODES, root, args.workers, args.verbose)
+        if args.site in ("letters", "all"):
+            results += bench(server, run_letters, "letters", LETTER_MODES, root, args.concurrency, args.verbose)
+
+    print(f"\n{'모드':<20} {'문서':>6} {'시간':>8} {'docs/sec':>10} {'첫 문서':>8} {'요청':>6} {'주입 오류':>8}")
+    for name, docs, elapsed, first, requests, errors in results:
+        first_text = f"{first:.3f}s" if first is not None else "-"
+        print(f"{name:<20} {docs:>6} {elapsed:>7.2f}s {docs / elapsed:>10.1f} {first_text:>8} {requests:>6} {errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
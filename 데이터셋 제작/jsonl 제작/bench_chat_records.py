@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools import chat_records
+from dataset_tools.chat_records import decode_record, encode_record
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def stdlib_roundtrip(lines):
+    """기존 스크립트 방식: json.loads → dict 접근 → json.dumps(ensure_ascii=False)"""
+    out = []
+    for line in lines:
+        data = json.loads(line)
+        for message in data.get("messages", []):
+            message.get("role", "")
+            message.get("content", "")
+        out.append(json.dumps(data, ensure_ascii=False) + "\n")
+    return out
+
+
+def codec_roundtrip(lines):
+    """chat_records 방식: 검증 포함 디코딩 → 바로 인코딩"""
+    out = []
+    for line in lines:
+        record = decode_record(line)
+        for message in record.messages:
+            message.role
+            message.content
+        out.append(encode_record(record) + b"\n")
+    return out
+
+
+def bench(func, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅 JSONL 디코딩/인코딩 처리량(records/sec) 비교")
+    parser.add_argument("path", nargs="?", default=str(REPO_ROOT / "train.jsonl"), help="측정할 JSONL 파일")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (가장 빠른 값 사용)")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        raw_lines = [line for line in f if line.strip()]
+    text_lines = [line.decode("utf-8") for line in raw_lines]
+
+    print(f"입력: {args.path} ({len(raw_lines):,}개 레코드)")
+    print(f"chat_records 백엔드: {chat_records.BACKEND}")
+
+    before = bench(stdlib_roundtrip, text_lines, args.repeat)
+    after = bench(codec_roundtrip, raw_lines, args.repeat)
+
+    print(f"before (json.loads/json.dumps): {before:,.0f} records/sec")
+    print(f"after  (chat_records):          {after:,.0f} records/sec")
+    print(f"속도 향상: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.chat_records import (
+    ChatRecord,
+    Message,
+    RecordError,
+    decode_record,
+    encode_record,
+    message_content,
+)
+from dataset_tools.token_counts import DEFAULT_MODEL, get_encoding, message_token_counts, record_token_length
+
+DEFAULT_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384)
+PACK_SEPARATOR = "\n\n"
+
+
+def scan_lengths(input_file, model=DEFAULT_MODEL):
+    """
+    입력 JSONL을 한 번 읽어 레코드별 (줄 오프셋, 전체 토큰 수, 팩킹 정보)를 계산합니다.
+    팩킹 정보는 system/user/assistant 3개 메시지 레코드에 대해서만 (system 내용, 본문 토큰 수)이고,
+    그 외 레코드는 None입니다.
+    """
+    entries = []
+    invalid = 0
+    with open(input_file, "rb") as f:
+        offset = 0
+        for line_num, line in enumerate(f, 1):
+            line_offset = offset
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = decode_record(line)
+            except RecordError as e:
+                invalid += 1
+                print(f"레코드 형식 오류 (줄 {line_num}): {e}")
+                continue
+
+            counts = message_token_counts(record, model)
+            length = record_token_length(record, model, counts)
+            roles = [m.role for m in record.messages]
+            pack_info = None
+            if roles == ["system", "user", "assistant"]:
+                pack_info = (record.messages[0].content, counts[1] + counts[2])
+            entries.append({"offset": line_offset, "length": length, "pack": pack_info})
+
+            if len(entries) % 1000 == 0:
+                print(f"토큰 수 계산 중... {len(entries)}개")
+    return entries, invalid
+
+
+def plan_packs(entries, budget, separator_tokens):
+    """
+    짧은 레코드(budget의 절반 이하)를 같은 system 프롬프트끼리 first-fit-decreasing으로
+    budget 이하의 묶음으로 팩킹합니다.
+
+    Returns:
+        list: 예시 목록. 각 예시는 {"members": [entries 인덱스...], "length": 토큰 수}
+    """
+    examples = []
+    groups = {}
+    for i, entry in enumerate(entries):
+        if budget and entry["pack"] is not None and entry["length"] <= budget // 2:
+            groups.setdefault(entry["pack"][0], []).append(i)
+        else:
+            examples.append({"members": [i], "length": entry["length"]})
+
+    for indices in groups.values():
+        bins = []
+        for i in sorted(indices, key=lambda i: entries[i]["length"], reverse=True):
+            body = entries[i]["pack"][1]
+            # 묶음에 추가하면 system/틀은 공유하고 user·assistant 본문과 구분자 2개만 늘어남
+            extra = body + 2 * separator_tokens
+            for b in bins:
+                if b["length"] + extra <= budget:
+                    b["members"].append(i)
+                    b["length"] += extra
+                    break
+            else:
+                bins.append({"members": [i], "length": entries[i]["length"]})
+        for b in bins:
+            b["members"].sort()  # 묶음 안에서는 원래 순서 유지
+        examples.extend(bins)
+
+    examples.sort(key=lambda ex: ex["members"][0])
+    return examples
+
+
+def bucket_of(length, buckets):
+    """토큰 수가 들어갈 가장 작은 버킷 상한을 반환합니다. 모두 넘으면 None."""
+    for upper in buckets:
+        if length <= upper:
+            return upper
+    return None
+
+
+def padding_stats(lengths):
+    """같은 배치로 묶여 가장 긴 예시에 맞춰 패딩될 때의 토큰/패딩 통계."""
+    if not lengths:
+        return {"examples": 0, "tokens": 0, "padded_tokens": 0, "waste_tokens": 0, "efficiency": 1.0}
+    tokens = sum(lengths)
+    padded = max(lengths) * len(lengths)
+    return {
+        "examples": len(lengths),
+        "tokens": tokens,
+        "padded_tokens": padded,
+        "waste_tokens": padded - tokens,
+        "efficiency": tokens / padded,
+    }
+
+
+def read_line(f, offset):
+    f.seek(offset)
+    return f.readline()
+
+
+def build_example(f, entries, members):
+    """예시 하나의 JSONL 바이트를 만듭니다. 팩킹되지 않은 레코드는 원본 줄을 그대로 씁니다."""
+    if len(members) == 1:
+        line = read_line(f, entries[members[0]]["offset"])
+        return line if line.endswith(b"\n") else line + b"\n"
+
+    records = [decode_record(read_line(f, entries[i]["offset"])) for i in members]
+    packed = ChatRecord([
+        Message("system", message_content(records[0], "system")),
+        Message("user", PACK_SEPARATOR.join(message_content(r, "user") for r in records)),
+        Message("assistant", PACK_SEPARATOR.join(message_content(r, "assistant") for r in records)),
+    ])
+    return encode_record(packed) + b"\n"
+
+
+def export_buckets(
+    input_file,
+    output_dir,
+    buckets=DEFAULT_BUCKETS,
+    pack_budget=0,
+    shard_size=0,
+    drop_over=False,
+    model=DEFAULT_MODEL,
+):
+    """
+    토큰 길이별 버킷 샤드로 JSONL을 내보냅니다.
+
+    Args:
+        input_file (str): 입력 JSONL 파일 (예: train.jsonl)
+        output_dir (str): 샤드를 저장할 폴더
+        buckets (tuple): 버킷 상한 토큰 수 (오름차순)
+        pack_budget (int): 0보다 크면 짧은 레코드를 이 토큰 수 이하로 묶어 하나의 예시로 만듦
+        shard_size (int): 0보다 크면 샤드 하나당 최대 예시 수
+        drop_over (bool): 가장 큰 버킷을 넘는 예시를 버릴지 여부 (기본은 bucket_over로 따로 저장)
+        model (str): 토크나이저 모델 이름
+
+    Returns:
+        dict: 버킷별/전체 패딩 통계
+    """
+    buckets = tuple(sorted(buckets))
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"토큰 길이 계산: {input_file}")
+    entries, invalid = scan_lengths(input_file, model)
+    separator_tokens = len(get_encoding(model).encode(PACK_SEPARATOR))
+    examples = plan_packs(entries, pack_budget, separator_tokens)
+
+    by_bucket = {}
+    for example in examples:
+        by_bucket.setdefault(bucket_of(example["length"], buckets), []).append(example)
+
+    written = 0
+    with open(input_file, "rb") as f:
+        for upper in list(buckets) + [None]:
+            bucket_examples = by_bucket.get(upper, [])
+            if not bucket_examples or (upper is None and drop_over):
+                continue
+            name = f"bucket_{upper:05d}" if upper is not None else "bucket_over"
+            chunk = shard_size or len(bucket_examples)
+            for shard_idx, start in enumerate(range(0, len(bucket_examples), chunk)):
+                shard_path = os.path.join(output_dir, f"{name}_{shard_idx:03d}.jsonl")
+                with open(shard_path, "wb") as out:
+                    for example in bucket_examples[start:start + chunk]:
+                        out.write(build_example(f, entries, example["members"]))
+                        written += 1
+
+    all_lengths = [ex["length"] for ex in examples]
+    stats = {
+        "input_records": len(entries),
+        "invalid_records": invalid,
+        "examples": len(examples),
+        "packed_examples": sum(1 for ex in examples if len(ex["members"]) > 1),
+        "written_examples": written,
+        "unbucketed": padding_stats([r["length"] for r in entries]),
+        "bucketed": {},
+    }
+    bucketed_waste = 0
+    bucketed_padded = 0
+    for upper, bucket_examples in by_bucket.items():
+        s = padding_stats([ex["length"] for ex in bucket_examples])
+        stats["bucketed"][str(upper) if upper is not None else "over"] = s
+        bucketed_waste += s["waste_tokens"]
+        bucketed_padded += s["padded_tokens"]
+    stats["bucketed_total"] = {
+        "tokens": sum(all_lengths),
+        "padded_tokens": bucketed_padded,
+        "waste_tokens": bucketed_waste,
+        "efficiency": sum(all_lengths) / bucketed_padded if bucketed_padded else 1.0,
+    }
+
+    with open(os.path.join(output_dir, "stats.json"), "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+
+    print_stats(stats, buckets)
+    return stats
+
+
+def print_stats(stats, buckets):
+    print(f"\n=== 버킷 통계 ===")
+    print(f"입력 레코드: {stats['input_records']} (형식 오류 {stats['invalid_records']})")
+    print(f"예시 수: {stats['examples']} (팩킹된 예시 {stats['packed_examples']})")
+    print(f"{'버킷':>8} {'예시':>7} {'토큰':>12} {'패딩 포함':>12} {'낭비':>12} {'효율':>7}")
+    for upper in list(buckets) + [None]:
+        key = str(upper) if upper is not None else "over"
+        s = stats["bucketed"].get(key)
+        if not s:
+            continue
+        print(f"{key:>8} {s['examples']:>7} {s['tokens']:>12,} {s['padded_tokens']:>12,} "
+              f"{s['waste_tokens']:>12,} {s['efficiency']:>7.1%}")
+    base = stats["unbucketed"]
+    total = stats["bucketed_total"]
+    print(f"\n버킷 없이 최장 예시에 맞춘 패딩: 낭비 {base['waste_tokens']:,} 토큰 (효율 {base['efficiency']:.1%})")
+    print(f"버킷/팩킹 후 패딩: 낭비 {total['waste_tokens']:,} 토큰 (효율 {total['efficiency']:.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="토큰 길이별 버킷 샤드 내보내기 (선택적 예시 팩킹)")
+    parser.add_argument("input_file", help="입력 JSONL 파일 (예: train.jsonl)")
+    parser.add_argument("output_dir", help="샤드를 저장할 폴더")
+    parser.add_argument("--buckets", type=lambda s: tuple(int(x) for x in s.split(",")), default=DEFAULT_BUCKETS,
+                        help="버킷 상한 목록 (쉼표 구분, 기본: %(default)s)")
+    parser.add_argument("--pack-budget", type=int, default=0, help="짧은 레코드를 묶을 예시당 최대 토큰 수 (0이면 팩킹 안 함)")
+    parser.add_argument("--shard-size", type=int, default=0, help="샤드당 최대 예시 수 (0이면 버킷당 파일 하나)")
+    parser.add_argument("--drop-over", action="store_true", help="가장 큰 버킷을 넘는 예시를 버림")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="토크나이저 모델 이름")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"입력 파일을 찾을 수 없습니다: {args.input_file}")
+        sys.exit(1)
+
+    export_buckets(args.input_file, args.output_dir, args.buckets, args.pack_budget,
+                   args.shard_size, args.drop_over, args.model)
@@ -0,0 +1,22 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.token_arrays import build_token_arrays
+from dataset_tools.token_counts import DEFAULT_MODEL
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채팅 JSONL을 한 번 토큰화해 memmap용 .npy 배열로 저장")
+    parser.add_argument("input_file", help="입력 JSONL 파일 (예: train.jsonl)")
+    parser.add_argument("output_dir", help="tokens.npy / offsets.npy / roles.npy를 저장할 폴더")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="토크나이저 모델 이름")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"입력 파일을 찾을 수 없습니다: {args.input_file}")
+        sys.exit(1)
+
+    meta = build_token_arrays(args.input_file, args.output_dir, args.model)
+    print(f"\n예시 {meta['num_examples']:,}개, 토큰 {meta['num_tokens']:,}개 저장 완료: {args.output_dir}")
@@ -1,6 +1,12 @@
 import json
-import tiktoken
 import os
+import sys
+from pathlib import Path
+
+import tiktoken
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.chat_records import RecordError, decode_record
 
 def count_tokens(text, model="gpt-4"):
     """텍스트의 토큰 수를 계산합니다."""
@@ -16,9 +22,16 @@ def to_text(content):
     except Exception:
         return str(content)
 
+def plain_messages(line):
+    """스키마 검증에 실패한 줄을 일반 JSON으로 읽어 (role, content) 목록을 만듭니다 (JSON이 아니면 ValueError)."""
+    data = json.loads(line)
+    return [(message.get('role', ''), to_text(message.get('content', ''))) for message in data.get('messages', [])]
+
 def filter_jsonl_by_tokens(input_file, output_file, max_tokens=30000, model="gpt-4"):
     """
     JSONL 파일에서 assistant 또는 user 메시지의 토큰 수가 max_tokens를 넘는 줄을 제거합니다.
+    채팅 레코드 스키마에 맞지 않아도 JSON으로 읽히는 줄(빈 content, function_call 등)은 토큰 수만 검사해 유지하고,
+    그런 줄과 JSON이 아니어서 건너뛴 줄의 수는 따로 보고합니다.
     
     Args:
         input_file (str): 입력 JSONL 파일 경로
@@ -29,33 +42,32 @@ def filter_jsonl_by_tokens(input_file, output_file, max_tokens=30000, model="gpt
     kept_count = 0
     total_count = 0
     removed_count = 0
+    schema_count = 0    # 스키마 불일치지만 JSON으로 읽어 검사한 줄
+    invalid_count = 0   # JSON이 아니어서 건너뛴 줄
     
     print(f"토큰 필터링 시작: {input_file}")
     print(f"최대 허용 토큰 수: {max_tokens}")
     
-    with open(input_file, 'r', encoding='utf-8') as infile, \
-         open(output_file, 'w', encoding='utf-8') as outfile:
+    with open(input_file, 'rb') as infile, \
+         open(output_file, 'wb') as outfile:
         
         for line_num, line in enumerate(infile, 1):
             if line_num % 1000 == 0:
                 print(f"처리 중... {line_num}줄")
             
             try:
-                data = json.loads(line.strip())
+                # 디코딩과 동시에 스키마 검증, 맞지 않는 줄만 일반 JSON으로 다시 읽음
+                try:
+                    record = decode_record(line)
+                    messages = [(message.role, message.content) for message in record.messages]
+                except RecordError:
+                    messages = plain_messages(line)
+                    schema_count += 1
                 total_count += 1
                 
-                messages = data.get('messages', [])
-                if not messages:
-                    # messages가 없으면 그대로 유지
-                    outfile.write(line)
-                    kept_count += 1
-                    continue
-                
                 remove_line = False
                 # 각 메시지별로 검사 (user와 assistant 모두 검사)
-                for message in messages:
-                    role = message.get('role', '')
-                    content = to_text(message.get('content', ''))
+                for role, content in messages:
                     if not content:
                         continue
                     token_count = count_tokens(content, model=model)
@@ -71,7 +83,8 @@ def filter_jsonl_by_tokens(input_file, output_file, max_tokens=30000, model="gpt
                     outfile.write(line)
                     kept_count += 1
                 
-            except json.JSONDecodeError as e:
+            except ValueError as e:  # JSONDecodeError, 잘못된 UTF-8
+                invalid_count += 1
                 print(f"JSON 파싱 오류 (줄 {line_num}): {e}")
                 continue
             except Exception as e:
@@ -82,6 +95,8 @@ def filter_jsonl_by_tokens(input_file, output_file, max_tokens=30000, model="gpt
     print(f"총 처리된 줄: {total_count}")
     print(f"유지된 줄: {kept_count}")
     print(f"제거된 줄: {removed_count}")
+    print(f"스키마 불일치 줄 (JSON으로 검사해 유지/제거): {schema_count}")
+    print(f"JSON 파싱 오류로 건너뛴 줄 (출력에서 빠짐): {invalid_count}")
     if total_count > 0:
         print(f"제거 비율: {removed_count/total_count*100:.2f}%")
     print(f"출력 파일: {output_file}")
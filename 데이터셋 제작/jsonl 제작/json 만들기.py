@@ -1,5 +1,9 @@
 import os
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.chat_records import encode_record, translation_record
 
 def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_filename):
     """
@@ -12,7 +16,7 @@ def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_f
         target_dir (str): 대상 파일이 있는 디렉토리 경로.
         output_filename (str): 생성될 JSONL 파일의 이름.
     """
-    with open(output_filename, 'w', encoding='utf-8') as outfile:
+    with open(output_filename, 'wb') as outfile:
         # 대상 디렉토리의 모든 하위 디렉토리를 순회합니다.
         for root, _, files in os.walk(target_dir):
             for filename in files:
@@ -30,19 +34,19 @@ def create_jsonl_file(source_lang, target_lang, source_dir, target_dir, output_f
                             with open(target_filepath, 'r', encoding='utf-8') as f:
                                 target_content = f.read().strip()
                             
-                            # JSON 객체 생성
-                            data = {
-                                "messages": [
-                                    {"role": "system", "content": f"사용자의 입력을 {source_lang}에서 {target_lang}로 번역해줘."},
-                                    {"role": "user", "content": source_content},
-                                    {"role": "assistant", "content": target_content}
-                                ]
-                            }
-                            # JSONL 파일에 기록
-                            outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                            # 빈 내용은 검증을 통과하지 못하므로 건너뜁니다.
+                            if not source_content or not target_content:
+                                continue
+
+                            # 레코드 생성 후 JSONL 파일에 기록
+                            record = translation_record(source_lang, target_lang, source_content, target_content)
+                            outfile.write(encode_record(record) + b'\n')
                         except Exception as e:
                             print(f"파일 처리 중 오류 발생: {source_filepath}, {target_filepath} - {e}")
 
+# 세종 한글 고전은 txt를 거치지 않고 XML에서 기사 단위 쌍으로 네 방향 JSONL을 바로 만들 수도 있음:
+#   python "세종 한글 고전/xml2txt.py" --pairs [--budget 토큰수]
+
 # 기본 경로 설정 (사용자 환경에 맞게 수정 필요)
 base_path = r"C:\USERS\SAMSUNG\DESKTOP\한민고\1. 진행중\학술제\OLDHANGEUL_TRANSLATOR\데이터셋 제작\세종 한글 고전\세종 한글 고전 txt"
 
@@ -1,12 +1,138 @@
+import argparse
+import hashlib
 import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root (dataset_tools)
+from dataset_tools.chat_records import RecordError, decode_record, message_content
 
-def merge_jsonl_files(directory: str, output_filename: str = "merged.jsonl") -> None:
+BLOCK_SIZE = 1 << 20  # 1 MiB copy blocks
+
+
+class DigestSet:
+    """
+    Set of record digests that starts in memory and spills to an on-disk
+    SQLite table once it holds more than `spill_threshold` entries, so
+    deduplicating inputs larger than RAM stays bounded in memory.
+    """
+
+    def __init__(self, spill_threshold=1_000_000, spill_dir=None):
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._memory = set()
+        self._db = None
+        self._db_path = None
+        self._pending = 0
+
+    def add(self, digest: bytes) -> bool:
+        """Add a digest; return True if it was not seen before."""
+        if self._db is None:
+            if digest in self._memory:
+                return False
+            self._memory.add(digest)
+            if len(self._memory) > self.spill_threshold:
+                self._spill()
+            return True
+
+        cur = self._db.execute("INSERT OR IGNORE INTO seen (digest) VALUES (?)", (digest,))
+        self._pending += 1
+        if self._pending >= 10000:
+            self._db.commit()
+            self._pending = 0
+        return cur.rowcount == 1
+
+    def _spill(self):
+        fd, self._db_path = tempfile.mkstemp(prefix="jsonl_dedup_", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.executemany("INSERT INTO seen (digest) VALUES (?)", ((d,) for d in self._memory))
+        self._db.commit()
+        self._memory = set()
+        print(f"Dedup set spilled to disk: {self._db_path}")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            os.remove(self._db_path)
+            self._db = None
+
+
+def record_digest(line: bytes) -> bytes:
+    """
+    Hash the whitespace-normalized user/assistant content of a chat record.
+    Lines that are not valid chat records fall back to hashing the stripped line.
+    """
+    try:
+        record = decode_record(line)
+    except RecordError:
+        return hashlib.blake2b(line.strip(), digest_size=16).digest()
+    user = " ".join(message_content(record, "user").split())
+    assistant = " ".join(message_content(record, "assistant").split())
+    key = (user + "\x00" + assistant).encode("utf-8")
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+def copy_file(infile, outfile) -> int:
+    """
+    Copy one file in large blocks, fixing only a missing final newline.
+    Returns the number of lines written.
+    """
+    lines = 0
+    last = b"\n"
+    while True:
+        block = infile.read(BLOCK_SIZE)
+        if not block:
+            break
+        outfile.write(block)
+        lines += block.count(b"\n")
+        last = block[-1:]
+    if last != b"\n":
+        outfile.write(b"\n")
+        lines += 1
+    return lines
+
+
+def copy_file_dedup(infile, outfile, seen: DigestSet):
+    """
+    Copy one file line by line, skipping records whose digest was already seen.
+    Returns (lines written, duplicates skipped).
+    """
+    written = 0
+    duplicates = 0
+    for line in infile:
+        if not line.strip():
+            continue
+        if not seen.add(record_digest(line)):
+            duplicates += 1
+            continue
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        outfile.write(line)
+        written += 1
+    return written, duplicates
+
+
+def merge_jsonl_files(
+    directory: str,
+    output_filename: str = "merged.jsonl",
+    dedup: bool = False,
+    spill_threshold: int = 1_000_000,
+) -> None:
     """
     Merge all top-level .jsonl files in the given directory into a single output file.
     - Scans only the specified directory (no recursion)
     - Excludes the output file if it already exists
     - Merges files in alphabetical order for determinism
+    - Copies in large binary blocks unless `dedup` is set
+    - With `dedup`, drops records whose normalized user/assistant content was already
+      written (from any file) and reports duplicates per source file; the digest set
+      spills to disk past `spill_threshold` entries
     """
 
     entries = os.listdir(directory)
@@ -24,28 +150,42 @@ def merge_jsonl_files(directory: str, output_filename: str = "merged.jsonl") ->
     output_path = os.path.join(directory, output_filename)
 
     total_lines_written = 0
-    with open(output_path, "w", encoding="utf-8") as outfile:
-        for filename in jsonl_files:
-            path = os.path.join(directory, filename)
-            lines_written_for_file = 0
-            with open(path, "r", encoding="utf-8") as infile:
-                for line in infile:
-                    # Ensure newline termination
-                    if not line.endswith("\n"):
-                        line = line + "\n"
-                    outfile.write(line)
-                    total_lines_written += 1
-                    lines_written_for_file += 1
-            print(f"Merged {filename}: {lines_written_for_file} lines")
+    total_duplicates = 0
+    seen = DigestSet(spill_threshold=spill_threshold) if dedup else None
+    try:
+        with open(output_path, "wb", buffering=BLOCK_SIZE) as outfile:
+            for filename in jsonl_files:
+                path = os.path.join(directory, filename)
+                with open(path, "rb", buffering=BLOCK_SIZE) as infile:
+                    if seen is None:
+                        lines_written_for_file = copy_file(infile, outfile)
+                        print(f"Merged {filename}: {lines_written_for_file} lines")
+                    else:
+                        lines_written_for_file, duplicates = copy_file_dedup(infile, outfile, seen)
+                        total_duplicates += duplicates
+                        print(f"Merged {filename}: {lines_written_for_file} lines ({duplicates} duplicates skipped)")
+                total_lines_written += lines_written_for_file
+    finally:
+        if seen is not None:
+            seen.close()
 
     print("-" * 40)
     print(f"Output: {output_filename}")
     print(f"Total files merged: {len(jsonl_files)}")
     print(f"Total lines written: {total_lines_written}")
+    if dedup:
+        print(f"Total duplicates skipped: {total_duplicates}")
 
 
 if __name__ == "__main__":
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    merge_jsonl_files(current_dir)
 
+    parser = argparse.ArgumentParser(description="Merge top-level .jsonl files in a directory.")
+    parser.add_argument("directory", nargs="?", default=current_dir, help="directory containing .jsonl files")
+    parser.add_argument("--output", default="merged.jsonl", help="output file name inside the directory")
+    parser.add_argument("--dedup", action="store_true", help="skip records with duplicate user/assistant content")
+    parser.add_argument("--spill-threshold", type=int, default=1_000_000,
+                        help="number of digests kept in memory before spilling to disk")
+    args = parser.parse_args()
 
+    merge_jsonl_files(args.directory, args.output, dedup=args.dedup, spill_threshold=args.spill_threshold)
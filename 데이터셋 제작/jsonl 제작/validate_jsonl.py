@@ -1,23 +1,50 @@
 import json
+import sys
 import tiktoken # for token counting
 import numpy as np
 from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repository root (dataset_tools)
+from dataset_tools.chat_records import RecordError, decode_record
 
 data_path = "merged_sample.jsonl"
 
-# Load the dataset
-with open(data_path, 'r', encoding='utf-8') as f:
-    dataset = [json.loads(line) for line in f]
+# Load the dataset: typed decode validates the schema in one step, and only the
+# lines it rejects are re-parsed as plain JSON to classify the format error.
+records = []
+invalid_lines = []  # (line, RecordError message)
+first_line = None
+with open(data_path, 'rb') as f:
+    for line in f:
+        if first_line is None:
+            first_line = line
+        try:
+            records.append(decode_record(line))
+        except RecordError as e:
+            invalid_lines.append((line, str(e)))
 
 # Initial dataset stats
-print("Num examples:", len(dataset))
+print("Num examples:", len(records) + len(invalid_lines))
 print("First example:")
-for message in dataset[0]["messages"]:
-    print(message)
+if first_line is not None:
+    if invalid_lines and invalid_lines[0][0] is first_line:
+        print(first_line.decode("utf-8", errors="replace").rstrip("\n"))
+    else:
+        for message in records[0].messages:
+            print(message)
 # Format error checks
 format_errors = defaultdict(int)
+schema_errors = defaultdict(int)  # RecordError message -> count, for lines no check below catches
+
+for line, error in invalid_lines:
+    found = sum(format_errors.values())
+    try:
+        ex = json.loads(line)
+    except ValueError:  # JSONDecodeError and invalid UTF-8 (UnicodeDecodeError)
+        format_errors["invalid_json"] += 1
+        continue
 
-for ex in dataset:
     if not isinstance(ex, dict):
         format_errors["data_type"] += 1
         continue
@@ -28,6 +55,10 @@ for ex in dataset:
         continue
         
     for message in messages:
+        if not isinstance(message, dict):
+            format_errors["data_type"] += 1
+            continue
+
         if "role" not in message or "content" not in message:
             format_errors["message_missing_key"] += 1
         
@@ -43,12 +74,21 @@ for ex in dataset:
         if (not content and not function_call) or not isinstance(content, str):
             format_errors["missing_content"] += 1
     
-    if not any(message.get("role", None) == "assistant" for message in messages):
+    if not any(isinstance(message, dict) and message.get("role", None) == "assistant" for message in messages):
         format_errors["example_missing_assistant_message"] += 1
 
+    # The typed decoder is stricter than the checks above (e.g. "weight": "1",
+    # or an empty content next to a function_call): report its message instead.
+    if sum(format_errors.values()) == found:
+        format_errors["schema"] += 1
+        schema_errors[error] += 1
+
 if format_errors:
     print("Found errors:")
     for k, v in format_errors.items():
         print(f"{k}: {v}")
+        if k == "schema":
+            for error, count in schema_errors.items():
+                print(f"  {count}: {error}")
 else:
-    print("No errors found")
\ No newline at end of file
+    print("No errors found")
@@ -0,0 +1,235 @@
+import argparse
+import filecmp
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lxml import etree
+from OldHangeul import hNFD
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import xml2txt
+
+
+# ---- 기존 텍스트 추출: <원본위치>를 트리에서 떼어 낸 뒤 tostring(method="text"), 요소마다 hNFD ----
+def mutating_full_text(element):
+    for pos in element.findall(".//원본위치"):
+        parent = pos.getparent()
+        if pos.tail:
+            prev = pos.getprevious()
+            if prev is not None:
+                prev.tail = (prev.tail or "") + pos.tail
+            else:
+                parent.text = (parent.text or "") + pos.tail
+        parent.remove(pos)
+    return hNFD(etree.tostring(element, method="text", encoding="utf-8").decode("utf-8").strip())
+
+
+def document_elements(root):
+    """문서의 (언해 쪽 요소, 번역문 요소) 목록 - process_xml과 같은 순서"""
+    본문 = root.find("본문")
+    언해, 번역문 = [], []
+    for 기사 in (본문.findall("기사") if 본문 is not None else []):
+        언해 += 기사.findall(".//원문") + 기사.findall(".//언해")
+        번역문 += 기사.findall(".//번역문")
+    return 언해, 번역문
+
+
+def extract_before(root):
+    return [[text for text in map(mutating_full_text, elements) if text] for elements in document_elements(root)]
+
+
+def extract_after(root):
+    """트리를 바꾸지 않는 element_text + 문서 단위로 한 번에 hnfd_many"""
+    return [[text for text in xml2txt.hnfd_many(map(xml2txt.element_text, elements)) if text]
+            for elements in document_elements(root)]
+
+
+def parse_all(paths):
+    trees = []
+    for path in paths:
+        with open(path, "rb") as f:
+            try:
+                trees.append(etree.fromstring(xml2txt.repair_bytes(f.read())))
+            except etree.XMLSyntaxError:
+                pass
+    return trees
+
+
+def bench_extract(func, paths, repeat):
+    """텍스트 추출만 측정 (기존 방식은 트리를 바꾸므로 반복마다 새로 파싱하고, 파싱 시간은 빼고 잼)"""
+    best = float("inf")
+    outputs = None
+    for _ in range(repeat):
+        trees = parse_all(paths)
+        start = time.perf_counter()
+        outputs = [func(root) for root in trees]
+        best = min(best, time.perf_counter() - start)
+    segments = sum(len(kind) for document in outputs for kind in document)
+    return segments / best, outputs
+
+
+# ---- 기존 변환: 파일 전체를 str로 읽어 교정 -> 다시 encode -> 트리 전체 파싱 ----
+def dom_process_xml(xml_path, rel_path, output_dir):
+    with open(xml_path, encoding="utf-8") as f:
+        xml_text = f.read()
+    xml_text = re.sub(r"</저자정보>\s*<(?=(한글|한자|출판일))", "<저자정보><", xml_text)
+    xml_text = re.sub(r"</저자정보>\s*~~\s*</저자정보>", "</저자정보>", xml_text)
+    root = etree.fromstring(xml_text.encode("utf-8"), etree.XMLParser(recover=False))
+    period = xml2txt.get_period_from_xml(root)
+    본문 = root.find("본문")
+    if 본문 is None:
+        return None
+    lines = {"언해": [], "번역문": []}
+    for 기사 in 본문.findall("기사"):
+        for 원문 in 기사.findall(".//원문") + 기사.findall(".//언해"):
+            text = mutating_full_text(원문)
+            if text:
+                lines["언해"].append(text)
+        for 번역문 in 기사.findall(".//번역문"):
+            text = mutating_full_text(번역문)
+            if text:
+                lines["번역문"].append(text)
+    for kind, kind_lines in lines.items():
+        if kind_lines:
+            txt_path = os.path.join(output_dir, period, kind, rel_path.replace(".xml", ".txt"))
+            os.makedirs(os.path.dirname(txt_path), exist_ok=True)
+            with open(txt_path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(kind_lines))
+    return period
+
+
+def stream_process_xml(xml_path, rel_path, output_dir):
+    return xml2txt.process_xml(xml_path, rel_path, output_dir, quiet=True)
+
+
+IMPLEMENTATIONS = {"dom": dom_process_xml, "stream": stream_process_xml}
+
+
+def convert_all(func, tasks, output_dir):
+    """(변환 결과 또는 오류 문자열) 목록"""
+    results = []
+    for xml_path, rel_path in tasks:
+        try:
+            results.append(func(xml_path, rel_path, output_dir))
+        except Exception as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+
+def bench(func, tasks, repeat, output_dir):
+    """반복마다 output_dir을 비우고 다시 변환 (마지막 반복의 출력이 남음)"""
+    best = float("inf")
+    for _ in range(repeat):
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        start = time.perf_counter()
+        results = convert_all(func, tasks, output_dir)
+        best = min(best, time.perf_counter() - start)
+    return len(tasks) / best, results
+
+
+def diff_trees(a, b):
+    """두 출력 폴더에서 한쪽에만 있거나 내용이 다른 파일 목록"""
+    differences = []
+    compared = filecmp.dircmp(a, b)
+    stack = [("", compared)]
+    while stack:
+        prefix, cmp = stack.pop()
+        differences += [os.path.join(prefix, name) for name in cmp.left_only + cmp.right_only]
+        _, mismatch, errors = filecmp.cmpfiles(os.path.join(a, prefix), os.path.join(b, prefix),
+                                               cmp.common_files, shallow=False)
+        differences += [os.path.join(prefix, name) for name in mismatch + errors]
+        stack += [(os.path.join(prefix, name), sub) for name, sub in cmp.subdirs.items()]
+    return sorted(differences)
+
+
+def synthetic_xml(path, articles):
+    """기사를 articles개 반복한 큰 XML (저자정보 중복 닫힘 태그 포함)"""
+    article = ("\t\t<기사>\n\t\t\t<원문>又方端午日以艾爲人安門上辟溫<원본위치>1ㄱ</원본위치></원문>\n"
+               "\t\t\t<언해> 수릿날 으로 사 그라 門문 우희 두면 덥단 병을 업게 니라</언해>\n"
+               "\t\t\t<번역문>또한 단옷날에 쑥으로 사람을 만들어 문 위에 걸어 두면 열병을 없게 한다.</번역문>\n"
+               "\t\t\t</저자정보>\n\t\t\t\t<한글>김순몽 외</한글>\n\t\t\t\t<한자>金順蒙 外</한자>\n"
+               "\t\t\t\t<출판일>1525년(중종 20) 월 일</출판일>\n\t\t\t</저자정보>\n\t\t</기사>\n").encode("utf-8")
+    with open(path, "wb") as f:
+        f.write("<내용>\n\t<위치><서명>예시</서명></위치>\n\t<본문>\n".encode("utf-8"))
+        for _ in range(articles):
+            f.write(article)
+        f.write("\t</본문>\n</내용>\n".encode("utf-8"))
+
+
+def peak_rss(impl, xml_path):
+    """새 프로세스에서 impl로 파일 하나를 변환했을 때의 최대 RSS (KB)"""
+    output = subprocess.run([sys.executable, __file__, "--measure-rss", impl, xml_path],
+                            capture_output=True, text=True, check=True).stdout
+    return int(output.split()[-1])
+
+
+def measure_rss(impl, xml_path):
+    with tempfile.TemporaryDirectory() as output_dir:
+        IMPLEMENTATIONS[impl](xml_path, os.path.basename(xml_path), output_dir)
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="xml2txt 변환 비교: 트리 전체 파싱(dom) vs iterparse 스트리밍(stream), "
+                                                 "텍스트 추출 (트리 수정 + 요소별 hNFD vs element_text + 문서별 hnfd_many)")
+    parser.add_argument("input", nargs="?", default=xml2txt.BASE_DIR, help="XML 폴더")
+    parser.add_argument("--limit", type=int, default=2000, help="비교할 파일 수 (0이면 전부)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--articles", type=int, nargs="*", default=[1000, 10000, 100000],
+                        help="최대 메모리를 잴 합성 XML의 기사 수")
+    parser.add_argument("--measure-rss", nargs=2, metavar=("IMPL", "XML"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_rss:
+        measure_rss(*args.measure_rss)
+        return
+
+    files = xml2txt.find_xml_files(args.input)
+    if args.limit:
+        files = files[:args.limit]
+    tasks = [(path, os.path.relpath(path, args.input)) for path in files]
+    if tasks:
+        print(f"입력: {args.input} ({len(tasks):,}개 파일)")
+        before, old_texts = bench_extract(extract_before, files, args.repeat)
+        after, new_texts = bench_extract(extract_after, files, args.repeat)
+        print(f"텍스트 추출 before (트리 수정 + 요소별 hNFD):         {before:,.1f} segments/sec")
+        print(f"텍스트 추출 after  (element_text + 문서별 hnfd_many): {after:,.1f} segments/sec")
+        print(f"속도 향상: {after / before:.2f}x")
+        mismatches = sum(a != b for a, b in zip(old_texts, new_texts))
+        print(f"추출 텍스트가 다른 문서: {mismatches}개 / {len(old_texts):,}개\n")
+
+        # 출력 txt는 수만 개이므로 비교가 끝나면 임시 폴더째 지움
+        with tempfile.TemporaryDirectory(prefix="bench_xml2txt_") as work:
+            old_dir, new_dir = os.path.join(work, "dom"), os.path.join(work, "stream")
+            before, old_results = bench(dom_process_xml, tasks, args.repeat, old_dir)
+            after, new_results = bench(stream_process_xml, tasks, args.repeat, new_dir)
+            differences = diff_trees(old_dir, new_dir)
+        print(f"before (str 교정 + 전체 파싱):   {before:,.1f} files/sec")
+        print(f"after  (바이트 교정 + iterparse): {after:,.1f} files/sec")
+        print(f"속도 향상: {after / before:.2f}x")
+        mismatches = [tasks[i][1] for i, (a, b) in enumerate(zip(old_results, new_results)) if a != b]
+        print(f"결과(시기/오류)가 다른 파일: {len(mismatches)}개, 출력 txt가 다른 파일: {len(differences)}개")
+        for rel in mismatches[:3]:
+            print(f"  - {rel}")
+
+    if args.articles:
+        print(f"\n{'기사 수':>8} {'XML 크기':>10} {'dom 최대 RSS':>14} {'stream 최대 RSS':>16}")
+        with tempfile.TemporaryDirectory(prefix="bench_xml2txt_") as work:
+            for articles in args.articles:
+                xml_path = os.path.join(work, f"synthetic_{articles}.xml")
+                synthetic_xml(xml_path, articles)
+                size = os.path.getsize(xml_path) / 1024 / 1024
+                dom, stream = peak_rss("dom", xml_path), peak_rss("stream", xml_path)
+                print(f"{articles:>8,} {size:>8.1f}MB {dom / 1024:>12.1f}MB {stream / 1024:>14.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
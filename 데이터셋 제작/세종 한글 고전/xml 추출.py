@@ -1,28 +1,186 @@
+import argparse
+import asyncio
+import multiprocessing
 import requests
-from bs4 import BeautifulSoup
 import os
 import re
+import sys
 import time
 import urllib.parse
 from pathlib import Path
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import shutil
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.crawl_journal import CrawlJournal
+from dataset_tools.crawl_metrics import CrawlMetrics
+from dataset_tools.html_extract import SelectorSet, compile_selector, element_text, parse_html
+from dataset_tools.http_cache import CachedSession
+from dataset_tools.ratelimit import HostRateLimiter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))  # 같은 폴더의 xml2txt
+import xml2txt
+
+# 최적화된 브라우저 옵션
+BROWSER_OPTIONS = {
+    'headless': True,
+    'args': [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+        '--no-sandbox',
+        '--disable-images',  # 이미지 로딩 비활성화
+        '--disable-plugins',
+        '--disable-extensions'
+    ]
+}
+
+# 빠른 컨텍스트 옵션
+CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'accept_downloads': True,
+    'ignore_https_errors': True  # SSL 오류 무시
+}
+
+# 상세 페이지의 XML 다운로드 버튼 셀렉터 (우선순위 순)
+DOWNLOAD_SELECTORS = [
+    'a.btn_down',
+    'a[class*="btn_down"]',
+    'a[href*="down"]',
+    '.btn_down'
+]
+
+# 페이지 구조 셀렉터 (lxml XPath로 미리 컴파일)
+TABLE = compile_selector('table')
+TBODY = compile_selector('tbody')
+ROW = compile_selector('tr')
+CELL = compile_selector('td')
+LINK = compile_selector('a[href]')
+UL = compile_selector('ul')
+LI = compile_selector('li')
+DEP_01 = compile_selector('ul.dep_01')
+BOOK_LIST_TABLE = compile_selector('table.bookListTable')
+DOWNLOAD_BUTTONS = SelectorSet({'button': DOWNLOAD_SELECTORS})
+
+# 직접 다운로드 시 한 번에 디스크에 쓰는 크기
+CHUNK_SIZE = 64 * 1024
+
+
+class ConversionPipeline:
+    """
+    저장된 XML을 곧바로 변환 작업자 프로세스(xml2txt.process_xml)에 넘겨,
+    크롤링(네트워크 대기)과 txt 변환(CPU)을 겹쳐서 실행합니다.
+    변환이 밀리면 대기 작업이 max_pending개를 넘지 않도록 submit이 기다립니다 (backpressure).
+    """
+    
+    def __init__(self, xml_dir, txt_dir=xml2txt.OUTPUT_DIR, jobs=None, max_pending=None, metrics=None):
+        """
+        Args:
+            xml_dir (str): 크롤러 저장 폴더 (txt 경로는 이 폴더 기준 상대 경로를 유지)
+            txt_dir (str): 변환 결과 폴더
+            jobs (int): 변환 작업자 프로세스 수 (None이면 CPU 수)
+            max_pending (int): 동시에 대기/진행 중일 수 있는 변환 작업 수 (None이면 jobs의 2배)
+            metrics (CrawlMetrics): 변환 소요 시간/결과를 기록할 계측
+        """
+        self.xml_dir = Path(xml_dir)
+        self.txt_dir = str(txt_dir)
+        self.jobs = jobs or os.cpu_count() or 1
+        # fork하면 작업자가 Playwright 드라이버와의 파이프를 물려받아, 크롤러가 끝날 때 드라이버가 종료되지 않음
+        self.executor = ProcessPoolExecutor(self.jobs, mp_context=multiprocessing.get_context("spawn"))
+        self.slots = threading.BoundedSemaphore(max_pending or self.jobs * 2)
+        self.metrics = metrics or CrawlMetrics()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+    
+    def submit(self, xml_path):
+        """XML 하나의 변환을 예약합니다. 대기 작업이 가득 차 있으면 자리가 날 때까지 기다립니다."""
+        with self.metrics.timer('convert.backpressure_wait'):
+            self.slots.acquire()
+        rel_path = os.path.relpath(xml_path, self.xml_dir)
+        submitted = time.perf_counter()
+        try:
+            future = self.executor.submit(xml2txt.process_xml, str(xml_path), rel_path, self.txt_dir)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda f: self._finished(f, rel_path, submitted))
+    
+    def has_output(self, xml_path):
+        """이전 실행에서 변환한 txt가 (시기/종류 폴더 중 어디든) 남아 있으면 True"""
+        rel_txt = os.path.relpath(xml_path, self.xml_dir).replace(".xml", ".txt")
+        txt_dir = Path(self.txt_dir)
+        return txt_dir.is_dir() and any((period / kind / rel_txt).exists()
+                                        for period in txt_dir.iterdir() for kind in ("언해", "번역문"))
+    
+    def _finished(self, future, rel_path, submitted):
+        self.slots.release()
+        self.metrics.observe('convert.latency', time.perf_counter() - submitted)
+        error = future.exception()
+        with self._lock:
+            self.stats['failed' if error else 'converted'] += 1
+        self.metrics.count('convert', outcome='failed' if error else 'ok')
+        if error:
+            print(f"    ❌ txt 변환 실패: {rel_path} - {error}")
+    
+    def close(self):
+        """남은 변환이 끝날 때까지 기다리고 결과를 출력합니다."""
+        with self.metrics.timer('convert.drain'):
+            self.executor.shutdown(wait=True)
+        print(f"txt 변환: {self.stats['converted']}개 완료, {self.stats['failed']}개 실패 -> {self.txt_dir}")
 
 class SejongClassicCrawler:
-    def __init__(self, base_url="http://db.sejongkorea.org", download_dir="세종 한글 고전"):
-        self.base_url = base_url
+    def __init__(self, base_url="http://db.sejongkorea.org", download_dir="세종 한글 고전", rate=2.0, direct=True,
+                 cache_dir=None, offline=False, metrics_file=None, delay=0.5, state_dir=None,
+                 convert=False, convert_jobs=None, txt_dir=xml2txt.OUTPUT_DIR):
+        # base_url을 바꾸면 로컬 고정 응답 서버(dataset_tools.fixture_server) 등 다른 주소로 크롤링
+        self.base_url = base_url.rstrip('/')
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
-        self.session = requests.Session()
+        # cache_dir가 있으면 응답을 디스크에 캐시, offline이면 캐시에서만 응답 (브라우저 경로도 사용 안 함)
+        self.session = CachedSession(cache_dir, offline)
+        self.offline = offline
         
-        # 다운로드 추적 파일 경로 설정 (코드와 같은 디렉토리)
-        self.downloaded_classics_file = Path(__file__).parent / "downloaded_classic.txt"
+        # keep-alive 커넥션 재사용 (비동기 모드의 여러 스레드가 같은 세션을 씀)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
-        # 요청 헤더 설정 (BeautifulSoup용)
+        # 브라우저 없이 다운로드 링크를 직접 받는 빠른 경로 사용 여부와 경로별 사용 횟수
+        self.direct = direct
+        self.download_stats = Counter()
+        
+        # 단계별 소요 시간/바이트/실패 경로 계측 (metrics_file이 있으면 JSONL로 기록)
+        self.metrics = CrawlMetrics(metrics_file)
+        
+        # 서버 부하 방지를 위한 문서 사이 딜레이(초). 고전 사이에는 두 배
+        self.delay = delay
+        
+        # convert면 새로 저장한 XML을 크롤링과 동시에 txt로 변환 (xml2txt를 따로 돌릴 필요 없음)
+        self.converter = (ConversionPipeline(self.download_dir, txt_dir, convert_jobs, metrics=self.metrics)
+                          if convert else None)
+        
+        # 다운로드 추적 파일 경로 설정 (기본은 코드와 같은 디렉토리)
+        state_dir = Path(state_dir) if state_dir else Path(__file__).parent
+        self.downloaded_classics_file = state_dir / "downloaded_classic.txt"
+        self._downloaded_classics = None  # 처음 읽을 때 한 번만 로드
+        
+        # 문서(detail URL) 단위 다운로드 기록: 중단된 고전도 남은 문서만 이어받음
+        self.journal = CrawlJournal(state_dir / "download_journal.jsonl")
+        
+        # 요청 헤더 설정 (requests용)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
+        # 비동기 모드에서 모든 HTTP 요청에 적용하는 전역 속도 제한 (호스트당 초당 요청 수)
+        # requests 호출은 작업 스레드에서 하므로 토큰은 이벤트 루프(self._loop)의 제한기에서 받음
+        self.rate_limiter = HostRateLimiter(rate)
+        self._loop = None
+        
         # Playwright 초기화
         self.playwright = None
         self.browser = None
@@ -30,69 +188,74 @@ class SejongClassicCrawler:
         self.temp_download_dir = Path("temp_downloads")
         self.temp_download_dir.mkdir(exist_ok=True)
     
-    def get_soup(self, url, retries=3):
-        """URL에서 BeautifulSoup 객체를 반환합니다."""
+    def wait_rate_limit(self, url):
+        """비동기 모드면 요청 하나마다 전역 속도 제한기의 토큰을 기다립니다 (작업 스레드에서 호출)."""
+        if self._loop is None or self.offline:
+            return
+        with self.metrics.timer('rate_wait'):
+            asyncio.run_coroutine_threadsafe(self.rate_limiter.acquire(url), self._loop).result()
+    
+    def get_document(self, url, retries=3):
+        """URL의 HTML을 lxml 트리로 파싱해 반환합니다."""
         # URL 유효성 검사
         if not url or not url.startswith('http'):
             print(f"Invalid URL format: {url}")
             return None
         
         for attempt in range(retries):
+            if attempt:
+                self.metrics.count('retry', where='page')
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                response.encoding = 'utf-8'
-                return BeautifulSoup(response.text, 'html.parser')
+                self.wait_rate_limit(url)
+                with self.metrics.timer('page.fetch'):
+                    response = self.session.get(url, timeout=30)
+                    response.raise_for_status()
+                self.metrics.count('bytes', len(response.content), path='page')
+                with self.metrics.timer('page.parse'):
+                    return parse_html(response.content, 'utf-8')
             except requests.exceptions.MissingSchema as e:
                 print(f"URL format error for {url}: {e}")
                 return None
             except requests.exceptions.RequestException as e:
                 print(f"Request error for {url} (attempt {attempt + 1}): {e}")
-                if attempt < retries - 1:
+                if attempt < retries - 1 and not self.offline:
                     time.sleep(2 ** attempt)  # 지수적 백오프
                 else:
+                    self.metrics.count('page_failure', reason='request')
                     return None
             except Exception as e:
                 print(f"Unexpected error fetching {url} (attempt {attempt + 1}): {e}")
                 if attempt < retries - 1:
                     time.sleep(2 ** attempt)  # 지수적 백오프
                 else:
+                    self.metrics.count('page_failure', reason='error')
                     return None
     
     def start_browser(self):
         """Playwright 브라우저를 빠르게 시작합니다."""
         if self.playwright is None:
-            self.playwright = sync_playwright().start()
-            
-            # 최적화된 브라우저 옵션
-            browser_options = {
-                'headless': True,
-                'args': [
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-images',  # 이미지 로딩 비활성화
-                    '--disable-plugins',
-                    '--disable-extensions'
-                ]
-            }
-            
-            self.browser = self.playwright.chromium.launch(**browser_options)
-            
-            # 빠른 컨텍스트 생성
-            context = self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                accept_downloads=True,
-                ignore_https_errors=True  # SSL 오류 무시
-            )
-            
-            self.page = context.new_page()
-            
-            # 타임아웃 단축
-            self.page.set_default_timeout(30000)
-            
-            # 다이얼로그 자동 처리 (간소화)
-            self.page.on("dialog", lambda dialog: dialog.accept())
+            playwright = sync_playwright().start()
+            browser = None
+            try:
+                browser = playwright.chromium.launch(**BROWSER_OPTIONS)
+                
+                # 빠른 컨텍스트 생성
+                context = browser.new_context(**CONTEXT_OPTIONS)
+                
+                page = context.new_page()
+                
+                # 타임아웃 단축
+                page.set_default_timeout(30000)
+                
+                # 다이얼로그 자동 처리 (간소화)
+                page.on("dialog", lambda dialog: dialog.accept())
+            except Exception:
+                # 반쯤 시작된 상태로 남기지 않음 (다음 문서에서 처음부터 다시 시도)
+                if browser is not None:
+                    browser.close()
+                playwright.stop()
+                raise
+            self.playwright, self.browser, self.page = playwright, browser, page
     
     def close_browser(self):
         """Playwright 브라우저를 종료합니다."""
@@ -114,8 +277,21 @@ class SejongClassicCrawler:
         """파일명에서 특수문자를 제거합니다."""
         return re.sub(r'[<>:"/\\|?*]', '_', filename).strip()
     
+    def fallback_filename(self, detail_url, filename_prefix=""):
+        """다운로드 파일명을 알 수 없을 때 recordId로 만든 백업 파일명"""
+        url_parts = urllib.parse.urlparse(detail_url)
+        query_params = urllib.parse.parse_qs(url_parts.query)
+        record_id = query_params.get('recordId', ['unknown'])[0]
+        filename = f"{filename_prefix}_{record_id}.xml" if filename_prefix else f"{record_id}.xml"
+        return self.sanitize_filename(filename)
+    
     def load_downloaded_classics(self):
-        """이미 다운로드된 고전 목록을 파일에서 읽어옵니다."""
+        """이미 다운로드된 고전 목록을 파일에서 읽어옵니다. 실행마다 한 번만 읽습니다."""
+        if self._downloaded_classics is None:
+            self._downloaded_classics = self._read_downloaded_classics()
+        return self._downloaded_classics
+    
+    def _read_downloaded_classics(self):
         try:
             if self.downloaded_classics_file.exists():
                 with open(self.downloaded_classics_file, 'r', encoding='utf-8') as f:
@@ -136,11 +312,12 @@ class SejongClassicCrawler:
     def save_downloaded_classic(self, title):
         """다운로드 완료된 고전의 제목을 파일에 저장합니다."""
         try:
-            # 중복 방지를 위해 기존 목록 확인
+            # 중복 방지를 위해 기존 목록 확인 (메모리의 목록 사용)
             downloaded = self.load_downloaded_classics()
             if title not in downloaded:
                 with open(self.downloaded_classics_file, 'a', encoding='utf-8') as f:
                     f.write(f"{title}\n")
+                downloaded.add(title)
                 print(f"  📝 다운로드 완료 기록: {title}")
             return True
         except Exception as e:
@@ -161,8 +338,8 @@ class SejongClassicCrawler:
             if len(downloaded_classics) > 5:
                 print(f"  ... 외 {len(downloaded_classics) - 5}개")
         
-        soup = self.get_soup(main_url)
-        if not soup:
+        doc = self.get_document(main_url)
+        if doc is None:
             print("메인 페이지를 가져올 수 없습니다.")
             return []
         
@@ -171,21 +348,21 @@ class SejongClassicCrawler:
         
         # 테이블에서 고전 링크들 추출
         # 테이블의 tbody 안에서 두 번째 열(내용 열)에 있는 링크들을 찾기
-        table = soup.find('table')
+        table = TABLE(doc)
         if table:
-            tbody = table.find('tbody')
+            tbody = TBODY(table[0])
             if tbody:
-                rows = tbody.find_all('tr')
+                rows = ROW(tbody[0])
                 for row in rows:
-                    cells = row.find_all('td')
+                    cells = CELL(row)
                     if len(cells) >= 2:  # 최소 2개 열이 있어야 함
                         # 두 번째 열(내용 열)에서 링크 찾기
                         content_cell = cells[1]
-                        link = content_cell.find('a', href=True)
+                        link = LINK(content_cell)
                         
                         if link:
-                            href = link.get('href')
-                            title = link.get_text(strip=True)
+                            href = link[0].get('href')
+                            title = element_text(link[0])
                             
                             # booklist.do 또는 contentlist.do 링크만 처리
                             if href and ('booklist.do' in href or 'contentlist.do' in href):
@@ -216,6 +393,7 @@ class SejongClassicCrawler:
         """빠르게 링크 타입을 결정합니다."""
         try:
             # 빠른 접속으로 리다이렉트 후 최종 URL 확인
+            self.wait_rate_limit(url)
             response = self.session.get(url, timeout=15, allow_redirects=True)
             response.raise_for_status()
             
@@ -228,12 +406,11 @@ class SejongClassicCrawler:
                 return 'booklist'
             else:
                 # 페이지 내용으로 빠른 판별
-                response.encoding = 'utf-8'
-                soup = BeautifulSoup(response.text, 'html.parser')
+                doc = parse_html(response.content, 'utf-8')
                 
-                if soup.find('ul', class_='dep_01'):
+                if doc is not None and DEP_01(doc):
                     return 'contentlist'
-                elif soup.find('table', class_='bookListTable'):
+                elif doc is not None and BOOK_LIST_TABLE(doc):
                     return 'booklist'
                 else:
                     return 'unknown'
@@ -249,27 +426,28 @@ class SejongClassicCrawler:
     
     def get_detail_links_from_contentlist(self, url):
         """contentlist 페이지에서 detail 링크들을 추출합니다."""
-        soup = self.get_soup(url)
-        if not soup:
+        doc = self.get_document(url)
+        if doc is None:
             return []
         
         detail_links = []
         
         # <ul class="dep_01"> 안의 가장 자식 <ul> 태그들을 찾기
-        dep_01_lists = soup.find_all('ul', class_='dep_01')
+        dep_01_lists = DEP_01(doc)
         
         for dep_01 in dep_01_lists:
             # 가장 깊은 레벨의 ul 태그들 찾기
-            nested_uls = dep_01.find_all('ul')
+            nested_uls = UL(dep_01)
             
             for ul in nested_uls:
                 # 더 이상 중첩된 ul이 없는 경우만 처리
-                if not ul.find('ul'):
-                    li_elements = ul.find_all('li')
+                if not UL(ul):
+                    li_elements = LI(ul)
                     for li in li_elements:
-                        link = li.find('a', href=True)
-                        if link and 'detail.do' in link['href']:
-                            detail_url = link['href']
+                        link = LINK(li)
+                        link = link[0] if link else None
+                        if link is not None and 'detail.do' in link.get('href'):
+                            detail_url = link.get('href')
                             # URL 변환 개선
                             if detail_url.startswith('/'):
                                 detail_url = self.base_url + detail_url
@@ -277,7 +455,7 @@ class SejongClassicCrawler:
                                 detail_url = self.base_url + '/front/' + detail_url
                             
                             detail_links.append({
-                                'title': link.get_text(strip=True),
+                                'title': element_text(link),
                                 'url': detail_url
                             })
         
@@ -285,22 +463,22 @@ class SejongClassicCrawler:
     
     def get_detail_links_from_booklist(self, url):
         """booklist 페이지에서 contentlist 링크들을 먼저 찾고, 그 다음 detail 링크들을 추출합니다."""
-        soup = self.get_soup(url)
-        if not soup:
+        doc = self.get_document(url)
+        if doc is None:
             return []
         
         detail_links = []
         contentlist_found = False
         
         # <table class="bookListTable"> 안의 <tbody> 에서 링크들 찾기
-        table = soup.find('table', class_='bookListTable')
+        table = BOOK_LIST_TABLE(doc)
         if table:
-            tbody = table.find('tbody')
+            tbody = TBODY(table[0])
             if tbody:
-                links = tbody.find_all('a', href=True)
+                links = LINK(tbody[0])
                 
                 for link in links:
-                    href = link['href']
+                    href = link.get('href')
                     # URL 변환 개선
                     if href.startswith('/'):
                         href = self.base_url + href
@@ -310,7 +488,7 @@ class SejongClassicCrawler:
                     # contentlist 링크인 경우 재귀적으로 detail 링크들 추출
                     if 'contentlist.do' in href:
                         contentlist_found = True
-                        print(f"  권별 페이지에서 상세 링크 추출 중: {link.get_text(strip=True)}")
+                        print(f"  권별 페이지에서 상세 링크 추출 중: {element_text(link)}")
                         sub_details = self.get_detail_links_from_contentlist(href)
                         detail_links.extend(sub_details)
                 
@@ -318,7 +496,7 @@ class SejongClassicCrawler:
                 if not contentlist_found:
                     print("  contentlist 링크가 없음. 직접 detail 링크 검색 중...")
                     for link in links:
-                        href = link['href']
+                        href = link.get('href')
                         # URL 변환 개선
                         if href.startswith('/'):
                             href = self.base_url + href
@@ -328,161 +506,297 @@ class SejongClassicCrawler:
                         # detail 링크인 경우 직접 추가
                         if 'detail.do' in href:
                             detail_links.append({
-                                'title': link.get_text(strip=True),
+                                'title': element_text(link),
                                 'url': href
                             })
         
         return detail_links
     
-    def download_xml_from_detail(self, detail_url, save_dir, filename_prefix=""):
-        """detail 페이지에서 XML 파일을 빠르게 다운로드합니다."""
-        function_start = time.time()
+    def resolve_download_url(self, detail_url, doc):
+        """detail 페이지 트리(doc)에서 XML 다운로드 버튼의 href를 찾아 절대 URL로 반환합니다."""
+        # 모든 후보 셀렉터를 한 번의 순회로 찾고 우선순위 순으로 확인
+        for selector, link in zip(DOWNLOAD_SELECTORS, DOWNLOAD_BUTTONS.first_matches(doc)['button']):
+            if link is None:
+                continue
+            href = (link.get('href') or '').strip()
+            # 자바스크립트로 처리하는 버튼은 브라우저 경로로 넘김
+            if not href or href == '#' or href.lower().startswith('javascript:'):
+                continue
+            self.metrics.count('download_link', selector=selector)
+            return urllib.parse.urljoin(detail_url, href)
+        return None
+    
+    def filename_from_response(self, response):
+        """Content-Disposition 헤더에서 파일명을 꺼냅니다. 없으면 None"""
+        disposition = response.headers.get('Content-Disposition', '')
+        
+        # RFC 5987 형식 (filename*=UTF-8''...) 우선
+        match = re.search(r"filename\*\s*=\s*([^']*)'[^']*'([^;]+)", disposition, re.IGNORECASE)
+        if match:
+            charset = match.group(1) or 'utf-8'
+            return urllib.parse.unquote(match.group(2).strip(), encoding=charset)
+        
+        match = re.search(r'filename\s*=\s*"?([^";]+)"?', disposition, re.IGNORECASE)
+        if not match:
+            return None
+        filename = match.group(1).strip()
+        # requests는 헤더를 latin-1로 읽으므로 UTF-8 원본 바이트로 되돌림
         try:
-            # 브라우저가 시작되지 않았으면 시작
-            if self.page is None:
-                self.start_browser()
-            
-            # 저장 디렉토리 생성
-            save_dir = Path(save_dir)
-            save_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 페이지 로딩 (대기 시간 단축)
-            page_load_start = time.time()
-            self.page.goto(detail_url, wait_until='domcontentloaded', timeout=30000)
-            page_load_time = time.time() - page_load_start
-            print(f"    ⏱️ 페이지 로딩: {page_load_time:.2f}초")
-            
-            sleep_start = time.time()
-            time.sleep(1)  # 최소 대기
-            sleep_time = time.time() - sleep_start
-            print(f"    ⏱️ 페이지 안정화 대기: {sleep_time:.2f}초")
-            
-            # 다운로드 버튼 찾기 (핵심 셀렉터만 사용)
-            button_search_start = time.time()
-            download_selectors = [
-                'a.btn_down',
-                'a[class*="btn_down"]',
-                'a[href*="down"]',
-                '.btn_down'
-            ]
-            
-            download_element = None
-            for selector in download_selectors:
-                try:
-                    element = self.page.locator(selector).first
-                    if element.is_visible():
-                        download_element = element
-                        break
-                except:
-                    continue
-            button_search_time = time.time() - button_search_start
-            print(f"    ⏱️ 다운로드 버튼 찾기: {button_search_time:.2f}초")
+            filename = filename.encode('latin-1').decode('utf-8')
+        except UnicodeError:
+            pass
+        return urllib.parse.unquote(filename)
+    
+    def download_xml_direct(self, detail_url, save_dir, filename_prefix=""):
+        """
+        브라우저 없이 detail 페이지 HTML에서 다운로드 링크를 찾아 XML을 디스크로 바로 받습니다.
+        
+        Returns:
+            Path | bool: 저장한 파일 경로 (실패하면 False, 호출하는 쪽에서 브라우저 경로를 시도)
+        """
+        metrics = self.metrics
+        with metrics.timer('direct.resolve'):
+            # detail 페이지도 다른 페이지처럼 재시도/백오프 (실패는 링크 없음과 따로 셈)
+            doc = self.get_document(detail_url)
+            download_url = self.resolve_download_url(detail_url, doc) if doc is not None else None
+        if doc is None:
+            metrics.count('direct_fallback', reason='request')
+            print(f"    ↪️ 상세 페이지를 받지 못함, 브라우저로 재시도")
+            return False
+        if not download_url:
+            metrics.count('direct_fallback', reason='no_link')
+            print(f"    ↪️ 다운로드 링크를 찾지 못함, 브라우저로 재시도")
+            return False
+        
+        save_dir = Path(save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = None
+        try:
+            self.wait_rate_limit(download_url)
+            with metrics.timer('direct.download'), \
+                    self.session.get(download_url, headers={'Referer': detail_url}, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                # 오류/알림 페이지가 HTML로 돌아온 경우
+                if 'text/html' in response.headers.get('Content-Type', ''):
+                    metrics.count('direct_fallback', reason='html')
+                    print(f"    ↪️ XML 대신 HTML 응답, 브라우저로 재시도")
+                    return False
+                
+                filename = self.filename_from_response(response)
+                filename = self.sanitize_filename(filename) if filename else self.fallback_filename(detail_url, filename_prefix)
+                final_path = save_dir / filename
+                temp_path = final_path.with_name(final_path.name + '.part')
+                
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
             
-            if not download_element:
-                function_time = time.time() - function_start
-                print(f"    ❌ 다운로드 버튼 없음: {detail_url}")
-                print(f"    ⏱️ 전체 처리 시간: {function_time:.2f}초")
+            size = temp_path.stat().st_size
+            if size == 0:
+                metrics.count('direct_fallback', reason='empty')
+                print(f"    ↪️ 빈 파일 응답, 브라우저로 재시도")
+                temp_path.unlink()
                 return False
-            
-            # 다운로드 실행
+            os.replace(temp_path, final_path)
+            metrics.count('bytes', size, path='direct')
+            print(f"    ✅ 저장 완료: {filename} ({size} bytes)")
+            return final_path
+        except Exception as e:
+            metrics.count('direct_fallback', reason='error')
+            print(f"    ↪️ 직접 다운로드 실패, 브라우저로 재시도: {e}")
+            if temp_path is not None and temp_path.exists():
+                temp_path.unlink()
+            return False
+    
+    def already_downloaded(self, detail_url):
+        """기록에 완료로 남아 있고 파일 크기/해시가 그대로인 문서면 True"""
+        path = self.journal.is_done(detail_url, self.download_dir)
+        if path:
+            print(f"    ⏭️ 이미 받은 문서: {Path(path).name}")
+            self.download_stats['journal'] += 1
+            self.metrics.count('document', outcome='skipped')
+            return True
+        return False
+    
+    def record_download(self, detail_url, saved_path, path_name):
+        """다운로드 결과를 경로별 횟수와 문서 기록에 남깁니다."""
+        record_id = urllib.parse.parse_qs(urllib.parse.urlparse(detail_url).query).get('recordId', [None])[0]
+        if saved_path:
+            self.download_stats[path_name] += 1
+            self.metrics.count('document', outcome='ok', path=path_name)
+            self.journal.mark_done(detail_url, saved_path, self.download_dir, record_id=record_id, via=path_name)
+            return True
+        self.download_stats['failed'] += 1
+        self.metrics.count('document', outcome='failed')
+        self.journal.mark_failed(detail_url, record_id=record_id)
+        return False
+    
+    def download_xml(self, detail_url, save_dir, filename_prefix=""):
+        """직접 다운로드를 먼저 시도하고, 실패한 페이지만 브라우저로 다운로드합니다."""
+        with self.metrics.timer('document.total'):
+            if self.direct:
+                saved_path = self.download_xml_direct(detail_url, save_dir, filename_prefix)
+                if saved_path:
+                    self.convert_saved(saved_path)
+                    return self.record_download(detail_url, saved_path, 'direct')
+            saved_path = None
+            if not self.offline:
+                saved_path = self.download_xml_from_detail(detail_url, save_dir, filename_prefix)
+            self.convert_saved(saved_path)
+            return self.record_download(detail_url, saved_path, 'browser')
+    
+    def convert_saved(self, saved_path):
+        """파이프라인 모드면 저장한 XML을 변환 작업자에 넘깁니다 (변환이 밀려 있으면 자리가 날 때까지 대기)."""
+        if self.converter is not None and saved_path:
+            self.converter.submit(saved_path)
+    
+    def unconverted_downloads(self):
+        """
+        이전 실행에서 받아 기록에 완료로 남았지만 txt가 없는 XML 경로 목록.
+        --convert로 이어받으면 건너뛰는 문서(와 고전)는 convert_saved를 거치지 않으므로 따로 변환합니다.
+        """
+        if self.converter is None:
+            return []
+        paths = []
+        for key in list(self.journal.entries):
+            path = self.journal.is_done(key, self.download_dir, check_hash=False)
+            if path and not self.converter.has_output(path):
+                paths.append(path)
+        if paths:
+            print(f"이전에 받았지만 변환되지 않은 XML {len(paths)}개도 txt로 변환합니다.")
+        return paths
+    
+    def convert_all_saved(self, paths):
+        for path in paths:
+            self.convert_saved(path)
+    
+    def close_converter(self):
+        if self.converter is not None:
+            self.converter.close()
+            self.converter = None
+    
+    def print_download_stats(self):
+        """다운로드 경로별 사용 횟수와 단계별 계측 요약을 출력합니다."""
+        stats = self.download_stats
+        print(f"다운로드 경로: 직접 {stats['direct']}개, 브라우저 {stats['browser']}개, "
+              f"기록으로 건너뜀 {stats['journal']}개, 실패 {stats['failed']}개")
+        if self.session.cache_dir:
+            print(self.session.summary())
+            self.metrics.add_counts('http_cache', self.session.stats)
+        self.metrics.print_summary()
+    
+    def download_xml_from_detail(self, detail_url, save_dir, filename_prefix=""):
+        """detail 페이지에서 XML 파일을 빠르게 다운로드합니다. 저장한 파일 경로를 반환합니다 (실패하면 False)."""
+        metrics = self.metrics
+        with metrics.timer('browser.total'):
             try:
-                download_start = time.time()
-                with self.page.expect_download(timeout=30000) as download_info:
-                    download_element.click()
-                    dialog_wait_start = time.time()
-                    time.sleep(1)  # 다이얼로그 대기 시간 단축
-                    dialog_wait_time = time.time() - dialog_wait_start
-                    print(f"    ⏱️ 다이얼로그 대기: {dialog_wait_time:.2f}초")
+                # 브라우저가 시작되지 않았으면 시작
+                if self.page is None:
+                    with metrics.timer('browser.start'):
+                        self.start_browser()
                 
-                download = download_info.value
-                download_time = time.time() - download_start
-                print(f"    ⏱️ 파일 다운로드: {download_time:.2f}초")
+                # 저장 디렉토리 생성
+                save_dir = Path(save_dir)
+                save_dir.mkdir(parents=True, exist_ok=True)
                 
-            except Exception as e:
-                # 대안: 직접 링크 접근
+                # 페이지 로딩 (대기 시간 단축)
+                with metrics.timer('browser.page_load'):
+                    self.page.goto(detail_url, wait_until='domcontentloaded', timeout=30000)
+                
+                with metrics.timer('browser.settle_wait'):
+                    time.sleep(1)  # 최소 대기
+                
+                # 다운로드 버튼 찾기 (핵심 셀렉터만 사용)
+                download_element = None
+                with metrics.timer('browser.button_search'):
+                    for selector in DOWNLOAD_SELECTORS:
+                        try:
+                            element = self.page.locator(selector).first
+                            if element.is_visible():
+                                download_element = element
+                                metrics.count('download_button', selector=selector)
+                                break
+                        except:
+                            continue
+                
+                if not download_element:
+                    metrics.count('browser_failure', reason='no_button')
+                    print(f"    ❌ 다운로드 버튼 없음: {detail_url}")
+                    return False
+                
+                # 다운로드 실행
                 try:
-                    alternative_start = time.time()
-                    href = download_element.get_attribute('href')
-                    if href:
-                        if href.startswith('/'):
-                            href = self.base_url + href
-                        
-                        new_page = self.page.context.new_page()
-                        with new_page.expect_download(timeout=30000) as download_info:
-                            new_page.goto(href)
+                    with metrics.timer('browser.download'):
+                        with self.page.expect_download(timeout=30000) as download_info:
+                            download_element.click()
+                            with metrics.timer('browser.dialog_wait'):
+                                time.sleep(1)  # 다이얼로그 대기 시간 단축
                         download = download_info.value
-                        new_page.close()
-                    else:
-                        function_time = time.time() - function_start
-                        print(f"    ⏱️ 전체 처리 시간: {function_time:.2f}초")
+                    
+                except Exception as e:
+                    # 대안: 직접 링크 접근
+                    metrics.count('browser_fallback', reason='click_download')
+                    try:
+                        with metrics.timer('browser.alt_download'):
+                            href = download_element.get_attribute('href')
+                            if href:
+                                if href.startswith('/'):
+                                    href = self.base_url + href
+                                
+                                new_page = self.page.context.new_page()
+                                with new_page.expect_download(timeout=30000) as download_info:
+                                    new_page.goto(href)
+                                download = download_info.value
+                                new_page.close()
+                            else:
+                                metrics.count('browser_failure', reason='no_href')
+                                return False
+                    except:
+                        metrics.count('browser_failure', reason='alt_download')
                         return False
-                    alternative_time = time.time() - alternative_start
-                    print(f"    ⏱️ 대안 다운로드 방법: {alternative_time:.2f}초")
-                except:
-                    function_time = time.time() - function_start
-                    print(f"    ⏱️ 전체 처리 시간: {function_time:.2f}초")
-                    return False
-            
-            # 파일명 설정
-            filename_start = time.time()
-            try:
-                filename = self.sanitize_filename(download.suggested_filename)
-            except:
-                # 백업 파일명
-                url_parts = urllib.parse.urlparse(detail_url)
-                query_params = urllib.parse.parse_qs(url_parts.query)
-                record_id = query_params.get('recordId', ['unknown'])[0]
-                filename = f"{filename_prefix}_{record_id}.xml" if filename_prefix else f"{record_id}.xml"
-                filename = self.sanitize_filename(filename)
-            filename_time = time.time() - filename_start
-            print(f"    ⏱️ 파일명 설정: {filename_time:.2f}초")
-            
-            # 파일 저장
-            save_start = time.time()
-            final_path = save_dir / filename
-            download.save_as(final_path)
-            save_time = time.time() - save_start
-            print(f"    ⏱️ 파일 저장: {save_time:.2f}초")
-            
-            save_wait_start = time.time()
-            time.sleep(0.5)  # 저장 대기 시간 단축
-            save_wait_time = time.time() - save_wait_start
-            print(f"    ⏱️ 저장 완료 대기: {save_wait_time:.2f}초")
-            
-            # 저장 성공 확인
-            if final_path.exists() and final_path.stat().st_size > 0:
-                file_size = final_path.stat().st_size
-                function_time = time.time() - function_start
-                print(f"    ✅ 저장 완료: {filename} ({file_size} bytes)")
-                print(f"    ⏱️ 전체 다운로드 시간: {function_time:.2f}초")
-                return True
-            else:
-                # 대안: 직접 복사
+                
+                # 파일명 설정
                 try:
-                    alternative_save_start = time.time()
-                    download_path = Path(download.path())
-                    if download_path.exists():
-                        shutil.copy2(download_path, final_path)
-                        if final_path.exists() and final_path.stat().st_size > 0:
-                            alternative_save_time = time.time() - alternative_save_start
-                            print(f"    ⏱️ 대안 저장 방법: {alternative_save_time:.2f}초")
-                            function_time = time.time() - function_start
-                            print(f"    ✅ 저장 완료: {filename}")
-                            print(f"    ⏱️ 전체 다운로드 시간: {function_time:.2f}초")
-                            return True
+                    filename = self.sanitize_filename(download.suggested_filename)
                 except:
-                    pass
+                    filename = self.fallback_filename(detail_url, filename_prefix)
+                
+                # 파일 저장
+                final_path = save_dir / filename
+                with metrics.timer('browser.save'):
+                    download.save_as(final_path)
+                
+                with metrics.timer('browser.save_wait'):
+                    time.sleep(0.5)  # 저장 대기 시간 단축
                 
-                function_time = time.time() - function_start
-                print(f"    ❌ 저장 실패: {filename}")
-                print(f"    ⏱️ 전체 처리 시간: {function_time:.2f}초")
+                # 저장 성공 확인
+                if final_path.exists() and final_path.stat().st_size > 0:
+                    file_size = final_path.stat().st_size
+                    metrics.count('bytes', file_size, path='browser')
+                    print(f"    ✅ 저장 완료: {filename} ({file_size} bytes)")
+                    return final_path
+                else:
+                    # 대안: 직접 복사
+                    metrics.count('browser_fallback', reason='save_copy')
+                    try:
+                        download_path = Path(download.path())
+                        if download_path.exists():
+                            shutil.copy2(download_path, final_path)
+                            if final_path.exists() and final_path.stat().st_size > 0:
+                                metrics.count('bytes', final_path.stat().st_size, path='browser')
+                                print(f"    ✅ 저장 완료: {filename}")
+                                return final_path
+                    except:
+                        pass
+                    
+                    metrics.count('browser_failure', reason='save')
+                    print(f"    ❌ 저장 실패: {filename}")
+                    return False
+                
+            except Exception as e:
+                metrics.count('browser_failure', reason='error')
+                print(f"    ❌ 다운로드 실패: {e}")
                 return False
-            
-        except Exception as e:
-            function_time = time.time() - function_start
-            print(f"    ❌ 다운로드 실패: {e}")
-            print(f"    ⏱️ 전체 처리 시간: {function_time:.2f}초")
-            return False
     
     def crawl_classic(self, classic_info):
         """개별 고전을 크롤링합니다."""
@@ -499,19 +813,7 @@ class SejongClassicCrawler:
         classic_dir = self.download_dir / safe_title
         classic_dir.mkdir(exist_ok=True)
         
-        # 링크 타입에 따라 detail 링크들 추출
-        detail_links = []
-        
-        if link_type == 'contentlist':
-            detail_links = self.get_detail_links_from_contentlist(url)
-        elif link_type == 'booklist':
-            detail_links = self.get_detail_links_from_booklist(url)
-        
-        print(f"  {len(detail_links)}개의 상세 페이지를 찾았습니다.")
-        
-        if len(detail_links) == 0:
-            print(f"  경고: '{title}' 고전에서 상세 페이지를 찾을 수 없습니다.")
-            print(f"  페이지 구조를 확인하세요: {url}")
+        detail_links = self.get_detail_links(classic_info)
         
         # XML 파일들 다운로드
         success_count = 0
@@ -523,45 +825,79 @@ class SejongClassicCrawler:
                 print(f"    잘못된 URL 형식: {detail.get('url', 'None')}")
                 continue
             
-            if self.download_xml_from_detail(detail['url'], classic_dir, safe_title):
+            # 이전 실행에서 받은 문서는 파일 확인만 하고 딜레이 없이 넘어감
+            if self.already_downloaded(detail['url']):
+                success_count += 1
+                continue
+            
+            if self.download_xml(detail['url'], classic_dir, safe_title):
                 success_count += 1
             
             # 서버 부하 방지를 위한 최소 딜레이
-            time.sleep(0.5)
+            time.sleep(self.delay)
+        
+        self.record_classic_result(title, success_count, len(detail_links))
+        return success_count
+    
+    def get_detail_links(self, classic_info):
+        """링크 타입에 따라 고전의 detail 링크들을 추출합니다."""
+        title = classic_info['title']
+        url = classic_info['url']
+        link_type = classic_info['type']
         
-        print(f"고전 '{title}' 크롤링 완료: {success_count}/{len(detail_links)} 파일 다운로드")
+        detail_links = []
+        
+        if link_type == 'contentlist':
+            detail_links = self.get_detail_links_from_contentlist(url)
+        elif link_type == 'booklist':
+            detail_links = self.get_detail_links_from_booklist(url)
+        
+        print(f"  {len(detail_links)}개의 상세 페이지를 찾았습니다.")
         
-        # 다운로드 완료 기록 (모든 파일이 성공적으로 다운로드된 경우 또는 detail 링크가 없는 경우)
         if len(detail_links) == 0:
+            print(f"  경고: '{title}' 고전에서 상세 페이지를 찾을 수 없습니다.")
+            print(f"  페이지 구조를 확인하세요: {url}")
+        
+        return detail_links
+    
+    def record_classic_result(self, title, success_count, total_count):
+        """고전 하나의 다운로드 결과를 출력하고, 모두 성공했으면 완료로 기록합니다."""
+        print(f"고전 '{title}' 크롤링 완료: {success_count}/{total_count} 파일 다운로드")
+        
+        # 다운로드 완료 기록 (모든 파일이 성공적으로 다운로드된 경우 또는 detail 링크가 없는 경우)
+        if total_count == 0:
             print(f"  ⚠️ '{title}' 고전에 다운로드할 파일이 없습니다.")
             # detail 링크가 없는 경우도 완료로 기록 (재시도 방지)
             self.save_downloaded_classic(title)
-        elif success_count == len(detail_links):
+        elif success_count == total_count:
             print(f"  ✅ '{title}' 고전의 모든 파일이 성공적으로 다운로드되었습니다!")
             self.save_downloaded_classic(title)
         elif success_count > 0:
-            print(f"  ⚠️ '{title}' 고전의 일부 파일만 다운로드되었습니다. ({success_count}/{len(detail_links)})")
+            print(f"  ⚠️ '{title}' 고전의 일부 파일만 다운로드되었습니다. ({success_count}/{total_count})")
             print(f"     다음 실행 시 다시 시도됩니다.")
         else:
             print(f"  ❌ '{title}' 고전의 파일을 다운로드할 수 없었습니다.")
             print(f"     다음 실행 시 다시 시도됩니다.")
-        
-        return success_count
     
     def crawl_all(self):
         """모든 고전을 크롤링합니다."""
         print("세종한글고전 사이트 크롤링을 시작합니다...")
         
         try:
-            # Playwright 브라우저 시작
-            print("브라우저를 시작합니다...")
-            self.start_browser()
+            # 브라우저는 직접 다운로드가 실패한 페이지가 처음 나올 때 시작
+            if not self.direct:
+                print("브라우저를 시작합니다...")
+                self.start_browser()
+            
+            # 이번 실행에서 받는 문서와 겹치지 않도록 크롤링 전에 목록을 만들고, 변환은 크롤링 뒤에 예약
+            unconverted = self.unconverted_downloads()
             
             # 메인 페이지에서 모든 고전 링크 추출
             classic_links = self.get_main_links()
             
             if not classic_links:
                 print("고전 링크를 찾을 수 없습니다.")
+                self.convert_all_saved(unconverted)
                 return
             
             total_files = 0
@@ -575,7 +911,7 @@ class SejongClassicCrawler:
                     total_files += files_downloaded
                     
                     # 각 고전 사이의 최소 딜레이
-                    time.sleep(1)
+                    time.sleep(self.delay * 2)
                     
                 except KeyboardInterrupt:
                     print("\n사용자에 의해 중단되었습니다.")
@@ -587,40 +923,11 @@ class SejongClassicCrawler:
             print(f"\n=== 크롤링 완료 ===")
             print(f"총 {len(classic_links)}개 고전에서 {total_files}개 파일을 다운로드했습니다.")
             print(f"저장 위치: {self.download_dir.absolute()}")
+            self.convert_all_saved(unconverted)
+            self.close_converter()
+            self.print_download_stats()
             
-            # 실제 저장된 파일들 확인
-            print(f"\n=== 저장된 파일 확인 ===")
-            if self.download_dir.exists():
-                all_files = list(self.download_dir.rglob("*.xml"))
-                print(f"실제 저장된 XML 파일 수: {len(all_files)}")
-                
-                if len(all_files) > 0:
-                    print(f"저장된 파일들:")
-                    for file in all_files[:10]:  # 처음 10개만 표시
-                        file_size = file.stat().st_size
-                        relative_path = file.relative_to(self.download_dir)
-                        print(f"  - {relative_path} ({file_size} bytes)")
-                    
-                    if len(all_files) > 10:
-                        print(f"  ... 외 {len(all_files) - 10}개 파일")
-                        
-                    # 폴더별 파일 수 통계
-                    folder_stats = {}
-                    for file in all_files:
-                        folder = file.parent.name
-                        folder_stats[folder] = folder_stats.get(folder, 0) + 1
-                    
-                    print(f"\n폴더별 파일 수:")
-                    for folder, count in folder_stats.items():
-                        print(f"  - {folder}: {count}개 파일")
-                else:
-                    print("❌ 저장된 XML 파일이 없습니다!")
-                    print("문제 해결을 위한 제안:")
-                    print("1. 인터넷 연결 상태 확인")
-                    print("2. 사이트 접근 권한 확인")
-                    print("3. Playwright 브라우저 설치 확인: playwright install chromium")
-            else:
-                print(f"❌ 저장 디렉토리가 존재하지 않습니다: {self.download_dir.absolute()}")
+            self.print_saved_files()
             
         except KeyboardInterrupt:
             print("\n사용자에 의해 중단되었습니다.")
@@ -631,6 +938,249 @@ class SejongClassicCrawler:
             # 브라우저 정리
             print("브라우저를 종료합니다...")
             self.close_browser()
+            self.close_converter()
+            self.journal.close()
+            self.metrics.close()
+
+    def print_saved_files(self):
+        """다운로드 폴더에 실제 저장된 XML 파일을 확인합니다."""
+        print(f"\n=== 저장된 파일 확인 ===")
+        if self.download_dir.exists():
+            all_files = list(self.download_dir.rglob("*.xml"))
+            print(f"실제 저장된 XML 파일 수: {len(all_files)}")
+            
+            if len(all_files) > 0:
+                print(f"저장된 파일들:")
+                for file in all_files[:10]:  # 처음 10개만 표시
+                    file_size = file.stat().st_size
+                    relative_path = file.relative_to(self.download_dir)
+                    print(f"  - {relative_path} ({file_size} bytes)")
+                
+                if len(all_files) > 10:
+                    print(f"  ... 외 {len(all_files) - 10}개 파일")
+                    
+                # 폴더별 파일 수 통계
+                folder_stats = {}
+                for file in all_files:
+                    folder = file.parent.name
+                    folder_stats[folder] = folder_stats.get(folder, 0) + 1
+                
+                print(f"\n폴더별 파일 수:")
+                for folder, count in folder_stats.items():
+                    print(f"  - {folder}: {count}개 파일")
+            else:
+                print("❌ 저장된 XML 파일이 없습니다!")
+                print("문제 해결을 위한 제안:")
+                print("1. 인터넷 연결 상태 확인")
+                print("2. 사이트 접근 권한 확인")
+                print("3. Playwright 브라우저 설치 확인: playwright install chromium")
+        else:
+            print(f"❌ 저장 디렉토리가 존재하지 않습니다: {self.download_dir.absolute()}")
+
+    async def download_xml_from_detail_async(self, page, detail_url, save_dir, filename_prefix=""):
+        """
+        detail 페이지에서 XML 파일을 비동기로 다운로드합니다.
+        고정 sleep 대신 버튼 표시·다운로드 이벤트를 기다립니다.
+        저장한 파일 경로를 반환합니다 (실패하면 False).
+        """
+        metrics = self.metrics
+        try:
+            save_dir = Path(save_dir)
+            save_dir.mkdir(parents=True, exist_ok=True)
+            
+            with metrics.timer('browser_async.rate_wait'):
+                await self.rate_limiter.acquire(detail_url)
+            with metrics.timer('browser_async.page_load'):
+                await page.goto(detail_url, wait_until='domcontentloaded', timeout=30000)
+            
+            # 다운로드 버튼 중 하나가 보일 때까지 대기 (페이지 안정화 대기 대체)
+            try:
+                with metrics.timer('browser_async.button_wait'):
+                    await page.locator(', '.join(DOWNLOAD_SELECTORS)).first.wait_for(state='visible', timeout=10000)
+            except PlaywrightTimeoutError:
+                metrics.count('browser_failure', reason='no_button')
+                print(f"    ❌ 다운로드 버튼 없음: {detail_url}")
+                return False
+            
+            # 셀렉터 우선순위대로 버튼 선택
+            download_element = None
+            for selector in DOWNLOAD_SELECTORS:
+                element = page.locator(selector).first
+                if await element.is_visible():
+                    download_element = element
+                    metrics.count('download_button', selector=selector)
+                    break
+            if download_element is None:
+                metrics.count('browser_failure', reason='no_button')
+                print(f"    ❌ 다운로드 버튼 없음: {detail_url}")
+                return False
+            
+            # 다운로드 이벤트 대기 (다이얼로그는 페이지 핸들러가 자동 수락)
+            with metrics.timer('browser_async.rate_wait'):
+                await self.rate_limiter.acquire(detail_url)
+            with metrics.timer('browser_async.download'):
+                async with page.expect_download(timeout=30000) as download_info:
+                    await download_element.click()
+                download = await download_info.value
+            
+            try:
+                filename = self.sanitize_filename(download.suggested_filename)
+            except Exception:
+                filename = self.fallback_filename(detail_url, filename_prefix)
+            
+            # save_as는 다운로드가 끝날 때까지 기다린 뒤 저장
+            final_path = save_dir / filename
+            with metrics.timer('browser_async.save'):
+                await download.save_as(final_path)
+            
+            if final_path.exists() and final_path.stat().st_size > 0:
+                metrics.count('bytes', final_path.stat().st_size, path='browser')
+                print(f"    ✅ 저장 완료: {filename} ({final_path.stat().st_size} bytes)")
+                return final_path
+            metrics.count('browser_failure', reason='save')
+            print(f"    ❌ 저장 실패: {filename}")
+            return False
+        
+        except Exception as e:
+            print(f"    ❌ 다운로드 실패: {detail_url} - {e}")
+            return False
+    
+    def crawl_all_async(self, workers=4):
+        """여러 작업자가 공유 큐의 detail 페이지를 동시에 다운로드합니다 (직접 다운로드 실패 시 작업자별 브라우저 컨텍스트 사용)."""
+        print(f"세종한글고전 사이트 크롤링을 시작합니다... (동시 작업 {workers}개)")
+        
+        try:
+            asyncio.run(self._crawl_all_async(workers))
+            self.print_saved_files()
+        except KeyboardInterrupt:
+            print("\n사용자에 의해 중단되었습니다.")
+        except Exception as e:
+            print(f"크롤링 중 전체 오류 발생: {e}")
+        finally:
+            self._loop = None
+            self.close_converter()
+            self.journal.close()
+            self.metrics.close()
+            if self.temp_download_dir.exists():
+                shutil.rmtree(self.temp_download_dir, ignore_errors=True)
+    
+    async def _crawl_all_async(self, workers):
+        self._loop = asyncio.get_running_loop()
+        # 이전 실행에서 받았지만 변환되지 않은 XML은 크롤링과 함께 별도 스레드에서 변환 예약
+        unconverted = await asyncio.to_thread(self.unconverted_downloads)
+        classic_links = await asyncio.to_thread(self.get_main_links)
+        if not classic_links:
+            print("고전 링크를 찾을 수 없습니다.")
+            await asyncio.to_thread(self.convert_all_saved, unconverted)
+            return
+        
+        # 고전별 진행 상황: 모든 detail 처리가 끝난 순간에 완료 여부를 기록
+        progress = {}
+        queue = asyncio.Queue(maxsize=workers * 4)
+        
+        def finish_detail(key, success):
+            state = progress[key]
+            state['done'] += 1
+            state['success'] += int(success)
+            if state['done'] == state['total']:
+                self.record_classic_result(state['title'], state['success'], state['total'])
+        
+        async def produce():
+            # detail 링크 수집(requests)은 별도 스레드에서, 수집되는 대로 큐에 넣음
+            for i, classic in enumerate(classic_links, 1):
+                title = classic['title']
+                print(f"\n=== [{i}/{len(classic_links)}] {title} 상세 링크 수집 ===")
+                safe_title = self.sanitize_filename(title)
+                classic_dir = self.download_dir / safe_title
+                classic_dir.mkdir(exist_ok=True)
+                
+                detail_links = await asyncio.to_thread(self.get_detail_links, classic)
+                progress[i] = {'title': title, 'total': len(detail_links), 'done': 0, 'success': 0}
+                if not detail_links:
+                    self.record_classic_result(title, 0, 0)
+                    continue
+                for detail in detail_links:
+                    await queue.put((i, classic_dir, safe_title, detail))
+            for _ in range(workers):
+                await queue.put(None)
+        
+        async def accept_dialog(dialog):
+            await dialog.accept()
+        
+        async def download(get_page, url, classic_dir, safe_title):
+            # 기록 확인(해시 계산)과 직접 다운로드(requests)는 스레드에서, 실패하면 이 작업자의 브라우저 페이지로
+            if await asyncio.to_thread(self.already_downloaded, url):
+                return True
+            with self.metrics.timer('document.total'):
+                if self.direct:
+                    # detail 페이지와 파일 요청은 download_xml_direct 안에서 요청마다 토큰을 받음
+                    saved_path = await asyncio.to_thread(self.download_xml_direct, url, classic_dir, safe_title)
+                    if saved_path:
+                        # 변환 대기열이 가득 차면 이 작업자만 기다림 (이벤트 루프는 막지 않음)
+                        await asyncio.to_thread(self.convert_saved, saved_path)
+                        return self.record_download(url, saved_path, 'direct')
+                saved_path = None
+                if not self.offline:
+                    page = await get_page()
+                    saved_path = await self.download_xml_from_detail_async(page, url, classic_dir, safe_title)
+                await asyncio.to_thread(self.convert_saved, saved_path)
+                return self.record_download(url, saved_path, 'browser')
+        
+        browser = None
+        browser_lock = asyncio.Lock()
+        
+        async def work(playwright):
+            page = None
+            
+            async def get_page():
+                # 브라우저와 작업자별 컨텍스트는 처음 필요할 때 생성
+                nonlocal browser, page
+                if page is None:
+                    async with browser_lock:
+                        if browser is None:
+                            browser = await playwright.chromium.launch(**BROWSER_OPTIONS)
+                    context = await browser.new_context(**CONTEXT_OPTIONS)
+                    page = await context.new_page()
+                    page.set_default_timeout(30000)
+                    page.on("dialog", accept_dialog)
+                return page
+            
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                key, classic_dir, safe_title, detail = item
+                print(f"  [{progress[key]['title']}] {detail['title']} 다운로드 중...")
+                success = False
+                if detail.get('url') and detail['url'].startswith('http'):
+                    try:
+                        success = await download(get_page, detail['url'], classic_dir, safe_title)
+                    except Exception as e:
+                        # 브라우저 실행/컨텍스트 생성 실패 등은 이 문서만 실패로 기록하고 작업자는 계속 (crawl_all과 같이)
+                        print(f"    ❌ 다운로드 실패: {detail['url']} - {e}")
+                        self.metrics.count('browser_failure', reason='error')
+                        self.record_download(detail['url'], None, 'browser')
+                else:
+                    print(f"    잘못된 URL 형식: {detail.get('url', 'None')}")
+                finish_detail(key, success)
+            if page is not None:
+                await page.context.close()
+        
+        async with async_playwright() as playwright:
+            try:
+                await asyncio.gather(produce(), asyncio.to_thread(self.convert_all_saved, unconverted),
+                                     *(work(playwright) for _ in range(workers)))
+            finally:
+                if browser is not None:
+                    await browser.close()
+        
+        total_files = sum(state['success'] for state in progress.values())
+        print(f"\n=== 크롤링 완료 ===")
+        print(f"총 {len(classic_links)}개 고전에서 {total_files}개 파일을 다운로드했습니다.")
+        print(f"저장 위치: {self.download_dir.absolute()}")
+        await asyncio.to_thread(self.close_converter)
+        self.print_download_stats()
+
 
 def main():
     """메인 함수"""
@@ -640,12 +1190,46 @@ def main():
     print("  playwright install chromium")
     print("=" * 50)
     
+    parser = argparse.ArgumentParser(description="세종한글고전 XML 크롤러")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="동시에 다운로드할 브라우저 컨텍스트 수 (0이면 기존 순차 방식)")
+    parser.add_argument("--rate", type=float, default=2.0,
+                        help="비동기 모드의 초당 최대 페이지 요청 수")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="직접 다운로드를 건너뛰고 항상 브라우저로 다운로드")
+    parser.add_argument("--cache-dir", default=None,
+                        help="HTTP 응답을 저장할 캐시 폴더 (재실행 시 ETag/Last-Modified로 재검증)")
+    parser.add_argument("--offline", action="store_true",
+                        help="네트워크 없이 --cache-dir 캐시에서만 응답 (브라우저 사용 안 함)")
+    parser.add_argument("--metrics", default=None,
+                        help="단계별 소요 시간/카운터 이벤트를 기록할 JSONL 파일")
+    parser.add_argument("--base-url", default="http://db.sejongkorea.org",
+                        help="크롤링할 사이트 주소 (로컬 고정 응답 서버로 시험할 때 변경)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="순차 모드에서 문서 사이 딜레이(초)")
+    parser.add_argument("--convert", action="store_true",
+                        help="받은 XML을 크롤링과 동시에 txt로 변환 (xml2txt.py를 따로 실행할 필요 없음)")
+    parser.add_argument("--convert-jobs", type=int, default=None,
+                        help="--convert 변환 작업자 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--txt-dir", default=xml2txt.OUTPUT_DIR, help="--convert 변환 결과 폴더")
+    args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error("--offline에는 --cache-dir가 필요합니다")
+    if args.offline and args.browser_only:
+        parser.error("--offline과 --browser-only는 함께 쓸 수 없습니다")
+    
     try:
         # 크롤러 인스턴스 생성
-        crawler = SejongClassicCrawler()
+        crawler = SejongClassicCrawler(base_url=args.base_url, rate=args.rate, direct=not args.browser_only,
+                                       cache_dir=args.cache_dir, offline=args.offline,
+                                       metrics_file=args.metrics, delay=args.delay,
+                                       convert=args.convert, convert_jobs=args.convert_jobs, txt_dir=args.txt_dir)
         
         # 크롤링 시작
-        crawler.crawl_all()
+        if args.workers > 0:
+            crawler.crawl_all_async(args.workers)
+        else:
+            crawler.crawl_all()
         
     except ImportError as e:
         print(f"라이브러리 가져오기 오류: {e}")
@@ -1,30 +1,44 @@
+import argparse
+import contextlib
+import json
 import os
 import re
 import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from lxml import etree
-# OldHangeul 라이브러리에서 hNFD 함수를 가져옵니다.
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+# OldHangeul.hNFD와 같은 결과를 내는 빠른 첫가끝 변환 (OldHangeul 라이브러리의 변환표 사용)
 # 라이브러리가 설치되어 있지 않다면, 터미널(명령 프롬프트)에서 먼저 설치해주세요.
 # pip install OldHangeul
-from OldHangeul import hNFD
+from dataset_tools.catalog import Catalog, TextStats, text_stats, token_counter
+from dataset_tools.chat_records import encode_record, translation_record
+from dataset_tools.corpus_pack import CorpusPackWriter
+from dataset_tools.hnfd import hnfd, hnfd_many
 
 # 스크립트가 어디서 실행되든, 스크립트 파일 기준 상대 경로 사용
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.join(SCRIPT_DIR, "세종 한글 고전 xml")       # 원본 XML 폴더
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "세종 한글 고전 txt")    # 결과 TXT 폴더
+PAIRS_DIR = os.path.join(SCRIPT_DIR, "세종 한글 고전 jsonl")   # --pairs 결과 JSONL 폴더
+PACK_DIR = os.path.join(SCRIPT_DIR, "세종 한글 고전 pack")     # --pack 결과 말뭉치 팩 폴더
 
-# 입력 폴더 존재 확인 (없으면 안내 후 종료)
-if not os.path.isdir(BASE_DIR):
-    # 콘솔 인코딩 이슈 대비 안전 출력
-    enc = (getattr(sys.stdout, "encoding", None) or "utf-8")
-    msg1 = f"입력 폴더를 찾을 수 없습니다: {BASE_DIR}"
-    msg2 = "실제 폴더 경로를 확인하거나 스크립트를 해당 폴더가 있는 위치에서 실행하세요."
-    try:
-        print(msg1)
-        print(msg2)
-    except UnicodeEncodeError:
-        print(msg1.encode(enc, "replace").decode(enc, "replace"))
-        print(msg2.encode(enc, "replace").decode(enc, "replace"))
-    exit(0)
+# --pairs로 한 번에 쓰는 번역 방향별 JSONL 파일 (jsonl 제작/json 만들기.py와 같은 이름)
+PAIR_FILES = {
+    ("근대국어", "현대국어"): "근대_현대.jsonl",
+    ("현대국어", "근대국어"): "현대_근대.jsonl",
+    ("중세국어", "현대국어"): "중세_현대.jsonl",
+    ("현대국어", "중세국어"): "현대_중세.jsonl",
+}
+
+# 스트리밍 입력에서 한 번에 읽는 크기
+CHUNK_SIZE = 64 * 1024
+# 결과 txt를 메모리에 모으는 최대 글자 수 (넘으면 임시 파일에 이어 씀)
+SPILL_SIZE = 1024 * 1024
 
 # 안전 출력 함수 (Windows cp949 콘솔 등에서의 깨짐 방지)
 def safe_print(message: str) -> None:
@@ -49,107 +63,709 @@ def extract_years(date_elements):
                 years.append(y)
     return years
 
-def get_period_from_xml(root):
-    """XML에서 올바른 연도를 추출하여 시기 구분"""
-    출판일_elems = root.findall(".//출판일")
-    years = extract_years(출판일_elems)
+def period_from_years(years):
+    """출판일 연도 목록으로 시기 구분"""
     if not years:
         return "중세국어"  # 혹시 없으면 기본값
     year = min(years)  # 가장 오래된 연도를 선택
     return "중세국어" if year <= 1592 else "근대국어"
 
+def get_period_from_xml(root):
+    """XML에서 올바른 연도를 추출하여 시기 구분"""
+    return period_from_years(extract_years(root.findall(".//출판일")))
+
+def _collect_text(element, parts):
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        # <원본위치>는 태그ごと 건너뜀 (주석/처리 지시의 내용도 제외). 뒤에 붙은 실제 텍스트는 보존
+        if isinstance(child.tag, str) and child.tag != "원본위치":
+            _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+def element_text(element):
+    """
+    태그 안의 모든 텍스트 (단, <원본위치>는 태그ごと 제외, 첫가끝 변환 전)
+    트리를 바꾸지 않으며, etree.tostring(method="text")처럼 태그 뒤의 텍스트(tail)까지 포함해 strip합니다.
+    """
+    parts = []
+    _collect_text(element, parts)
+    if element.tail:
+        parts.append(element.tail)
+    return "".join(parts).strip()
+
+
 def get_full_text(element):
     """태그 안의 모든 텍스트 추출 후 첫가끝 코드로 변환 (단, <원본위치>는 태그ごと 제거)"""
-    for pos in element.findall(".//원본위치"):
-        parent = pos.getparent()
-        if pos.tail:  # 원본위치 뒤에 붙은 실제 텍스트 보존
-            prev = pos.getprevious()
-            if prev is not None:
-                prev.tail = (prev.tail or "") + pos.tail
+    return hnfd(element_text(element))
+
+# ---- 잘못된 </저자정보> 중복 닫힘 태그 교정 (바이트 단위 스트림 필터) ----
+# 예전 str 정규식의 \s와 같은 공백 문자 집합을 UTF-8 바이트로 (U+3000 등 유니코드 공백 포함)
+_WS = b"(?:" + b"|".join(re.escape(chr(i).encode("utf-8"))
+                         for i in range(0x3001) if re.match(r"\s", chr(i))) + b")"
+_AUTHOR_CLOSE = "</저자정보>".encode("utf-8")
+_REPAIRS = [
+    (re.compile(re.escape(_AUTHOR_CLOSE) + _WS + b"*<(?=(" + "한글|한자|출판일".encode("utf-8") + b"))"),
+     "<저자정보><".encode("utf-8")),
+    (re.compile(re.escape(_AUTHOR_CLOSE) + _WS + b"*~~" + _WS + b"*" + re.escape(_AUTHOR_CLOSE)),
+     _AUTHOR_CLOSE),
+]
+# 버퍼 끝에서 아직 교정 대상이 될 수 있는 </저자정보> 뒷부분
+# (공백, ~, </저자정보>, 닫히지 않은 태그나 청크 경계에서 잘린 UTF-8 문자)
+_PENDING_TAIL = re.compile(b"(?:" + _WS + b"|~|" + re.escape(_AUTHOR_CLOSE) + b")*"
+                           b"(?:<[^<>]*|[\xc0-\xff][\x80-\xbf]*)?\Z")
+
+
+def repair_bytes(data):
+    """</저자정보> 교정을 바이트열 전체에 적용"""
+    for pattern, replacement in _REPAIRS:
+        data = pattern.sub(replacement, data)
+    return data
+
+
+class RepairedStream:
+    """
+    파일을 CHUNK_SIZE씩 읽으면서 </저자정보> 교정을 적용하는 읽기 전용 파일 객체 (iterparse 입력).
+    교정 패턴이 청크 경계에 걸칠 수 있는 부분은 다음 청크가 올 때까지 남겨 두므로
+    파일 전체에 정규식을 적용한 것과 같은 바이트를 냅니다.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self._f = f
+        self.chunk_size = chunk_size
+        self._pending = b""
+        self._out = b""
+        self._eof = False
+
+    @staticmethod
+    def _safe_end(buf):
+        """buf에서 교정이 확정된 부분의 끝 위치"""
+        end = len(buf)
+        lt = buf.rfind(b"<")
+        if lt != -1 and buf.find(b">", lt) == -1:
+            end = lt  # 닫히지 않은 태그 (</저자정보 일부일 수 있음)
+        pos = buf.find(_AUTHOR_CLOSE)
+        while pos != -1 and pos < end:
+            if _PENDING_TAIL.match(buf, pos + len(_AUTHOR_CLOSE)):
+                return pos
+            pos = buf.find(_AUTHOR_CLOSE, pos + 1)
+        return end
+
+    def read(self, size=-1):
+        while not self._eof and (size < 0 or len(self._out) < size):
+            chunk = self._f.read(self.chunk_size)
+            if chunk:
+                buf = self._pending + chunk
+                end = self._safe_end(buf)
+                ready, self._pending = buf[:end], buf[end:]
             else:
-                parent.text = (parent.text or "") + pos.tail
-        parent.remove(pos)  # 태그 삭제
-
-    # 1. 태그 내의 모든 텍스트를 추출합니다.
-    original_text = etree.tostring(element, method="text", encoding="utf-8").decode("utf-8").strip()
-    
-    # 2. 추출된 텍스트를 hNFD 함수를 이용해 첫가끝 코드로 변환합니다.
-    converted_text = hNFD(original_text)
-    
-    # 3. 변환된 텍스트를 반환합니다.
-    return converted_text
-
-def process_xml(xml_path, rel_path):
-    # 원본 읽기
-    with open(xml_path, encoding="utf-8") as f:
-        xml_text = f.read()
-
-    # 잘못된 </저자정보> 중복 닫힘 태그 교정
-    xml_text = re.sub(r"</저자정보>\s*<(?=(한글|한자|출판일))", "<저자정보><", xml_text)
-    xml_text = re.sub(r"</저자정보>\s*~~\s*</저자정보>", "</저자정보>", xml_text)
-
-    # xml 파싱 (교정된 것만 허용)
-    parser = etree.XMLParser(recover=False)
-    root = etree.fromstring(xml_text.encode("utf-8"), parser)
-
-    # 출판연도 -> 시기 분류
-    period = get_period_from_xml(root)
-
-    본문 = root.find("본문")
-    if 본문 is None:
-        return
+                ready, self._pending, self._eof = self._pending, b"", True
+            self._out += repair_bytes(ready)
+        if size < 0 or size >= len(self._out):
+            data, self._out = self._out, b""
+        else:
+            data, self._out = self._out[:size], self._out[size:]
+        return data
 
-    lines_언해 = []
-    lines_번역문 = []
 
-    for 기사 in 본문.findall("기사"):
-        원문들 = 기사.findall(".//원문") + 기사.findall(".//언해")
-        번역문들 = 기사.findall(".//번역문")
+class _TextOutput:
+    """
+    결과 txt 하나의 텍스트 조각(첫가끝 변환 전)을 모았다가 한 번에 변환해 "\n\n"으로 이어 씀 (빈 조각은 제외).
+    모은 크기가 SPILL_SIZE를 넘으면 출력 폴더의 임시 파일로 옮겨 쓰고, 마지막에 제자리로 옮김
+    stats(dataset_tools.catalog.TextStats)를 주면 파일에 쓰는 조각을 그대로 넣음 (sha256은 txt 파일 내용의 해시)
+    """
 
-        for 원문 in 원문들:
-            # get_full_text 함수가 이제 변환된 텍스트를 반환합니다.
-            text = get_full_text(원문)
-            if text:
-                lines_언해.append(text)
+    def __init__(self, directory, stats=None):
+        self.directory = directory
+        self.stats = stats
+        self._parts = []
+        self._size = 0
+        self._tmp_path = None
+        self._f = None
+        self._written = False
+
+    def add(self, text):
+        if self._f is not None:
+            self._write(hnfd_many([text]))
+            return
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size > SPILL_SIZE:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, self._tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+            self._f = os.fdopen(fd, "w", encoding="utf-8")
+            self._write(hnfd_many(self._parts))
+            self._parts = []
 
-        for 번역문 in 번역문들:
-            # get_full_text 함수가 이제 변환된 텍스트를 반환합니다.
-            text = get_full_text(번역문)
+    def _write(self, texts):
+        for text in texts:
             if text:
-                lines_번역문.append(text)
+                if self._written:
+                    self._f.write("\n\n")
+                self._f.write(text)
+                self._written = True
+                if self.stats is not None:
+                    self.stats.add(text)
+
+    def commit(self, final_path):
+        if self._f is not None:
+            if not self._written:
+                self.discard()
+                return
+            self._f.close()
+            self._f = None
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(self._tmp_path, final_path)
+            return
+        texts = [text for text in hnfd_many(self._parts) if text]
+        if self.stats is not None:
+            for text in texts:
+                self.stats.add(text)
+        if texts:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            with open(final_path, "w", encoding="utf-8") as f:
+                f.write("\n\n".join(texts))
+
+    def discard(self):
+        self._parts = []
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+            os.remove(self._tmp_path)
+
 
-    # 저장 경로 유지
+def _is_top_level(elem):
+    parent = elem.getparent()
+    return parent is not None and parent.getparent() is None
+
+
+def iter_articles(f, state):
+    """
+    교정한 입력 스트림에서 루트 바로 아래 첫 <본문>의 <기사>를 차례로 냅니다 (예전 본문.findall("기사")와 같음).
+    받는 쪽의 처리가 끝나면 기사와 그 앞의 형제 요소를 비우므로 메모리 사용량이 파일 크기와 무관합니다.
+
+    Args:
+        f: 바이너리 모드로 연 XML 파일
+        state (dict): 읽는 동안 "earliest"(출판일 중 가장 이른 연도), "years"(출판일 연도 전체),
+                      "title"(첫 번째 <서명>)과 "body"(<본문>을 찾았는지)를 기록
+    """
+    state.setdefault("earliest", None)
+    state.setdefault("years", [])
+    state.setdefault("title", None)
+    state.setdefault("body", False)
+    body_closed = False  # 루트 바로 아래 첫 번째 <본문>이 끝났는지 (예전 root.find("본문"))
+    # xml 파싱 (교정된 것만 허용 - recover 없음)
+    for _, elem in etree.iterparse(RepairedStream(f), events=("end",), tag=("기사", "출판일", "본문", "서명")):
+        if elem.tag == "서명":
+            if state["title"] is None:
+                state["title"] = "".join(elem.itertext()).strip() or None
+            continue
+        if elem.tag == "출판일":
+            years = extract_years([elem])
+            state["years"] += years
+            if years:
+                earliest = state["earliest"]
+                state["earliest"] = min(years) if earliest is None else min(earliest, *years)
+            continue
+        parent = elem.getparent()
+        if elem.tag == "본문":
+            if not body_closed and _is_top_level(elem):
+                body_closed = True
+                state["body"] = True
+            continue
+        if body_closed or parent.tag != "본문" or not _is_top_level(parent):
+            continue
+        state["body"] = True
+
+        yield elem
+
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _state_period(state):
+    """iter_articles가 기록한 출판연도 -> 시기 분류"""
+    return period_from_years([state["earliest"]] if state["earliest"] is not None else [])
+
+
+def _document_info(state, stats):
+    """카탈로그 행에 들어갈 문서 정보 (process_xml / document_texts의 info)"""
+    return {"title": state["title"], "years": state["years"], "year": state["earliest"], "stats": stats}
+
+
+def process_xml(xml_path, rel_path, output_dir=OUTPUT_DIR, quiet=False, info=None, count_tokens=None):
+    """
+    XML 하나를 시기/언해·번역문별 txt로 변환하고 시기를 반환 (본문이 없으면 None)
+
+    출판일은 각 기사의 저자정보 안에 있어 파일을 끝까지 읽어야 시기가 정해지므로,
+    텍스트는 SPILL_SIZE까지만 메모리에 모으고 그보다 크면 임시 파일에 쓴 뒤 마지막에 시기 폴더로 옮깁니다.
+
+    info(dict)를 주면 카탈로그용 "title", "years", "year"와 "stats"({종류: 쓴 txt의 TextStats 값})를 기록합니다
+    (count_tokens를 주면 토큰 수까지).
+    """
+    outputs = {kind: _TextOutput(output_dir, TextStats(count_tokens=count_tokens) if info is not None else None)
+               for kind in ("언해", "번역문")}
+    state = {}
+    try:
+        with open(xml_path, "rb") as f:
+            for 기사 in iter_articles(f, state):
+                # 첫가끝 변환은 _TextOutput이 문서 단위로 모아서 한 번에 합니다.
+                for 원문 in 기사.findall(".//원문") + 기사.findall(".//언해"):
+                    outputs["언해"].add(element_text(원문))
+                for 번역문 in 기사.findall(".//번역문"):
+                    outputs["번역문"].add(element_text(번역문))
+    except BaseException:
+        for output in outputs.values():
+            output.discard()
+        raise
+
+    if not state["body"]:
+        for output in outputs.values():
+            output.discard()
+        return None
+
+    # 출판연도 -> 시기 분류, 저장 경로 유지
+    period = _state_period(state)
     rel_path_txt = rel_path.replace(".xml", ".txt")
-    txt_path_언해 = os.path.join(OUTPUT_DIR, period, "언해", rel_path_txt)
-    txt_path_번역문 = os.path.join(OUTPUT_DIR, period, "번역문", rel_path_txt)
+    for kind, output in outputs.items():
+        output.commit(os.path.join(output_dir, period, kind, rel_path_txt))
+    if info is not None:
+        info.update(_document_info(state, {kind: output.stats.values()
+                                           for kind, output in outputs.items() if output.stats.parts}))
+
+    if not quiet:
+        safe_print(f"{rel_path} -> {period} 변환 완료")
+    return period
+
+
+def document_texts(xml_path, info=None, count_tokens=None):
+    """
+    XML 하나의 언해/번역문 텍스트를 txt 파일 대신 메모리로 돌려줌 (process_xml이 쓰는 txt와 같은 내용)
+    info(dict)를 주면 process_xml처럼 카탈로그용 문서 정보를 기록
+
+    Returns:
+        tuple: (시기, 가장 이른 출판연도, {"언해": 텍스트, "번역문": 텍스트}) - 본문이 없으면 None, 빈 종류는 빠짐
+    """
+    parts = {"언해": [], "번역문": []}
+    state = {}
+    with open(xml_path, "rb") as f:
+        for 기사 in iter_articles(f, state):
+            for 원문 in 기사.findall(".//원문") + 기사.findall(".//언해"):
+                parts["언해"].append(element_text(원문))
+            for 번역문 in 기사.findall(".//번역문"):
+                parts["번역문"].append(element_text(번역문))
+    if not state["body"]:
+        return None
+    texts = {}
+    stats = {}
+    for kind, kind_parts in parts.items():
+        kind_texts = [text for text in hnfd_many(kind_parts) if text]
+        if kind_texts:
+            texts[kind] = "\n\n".join(kind_texts)
+            if info is not None:
+                stats[kind] = text_stats(kind_texts, count_tokens=count_tokens)
+    if info is not None:
+        info.update(_document_info(state, stats))
+    return _state_period(state), state["earliest"], texts
+
+
+def article_pairs(xml_path):
+    """
+    XML 하나에서 기사 단위 (원문·언해, 번역문) 쌍을 뽑습니다.
+
+    세종 XML은 원문/언해와 번역문이 서로 다른 <기사>에 차례로 들어 있으므로 (예: 원문 기사, 언해 기사, 번역문 기사),
+    원문·언해가 있는 기사들과 바로 뒤에 이어지는 번역문 기사들을 한 쌍으로 묶습니다.
+    한쪽만 있는 묶음은 버립니다. 각 쪽의 텍스트는 txt 변환과 같이 "\n\n"으로 잇습니다.
 
-    if lines_언해:
-        os.makedirs(os.path.dirname(txt_path_언해), exist_ok=True)
-        with open(txt_path_언해, "w", encoding="utf-8") as f:
-            f.write("\n\n".join(lines_언해))
+    Returns:
+        tuple | None: (시기, [(첫 기사 번호, 끝 기사 번호, 원문·언해, 번역문), ...]) (본문이 없으면 None)
+    """
+    units = []       # [첫 기사 번호, 끝 기사 번호, 원문·언해 조각 목록, 번역문 조각 목록]
+    state = {}
+    with open(xml_path, "rb") as f:
+        for number, 기사 in enumerate(iter_articles(f, state), 1):
+            sources = [text for text in map(element_text, 기사.findall(".//원문") + 기사.findall(".//언해")) if text]
+            targets = [text for text in map(element_text, 기사.findall(".//번역문")) if text]
+            if not sources and not targets:
+                continue
+            if not units or sources and units[-1][3]:  # 번역문 뒤에 다시 원문·언해가 나오면 새 묶음
+                units.append([number, number, [], []])
+            unit = units[-1]
+            unit[1] = number
+            unit[2] += sources
+            unit[3] += targets
+    if not state["body"]:
+        return None
 
-    if lines_번역문:
-        os.makedirs(os.path.dirname(txt_path_번역문), exist_ok=True)
-        with open(txt_path_번역문, "w", encoding="utf-8") as f:
-            f.write("\n\n".join(lines_번역문))
+    # 첫가끝 변환은 문서 단위로 모아서 한 번에
+    units = [unit for unit in units if unit[2] and unit[3]]
+    converted = iter(hnfd_many(text for unit in units for text in unit[2] + unit[3]))
+    pairs = []
+    for first, last, sources, targets in units:
+        source = "\n\n".join(text for text in (next(converted) for _ in sources) if text)
+        target = "\n\n".join(text for text in (next(converted) for _ in targets) if text)
+        pairs.append((first, last, source, target))
+    return _state_period(state), pairs
 
-    safe_print(f"{rel_path} -> {period} 변환 완료")
 
-# 전체 xml 순회 + 진행상황 표시
-total_files = []
-for root_dir, _, files in os.walk(BASE_DIR):
-    for file in files:
-        if file.endswith(".xml"):
-            total_files.append(os.path.join(root_dir, file))
+def chunk_pairs(pairs, budget, count_tokens):
+    """
+    이어지는 기사 쌍을 원문+번역 토큰 수 합이 budget 이하가 되도록 앞에서부터 묶습니다.
+    혼자서 budget을 넘는 쌍은 그대로 한 묶음이 됩니다.
 
-safe_print(f"총 {len(total_files)}개 XML 파일 처리 시작...")
+    Args:
+        pairs (list): article_pairs의 (첫 기사 번호, 끝 기사 번호, 원문·언해, 번역문) 목록
+        budget (int): 묶음 하나의 최대 토큰 수
+        count_tokens (callable): 텍스트 -> 토큰 수
+    """
+    chunks = []
+    used = 0
+    for first, last, source, target in pairs:
+        tokens = count_tokens(source) + count_tokens(target)
+        if chunks and used + tokens <= budget:
+            prev_first, _, prev_source, prev_target = chunks[-1]
+            chunks[-1] = (prev_first, last, prev_source + "\n\n" + source, prev_target + "\n\n" + target)
+            used += tokens
+        else:
+            chunks.append((first, last, source, target))
+            used = tokens
+    return chunks
 
-for idx, xml_path in enumerate(total_files, 1):
-    rel_path = os.path.relpath(xml_path, BASE_DIR)
+
+def pair_lines(rel_path, period, pairs, meta=True):
+    """
+    기사 쌍을 번역 방향별 JSONL 줄로 만듭니다 (시기 -> 현대국어, 현대국어 -> 시기).
+
+    Returns:
+        dict: {JSONL 파일 이름: [줄 바이트, ...]}
+    """
+    lines = {}
+    for (source_lang, target_lang), filename in PAIR_FILES.items():
+        if period not in (source_lang, target_lang):
+            continue
+        forward = source_lang == period
+        out = lines.setdefault(filename, [])
+        for first, last, source, target in pairs:
+            line = encode_record(translation_record(source_lang, target_lang, *(
+                (source, target) if forward else (target, source))))
+            if meta:
+                # 학습 도구는 messages만 읽으므로 출처 정보는 같은 줄의 "meta"에 덧붙임
+                info = json.dumps({"period": period, "path": rel_path, "articles": [first, last]},
+                                  ensure_ascii=False, separators=(",", ":"))
+                line = line[:-1] + b',"meta":' + info.encode("utf-8") + b"}"
+            out.append(line)
+    return lines
+
+
+def pairs_file(task):
+    """
+    작업자에서 XML 하나의 기사 쌍 JSONL 줄을 만듭니다. 예외는 convert_file처럼 문자열로 돌려줍니다.
+
+    Args:
+        task (tuple): (xml 경로, 입력 폴더 기준 상대 경로, 토큰 예산(0이면 묶지 않음), meta 포함 여부)
+
+    Returns:
+        tuple: (상대 경로, 시기 또는 None, {JSONL 파일 이름: [줄, ...]}, 오류 메시지 또는 None)
+    """
+    xml_path, rel_path, budget, meta = task
     try:
-        process_xml(xml_path, rel_path)
+        result = article_pairs(xml_path)
+        if result is None:
+            return rel_path, None, {}, None
+        period, pairs = result
+        if budget:
+            from dataset_tools.token_counts import count_tokens
+            pairs = chunk_pairs(pairs, budget, count_tokens)
+        return rel_path, period, pair_lines(rel_path, period, pairs, meta), None
     except Exception as e:
-        safe_print(f"오류: {xml_path} -> {e}")
-    if idx % 10 == 0 or idx == len(total_files):
-        safe_print(f"[진행상황] {idx}/{len(total_files)} 완료")
+        return rel_path, None, {}, f"{type(e).__name__}: {e}"
+
+
+def pack_file(task):
+    """
+    작업자에서 XML 하나의 언해/번역문 텍스트를 만듭니다. 예외는 convert_file처럼 문자열로 돌려줍니다.
+
+    Args:
+        task (tuple): (xml 경로, 입력 폴더 기준 상대 경로, 카탈로그 정보를 셀지, 토큰 수도 셀지)
+
+    Returns:
+        tuple: (상대 경로, 시기 또는 None, 출판연도, {종류: 텍스트}, 문서 정보 또는 None, 오류 메시지 또는 None)
+    """
+    xml_path, rel_path, stats, tokens = task
+    info = {} if stats else None
+    try:
+        result = document_texts(xml_path, info, token_counter(tokens))
+        if result is None:
+            return rel_path, None, None, {}, None, None
+        return rel_path, *result, info, None
+    except Exception as e:
+        return rel_path, None, None, {}, None, f"{type(e).__name__}: {e}"
+
+
+def find_xml_files(input_dir):
+    """input_dir 아래의 모든 .xml 파일 경로 (정렬)"""
+    total_files = []
+    for root_dir, _, files in os.walk(input_dir):
+        for file in files:
+            if file.endswith(".xml"):
+                total_files.append(os.path.join(root_dir, file))
+    return sorted(total_files)
+
+
+def convert_file(task):
+    """
+    작업자에서 XML 하나를 변환합니다. 예외는 밖으로 내보내지 않고 문자열로 돌려주므로
+    파일 하나가 실패해도 나머지 변환은 계속됩니다.
+
+    Args:
+        task (tuple): (xml 경로, 입력 폴더 기준 상대 경로, 출력 폴더, 카탈로그 정보를 셀지, 토큰 수도 셀지)
+
+    Returns:
+        tuple: (상대 경로, 시기 또는 None, 문서 정보(process_xml의 info) 또는 None, 오류 메시지 또는 None)
+    """
+    xml_path, rel_path, output_dir, stats, tokens = task
+    info = {} if stats else None
+    try:
+        period = process_xml(xml_path, rel_path, output_dir, quiet=True, info=info, count_tokens=token_counter(tokens))
+        return rel_path, period, info if period else None, None
+    except Exception as e:
+        return rel_path, None, None, f"{type(e).__name__}: {e}"
+
+
+@contextlib.contextmanager
+def _map_tasks(func, tasks, jobs):
+    """tasks에 func를 적용한 결과를 입력 순서대로 냄 (jobs가 1이면 현재 프로세스에서 순서대로)"""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        yield map(func, tasks)
+        return
+    with ProcessPoolExecutor(jobs) as executor:
+        # 작은 파일이 많으므로 여러 개씩 묶어 보내 프로세스 간 통신을 줄임
+        yield executor.map(func, tasks, chunksize=max(1, min(64, len(tasks) // (jobs * 8))))
+
+
+def _catalog_document(catalog, rel_path, period, info):
+    """문서 하나의 종류(언해/번역문)별 카탈로그 행 (source는 팩과 같이 상대 경로에서 .xml을 뺀 것)"""
+    if catalog is None or info is None:
+        return
+    source = Path(rel_path).with_suffix("").as_posix()
+    for kind, stats in info["stats"].items():
+        catalog.put({"collection": "세종 한글 고전", "source": source, "kind": kind, "path": Path(rel_path).as_posix(),
+                     "title": info["title"], "years": info["years"], "year": info["year"], "period": period, **stats})
+
+
+def _tally(counts, errors, rel_path, period, error):
+    if error:
+        counts["failed"] += 1
+        errors.append((rel_path, error))
+        safe_print(f"오류: {rel_path} -> {error}")
+    else:
+        counts["converted" if period else "empty"] += 1
+
+
+def convert_tree(input_dir=BASE_DIR, output_dir=OUTPUT_DIR, jobs=None, progress_every=100, catalog_path=None,
+                 tokens=False):
+    """
+    input_dir의 XML을 모두 txt로 변환합니다.
+
+    Args:
+        input_dir (str): 원본 XML 폴더 (하위 폴더 구조를 출력에도 유지)
+        output_dir (str): 결과 TXT 폴더
+        jobs (int): 변환 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 순서대로)
+        progress_every (int): 몇 개마다 진행 상황을 출력할지 (0이면 출력 안 함)
+        catalog_path (str): 주면 txt 파일마다 제목/출판연도/시기/글자·자모 수/해시를 카탈로그(dataset_tools.catalog)에 기록
+        tokens (bool): catalog_path: tiktoken 토큰 수도 셈
+
+    Returns:
+        dict: {"total", "converted", "empty", "failed", "errors": [(상대 경로, 메시지)], "seconds", "files_per_sec"}
+              (catalog_path를 주면 "catalog": 카탈로그 행 수)
+    """
+    total_files = find_xml_files(input_dir)
+    stats = catalog_path is not None
+    tasks = [(path, os.path.relpath(path, input_dir), output_dir, stats, tokens) for path in total_files]
+    counts = Counter()
+    errors = []
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        catalog = stack.enter_context(Catalog(catalog_path)) if stats else None
+        results = stack.enter_context(_map_tasks(convert_file, tasks, jobs))
+        for idx, (rel_path, period, info, error) in enumerate(results, 1):
+            _tally(counts, errors, rel_path, period, error)
+            _catalog_document(catalog, rel_path, period, info)
+            if progress_every and (idx % progress_every == 0 or idx == len(tasks)):
+                safe_print(f"[진행상황] {idx}/{len(tasks)} 완료")
+    seconds = time.perf_counter() - start
+
+    summary = {
+        "total": len(tasks),
+        "converted": counts["converted"],
+        "empty": counts["empty"],
+        "failed": counts["failed"],
+        "errors": errors,
+        "seconds": seconds,
+        "files_per_sec": len(tasks) / seconds if seconds > 0 else 0.0,
+    }
+    if catalog is not None:
+        summary["catalog"] = catalog.count
+    return summary
+
+
+def pairs_tree(input_dir=BASE_DIR, output_dir=PAIRS_DIR, jobs=None, budget=0, meta=True, progress_every=100):
+    """
+    input_dir의 XML을 한 번 읽어 기사 단위 번역 쌍을 네 방향 JSONL(PAIR_FILES)로 바로 씁니다.
+    txt로 변환한 뒤 파일 이름으로 다시 짝짓는 과정이 필요 없습니다. 줄 순서는 입력 파일 순서와 같습니다.
+
+    Args:
+        input_dir (str): 원본 XML 폴더
+        output_dir (str): JSONL을 쓸 폴더 (PAIR_FILES 이름의 파일을 새로 씀)
+        jobs (int): 변환 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 순서대로)
+        budget (int): 0보다 크면 이어지는 기사 쌍을 이 토큰 수 이하로 묶음 (tiktoken)
+        meta (bool): 줄마다 {"meta": {"period", "path", "articles"}}를 덧붙일지
+        progress_every (int): 몇 개마다 진행 상황을 출력할지 (0이면 출력 안 함)
+
+    Returns:
+        dict: convert_tree와 같은 항목에 "records": {JSONL 파일 이름: 줄 수}
+    """
+    total_files = find_xml_files(input_dir)
+    tasks = [(path, os.path.relpath(path, input_dir), budget, meta) for path in total_files]
+    counts = Counter()
+    errors = []
+    records = Counter({filename: 0 for filename in PAIR_FILES.values()})
+
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        outfiles = {filename: stack.enter_context(open(os.path.join(output_dir, filename), "wb"))
+                    for filename in PAIR_FILES.values()}
+        results = stack.enter_context(_map_tasks(pairs_file, tasks, jobs))
+        for idx, (rel_path, period, lines, error) in enumerate(results, 1):
+            _tally(counts, errors, rel_path, period, error)
+            for filename, file_lines in lines.items():
+                outfiles[filename].writelines(line + b"\n" for line in file_lines)
+                records[filename] += len(file_lines)
+            if progress_every and (idx % progress_every == 0 or idx == len(tasks)):
+                safe_print(f"[진행상황] {idx}/{len(tasks)} 완료")
+    seconds = time.perf_counter() - start
+
+    return {
+        "total": len(tasks),
+        "converted": counts["converted"],
+        "empty": counts["empty"],
+        "failed": counts["failed"],
+        "errors": errors,
+        "records": dict(records),
+        "seconds": seconds,
+        "files_per_sec": len(tasks) / seconds if seconds > 0 else 0.0,
+    }
+
+
+def pack_tree(input_dir=BASE_DIR, pack_dir=PACK_DIR, jobs=None, progress_every=100, catalog_path=None, tokens=False):
+    """
+    input_dir의 XML을 txt 폴더 대신 말뭉치 팩 하나(dataset_tools.corpus_pack)로 변환합니다.
+    항목은 (상대 경로에서 .xml을 뺀 source, part 1, kind 언해/번역문)이고 내용은 convert_tree의 txt와 같습니다.
+    catalog_path / tokens는 convert_tree와 같음 (카탈로그 행의 source/kind는 팩 항목과 같음)
+
+    Returns:
+        dict: convert_tree와 같은 항목에 "entries": 팩 항목 수
+    """
+    total_files = find_xml_files(input_dir)
+    stats = catalog_path is not None
+    tasks = [(path, os.path.relpath(path, input_dir), stats, tokens) for path in total_files]
+    counts = Counter()
+    errors = []
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        pack = stack.enter_context(CorpusPackWriter(pack_dir))
+        catalog = stack.enter_context(Catalog(catalog_path)) if stats else None
+        results = stack.enter_context(_map_tasks(pack_file, tasks, jobs))
+        for idx, (rel_path, period, year, texts, info, error) in enumerate(results, 1):
+            _tally(counts, errors, rel_path, period, error)
+            _catalog_document(catalog, rel_path, period, info)
+            source = Path(rel_path).with_suffix("").as_posix()
+            for kind, text in texts.items():
+                pack.add(source, 1, text, kind=kind, period=period, year=year)
+            if progress_every and (idx % progress_every == 0 or idx == len(tasks)):
+                safe_print(f"[진행상황] {idx}/{len(tasks)} 완료")
+        entries = pack.count
+    seconds = time.perf_counter() - start
+
+    summary = {
+        "total": len(tasks),
+        "converted": counts["converted"],
+        "empty": counts["empty"],
+        "failed": counts["failed"],
+        "errors": errors,
+        "entries": entries,
+        "seconds": seconds,
+        "files_per_sec": len(tasks) / seconds if seconds > 0 else 0.0,
+    }
+    if catalog is not None:
+        summary["catalog"] = catalog.count
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세종 한글 고전 XML을 시기/언해·번역문별 txt로 변환")
+    parser.add_argument("input", nargs="?", default=BASE_DIR, help="원본 XML 폴더")
+    parser.add_argument("output", nargs="?", default=None,
+                        help=f"결과 TXT 폴더 (--pairs면 JSONL 폴더, --pack이면 팩 폴더, 기본: {os.path.basename(OUTPUT_DIR)} / "
+                             f"{os.path.basename(PAIRS_DIR)} / {os.path.basename(PACK_DIR)})")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="변환 프로세스 수 (기본: CPU 수, 1이면 순차)")
+    parser.add_argument("--progress-every", type=int, default=100, help="진행 상황 출력 간격 (0이면 출력 안 함)")
+    parser.add_argument("--pairs", action="store_true",
+                        help="txt 대신 기사 단위 번역 쌍을 네 방향 JSONL(근대_현대.jsonl 등)로 바로 씀")
+    parser.add_argument("--budget", type=int, default=0,
+                        help="--pairs: 이어지는 기사 쌍을 원문+번역 토큰 수 이 이하로 묶음 (0이면 기사 묶음 하나씩)")
+    parser.add_argument("--no-meta", action="store_true", help="--pairs: 줄마다 붙는 출처 정보(meta)를 빼고 messages만 씀")
+    parser.add_argument("--pack", action="store_true",
+                        help="txt 폴더 대신 말뭉치 팩 하나(texts.bin + index.jsonl)로 씀 (dataset_tools.corpus_pack)")
+    parser.add_argument("--catalog", default=None,
+                        help="txt/팩: 문서별 제목/출판연도/시기/글자·자모 수/해시를 기록할 카탈로그 SQLite 파일 (dataset_tools.catalog)")
+    parser.add_argument("--tokens", action="store_true", help="--catalog: tiktoken 토큰 수도 셈")
+    args = parser.parse_args()
+    if args.pairs and args.pack:
+        parser.error("--pairs와 --pack은 함께 쓸 수 없습니다")
+    if args.pairs and args.catalog:
+        parser.error("--catalog는 txt 변환이나 --pack과 함께 씁니다")
+
+    # 입력 폴더 존재 확인 (없으면 안내 후 종료)
+    if not os.path.isdir(args.input):
+        safe_print(f"입력 폴더를 찾을 수 없습니다: {args.input}")
+        safe_print("실제 폴더 경로를 확인하거나 스크립트를 해당 폴더가 있는 위치에서 실행하세요.")
+        return
+
+    jobs = args.jobs or os.cpu_count() or 1
+    safe_print(f"총 {len(find_xml_files(args.input))}개 XML 파일 처리 시작... (프로세스 {jobs}개)")
+    if args.pack:
+        summary = pack_tree(args.input, args.output or PACK_DIR, jobs, args.progress_every, args.catalog, args.tokens)
+    elif args.pairs:
+        summary = pairs_tree(args.input, args.output or PAIRS_DIR, jobs, args.budget, not args.no_meta,
+                             args.progress_every)
+    else:
+        summary = convert_tree(args.input, args.output or OUTPUT_DIR, jobs, args.progress_every, args.catalog,
+                               args.tokens)
+
+    safe_print(f"\n변환 {summary['converted']}개, 본문 없음 {summary['empty']}개, 실패 {summary['failed']}개 "
+               f"/ 총 {summary['total']}개")
+    for filename, count in summary.get("records", {}).items():
+        safe_print(f"  {filename}: {count:,}줄")
+    if "entries" in summary:
+        safe_print(f"  팩 항목: {summary['entries']:,}개")
+    if "catalog" in summary:
+        safe_print(f"  카탈로그 행: {summary['catalog']:,}개")
+    safe_print(f"소요 시간: {summary['seconds']:.1f}초 ({summary['files_per_sec']:.1f} files/sec)")
+    for rel_path, error in summary["errors"][:20]:
+        safe_print(f"  - {rel_path}: {error}")
+    if len(summary["errors"]) > 20:
+        safe_print(f"  ... 외 {len(summary['errors']) - 20}개")
+
+
+# 크롤러(xml 추출.py --convert)나 다른 스크립트에서 convert_tree/process_xml을 쓸 수 있도록 import 시에는 실행하지 않음
+if __name__ == "__main__":
+    main()
 
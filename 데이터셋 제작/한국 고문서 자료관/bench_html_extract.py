@@ -0,0 +1,150 @@
+import argparse
+import os
+import runpy
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.html_extract import detect_encoding
+
+# 크롤러 모듈 (실행하지 않고 함수/셀렉터만 불러옴)
+crawler = runpy.run_path(str(Path(__file__).with_name("txt 추출.py")), run_name="txt_extract")
+
+PAGE_URL = "https://archive.aks.ac.kr/letter/view.do?dataId=0"
+
+
+# ---- 기존 방식: BeautifulSoup(html.parser) + 셀렉터마다 select_one ----
+def bs_extract_year(soup):
+    for selector in crawler["YEAR_TABLE_SELECTORS"]:
+        htable = soup.select_one(selector)
+        if not htable:
+            continue
+        rows = htable.select("tbody tr") or htable.select("tr")
+        for row in rows:
+            th = row.find("th")
+            if not th:
+                continue
+            th_text = th.get_text(strip=True)
+            for keyword in crawler["YEAR_KEYWORDS"]:
+                if keyword in th_text:
+                    td = row.find("td")
+                    if td:
+                        year = crawler["extract_year_from_range"](td.get_text(strip=True))
+                        if year:
+                            return year
+                    break
+    return None
+
+
+def bs_fill(soup, result):
+    for key, sels in crawler["CANDIDATES"]:
+        if result[key]:
+            continue
+        for sel in sels:
+            el = soup.select_one(sel)
+            if el and el.get_text(strip=True):
+                for el_to_remove in el.select("div.comment_box, dl.jusok-dl, span.kakju_num"):
+                    el_to_remove.decompose()
+                result[key] = el.get_text(separator="\n", strip=True)
+                break
+
+
+def bs_page(content):
+    soup = BeautifulSoup(content.decode(detect_encoding(content), errors="replace"), "html.parser")
+    year = bs_extract_year(soup)
+    result = {"원문": "", "번역": ""}
+    bs_fill(soup, result)
+    iframe = soup.find("iframe")
+    iframe_url = urljoin(PAGE_URL, iframe["src"]) if iframe and iframe.get("src") else None
+    return result["원문"], result["번역"], year, iframe_url
+
+
+# ---- 새 방식: lxml 파싱 한 번 + SelectorSet 한 번 순회 ----
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.headers = {}
+
+
+def lxml_page(content):
+    matches = crawler["LETTER_FIELDS"].first_matches(crawler["parse_response"](FakeResponse(content)))
+    result = {"원문": "", "번역": ""}
+    crawler["fill_from_doc"](matches, result)
+    return result["원문"], result["번역"], crawler["extract_year_from_doc"](matches), crawler["iframe_url_of"](matches, PAGE_URL)
+
+
+def synthetic_pages(count):
+    """저장된 페이지가 없을 때 쓰는 상세 페이지 모양의 예시 HTML"""
+    pages = []
+    for i in range(count):
+        notes = "".join(f"<div class='comment_box'>주석 {j}</div>본문 {i}-{j} 이어짐 " for j in range(5))
+        rows = "".join(f"<tr><th>항목 {j}</th><td>값 {j}</td></tr>" for j in range(8))
+        page = f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>편지 {i}</title>
+<script>var x = "<div class='org_text'>";</script><style>.org_text{{}}</style></head>
+<body><div class="header"><ul class="menu">{"".join(f"<li><a href='/m{j}'>메뉴 {j}</a></li>" for j in range(40))}</ul></div>
+<table class="htable"><tbody>{rows}<tr><th>연대</th><td>{1500 + i % 300}년〜{1510 + i % 300}년</td></tr></tbody></table>
+<div class="view"><div class="org_text"><p>원문 {i} 첫 줄</p>{notes}<span class="kakju_num">1</span><!-- 주석 --><p>둘째&nbsp;줄</p></div>
+<div class="trans_text"><p>번역 {i}</p><dl class="jusok-dl"><dt>각주</dt><dd>설명</dd></dl><p>끝</p></div></div>
+<iframe src="/letter/frame.do?dataId={i}"></iframe></body></html>"""
+        pages.append(page.encode("utf-8"))
+    return pages
+
+
+def load_pages(directory):
+    """폴더 아래의 저장된 HTML (.html/.htm 파일, 또는 HTTP 캐시의 bodies 폴더)"""
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith((".html", ".htm")) or os.path.basename(root) != "index" and "." not in name:
+                with open(os.path.join(root, name), "rb") as f:
+                    content = f.read()
+                if content.lstrip()[:1] == b"<":
+                    pages.append(content)
+    return pages
+
+
+def bench(func, pages, repeat):
+    best = float("inf")
+    outputs = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [func(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return len(pages) / best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상세 페이지 추출 처리량(pages/sec) 비교: BeautifulSoup vs lxml")
+    parser.add_argument("pages", nargs="?", help="저장된 상세 페이지 폴더 (.html 파일 또는 --cache-dir 캐시 폴더)")
+    parser.add_argument("--synthetic", type=int, default=200, help="폴더가 없을 때 만들 예시 페이지 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = load_pages(args.pages)
+        print(f"입력: {args.pages} ({len(pages):,}개 페이지)")
+    else:
+        pages = synthetic_pages(args.synthetic)
+        print(f"입력: 예시 페이지 {len(pages):,}개")
+    if not pages:
+        print("측정할 페이지가 없습니다.")
+        return
+
+    before, old_outputs = bench(bs_page, pages, args.repeat)
+    after, new_outputs = bench(lxml_page, pages, args.repeat)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(old_outputs, new_outputs)) if a != b]
+    print(f"before (BeautifulSoup html.parser): {before:,.1f} pages/sec")
+    print(f"after  (lxml + SelectorSet):        {after:,.1f} pages/sec")
+    print(f"속도 향상: {after / before:.2f}x")
+    print(f"추출 결과가 다른 페이지: {len(mismatches)}개")
+    for i in mismatches[:3]:
+        print(f"  - #{i}\n    before: {old_outputs[i]!r}\n    after:  {new_outputs[i]!r}")
+
+
+if __name__ == "__main__":
+    main()
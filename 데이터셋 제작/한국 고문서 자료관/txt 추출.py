@@ -1,24 +1,57 @@
+import argparse
+import asyncio
+import hashlib
 import os
 import re
+import sys
 import time
 import unicodedata
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from urllib.parse import urljoin, urlparse, parse_qs, quote_plus
 from OldHangeul import hNFD  # [OldHangeul 적용]
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.async_fetch import AsyncFetcher
+from dataset_tools.catalog import Catalog, text_stats, token_counter
+from dataset_tools.corpus_pack import CorpusPackWriter
+from dataset_tools.crawl_journal import DONE, CrawlJournal, file_digest
+from dataset_tools.crawl_metrics import CrawlMetrics
+from dataset_tools.html_extract import (SelectorSet, class_matcher, compile_selector, detect_encoding,
+                                        element_text, has_text, parse_html)
+from dataset_tools.http_cache import CachedSession
+from dataset_tools.letter_store import LetterStore
+
 # 설정
 BASE = "https://archive.aks.ac.kr"
-LIST_URL = f"{BASE}/letter/list.do?itemId=letter&gubun=lettername&pageIndex=1&pageUnit=1000"
+LIST_PATH = "/letter/list.do?itemId=letter&gubun=lettername&pageIndex=1&pageUnit=1000"
+LIST_URL = f"{BASE}{LIST_PATH}"
+# 순차 모드에서 상세 페이지 사이 딜레이(초)
+REQUEST_DELAY = 0.3
 
 
-session = requests.Session()
-session.headers.update({
-    "User-Agent": "Mozilla/S.0 (Windows NT 10.0; Win64; x64)",
-    "Referer": LIST_URL,
-    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-})
+def set_base_url(base):
+    """크롤링할 사이트 주소를 바꿈 (로컬 고정 응답 서버 dataset_tools.fixture_server로 시험할 때)"""
+    global BASE, LIST_URL
+    BASE = base.rstrip("/")
+    LIST_URL = f"{BASE}{LIST_PATH}"
+
+
+def make_session(cache_dir=None, offline=False):
+    """공통 헤더를 단 세션. cache_dir가 있으면 응답을 디스크에 캐시 (offline이면 캐시에서만 응답)"""
+    s = CachedSession(cache_dir, offline)
+    s.headers.update({
+        "User-Agent": "Mozilla/S.0 (Windows NT 10.0; Win64; x64)",
+        "Referer": LIST_URL,
+        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+    })
+    return s
+
+
+session = make_session()
+# 단계별 소요 시간과 카운터 (main에서 --metrics 파일로 다시 만듦)
+metrics = CrawlMetrics()
 
 # 폴더 구조
 base_folder = "한국 고문서 자료관 txt"
@@ -31,6 +64,21 @@ folders = {
 for g in folders.values():
     for p in g.values():
         os.makedirs(p, exist_ok=True)
+# 원문/번역이 저장되는 시기별 하위 폴더
+TXT_FOLDER = {"원문": "고문서", "번역": "번역본"}
+
+# 증분 크롤링 상태: dataId별 제목, 배정된 파일명, 연도, 시기, 내용 해시 (마지막 줄이 유효)
+STATE_FILE = os.path.join(base_folder, "crawl_state.jsonl")
+
+# 편지별 레코드 저장소 (main에서 --store로 엶). write_txt가 False면 txt 파일은 쓰지 않음
+letter_store = None
+write_txt = True
+# 원문/번역 txt와 같은 내용을 담는 말뭉치 팩 (main에서 --pack으로 엶, 이어 쓰기)
+letter_pack = None
+
+# 편지별 제목/연도/시기/글자·자모 수/해시 카탈로그 (main에서 --catalog로 엶), --tokens면 토큰 수 함수
+letter_catalog = None
+catalog_tokens = None
 
 # 구간 연도에서 가장 오래된 연도 추출
 def extract_year_from_range(date_text):
@@ -65,248 +113,726 @@ def get_unique_title_once(norm_title: str) -> str:
         title_counter[norm_title] += 1
         return f"{norm_title}({title_counter[norm_title]})"
 
-# 목록 수집
-resp = session.get(LIST_URL, timeout=15)
-resp.encoding = resp.apparent_encoding or "utf-8"
-soup = BeautifulSoup(resp.text, "html.parser")
-ul = soup.find("ul", class_="wrap__list")
-items = []
-if ul:
-    for li in ul.find_all("li"):
-        title_el = li.select_one("div.list__title > a")
-        if not title_el:
+# 저장된 파일명이 새 항목에 다시 배정되지 않도록 title_counter를 채움
+def seed_title_counter(state):
+    for entry in state.entries.values():
+        norm, base = entry.get("norm_title"), entry.get("unique_base")
+        if not norm or not base:
             continue
-        title_text = title_el.get_text(strip=True)
-        href = title_el.get("href", "")
-        if href.startswith("#"):
-            href = href[1:]
-        if not href.startswith("/"):
-            href = "/" + href
-        
-        # URL 구조 수정: /view.do 대신 /letter/view.do 사용
-        if "/view.do" in href:
-            href = href.replace("/view.do", "/letter/view.do")
-        
-        link = urljoin(BASE, href)
-        items.append((title_text, link))
+        n = 1
+        if base != norm:
+            m = re.fullmatch(re.escape(norm) + r"\((\d+)\)", base)
+            n = int(m.group(1)) if m else 1
+        title_counter[norm] = max(title_counter.get(norm, 0), n)
 
-print("수집된 항목:", len(items))
 
+# 응답 본문을 한 번만 파싱 (lxml)
+def parse_response(resp):
+    return parse_html(resp.content, detect_encoding(resp.content, resp.headers.get("Content-Type")))
 
-# Playwright를 사용한 연도 추출 함수
-def extract_year_with_playwright(url):
-    """Playwright를 사용하여 연도 정보 추출"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        
-        try:
-            page.goto(url, timeout=30000)
-            page.wait_for_load_state("networkidle")
-            
-            # 다양한 셀렉터로 연대 정보 찾기
-            selectors_to_try = [
-                "table.htable",
-                "table[class*='htable']",
-                "table",
-                ".htable",
-                "[class*='table']"
-            ]
-            
-            for selector in selectors_to_try:
-                htable = page.query_selector(selector)
-                if htable:
-                    rows = htable.query_selector_all("tbody tr")
-                    if not rows:
-                        rows = htable.query_selector_all("tr")
-                    
-                    for row in rows:
-                        th = row.query_selector("th")
-                        if th:
-                            th_text = th.inner_text().strip()
-                            
-                            # 다양한 연대 키워드 시도
-                            keywords = ["연대", "년도", "연도", "시기", "시대"]
-                            for keyword in keywords:
-                                if keyword in th_text:
-                                    td = row.query_selector("td")
-                                    if td:
-                                        date_text = td.inner_text().strip()
-                                        year = extract_year_from_range(date_text)
-                                        if year:
-                                            return year
-                                    break
-            
-            # 대체 방법: 페이지 전체에서 연도 패턴 찾기
-            page_content = page.content()
-            
-            year_patterns = [
-                r'(\d{4})년',
-                r'(\d{4})~(\d{4})',
-                r'(\d{4})-(\d{4})',
-                r'(\d{4})\.(\d{4})',
-                r'(\d{4})\s*년',
-                r'(\d{4})\s*~',
-                r'(\d{4})\s*-'
-            ]
-            
-            for pattern in year_patterns:
-                matches = re.findall(pattern, page_content)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            year = int(match[0])
-                        else:
-                            year = int(match)
-                        if 1000 <= year <= 2000:  # 합리적인 연도 범위
-                            return year
+
+# 목록 페이지 셀렉터 (미리 컴파일)
+LIST_UL = compile_selector("ul.wrap__list")
+LIST_LI = compile_selector("li")
+LIST_TITLE = compile_selector("div.list__title > a")
+
+
+# 목록 수집
+def collect_items():
+    """목록 페이지에서 (제목, 상세 링크) 목록을 수집"""
+    with metrics.timer("list.fetch"):
+        resp = session.get(LIST_URL, timeout=15)
+    metrics.count("bytes", len(resp.content), source="list")
+    with metrics.timer("list.parse"):
+        doc = parse_response(resp)
+    ul = LIST_UL(doc) if doc is not None else None
+    items = []
+    if ul:
+        for li in LIST_LI(ul[0]):
+            title_el = LIST_TITLE(li)
+            if not title_el:
+                continue
+            title_el = title_el[0]
+            title_text = element_text(title_el)
+            href = title_el.get("href", "")
+            if href.startswith("#"):
+                href = href[1:]
+            if not href.startswith("/"):
+                href = "/" + href
             
-            # 제목에서 연도 추출 시도
-            title_element = page.query_selector("title")
-            if title_element:
-                title_text = title_element.inner_text()
-                title_year = extract_year_from_range(title_text)
-                if title_year:
-                    return title_year
+            # URL 구조 수정: /view.do 대신 /letter/view.do 사용
+            if "/view.do" in href:
+                href = href.replace("/view.do", "/letter/view.do")
             
-            # h1, h2 태그에서 연도 추출 시도
-            for tag in ["h1", "h2", "h3"]:
-                elements = page.query_selector_all(tag)
-                for element in elements:
-                    text = element.inner_text().strip()
-                    if text and any(keyword in text for keyword in ["년", "연대", "시기"]):
-                        year = extract_year_from_range(text)
+            link = urljoin(BASE, href)
+            items.append((title_text, link))
+    return items
+
+
+# 연대 정보가 있는 표 셀렉터와 th 키워드
+YEAR_TABLE_SELECTORS = [
+    "table.htable",
+    "table[class*='htable']",
+    "table",
+    ".htable",
+    "[class*='table']"
+]
+YEAR_KEYWORDS = ["연대", "년도", "연도", "시기", "시대"]
+
+
+TABLE_ROWS = compile_selector("tbody tr")
+ALL_ROWS = compile_selector("tr")
+ROW_TH = compile_selector("th")
+ROW_TD = compile_selector("td")
+
+
+def extract_year_from_doc(matches):
+    """이미 받아 온 상세 페이지 HTML의 htable에서 연도 추출 (브라우저 불필요)"""
+    for htable in matches["연대표"]:
+        if htable is None:
+            continue
+        rows = TABLE_ROWS(htable) or ALL_ROWS(htable)
+        for row in rows:
+            th = ROW_TH(row)
+            if not th:
+                continue
+            th_text = element_text(th[0])
+            for keyword in YEAR_KEYWORDS:
+                if keyword in th_text:
+                    td = ROW_TD(row)
+                    if td:
+                        year = extract_year_from_range(element_text(td[0]))
                         if year:
                             return year
-                            
+                    break
+    return None
+
+
+class BrowserPool:
+    """
+    크롤링 전체에서 재사용하는 Playwright 브라우저/컨텍스트와 페이지 풀.
+    브라우저는 처음 필요할 때 한 번만 실행되고, 상세 페이지마다 페이지만 빌려 씁니다.
+    """
+
+    def __init__(self, size=1):
+        self.size = size
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle_pages = []
+
+    def _start(self):
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._context = self._browser.new_context()
+
+    def acquire(self):
+        if self._context is None:
+            self._start()
+        if self._idle_pages:
+            return self._idle_pages.pop()
+        return self._context.new_page()
+
+    def release(self, page):
+        if len(self._idle_pages) < self.size:
+            self._idle_pages.append(page)
+        else:
+            page.close()
+
+    def close(self):
+        try:
+            if self._browser:
+                self._browser.close()
+            if self._playwright:
+                self._playwright.stop()
         except Exception as e:
-            print(f"Playwright 연도 추출 오류: {e}")
-        finally:
-            browser.close()
+            print(f"브라우저 종료 중 오류 발생: {e}")
+        self._playwright = self._browser = self._context = None
+        self._idle_pages = []
+
+
+# Playwright를 사용한 연도 추출 함수 (HTML에서 연도를 못 찾은 경우의 대체 경로)
+def extract_year_with_playwright(url, browser_pool):
+    """Playwright를 사용하여 연도 정보 추출"""
+    page = browser_pool.acquire()
+    try:
+        page.goto(url, timeout=30000)
+        page.wait_for_load_state("networkidle")
+        
+        # 다양한 셀렉터로 연대 정보 찾기
+        for selector in YEAR_TABLE_SELECTORS:
+            htable = page.query_selector(selector)
+            if htable:
+                rows = htable.query_selector_all("tbody tr")
+                if not rows:
+                    rows = htable.query_selector_all("tr")
+                
+                for row in rows:
+                    th = row.query_selector("th")
+                    if th:
+                        th_text = th.inner_text().strip()
+                        
+                        # 다양한 연대 키워드 시도
+                        for keyword in YEAR_KEYWORDS:
+                            if keyword in th_text:
+                                td = row.query_selector("td")
+                                if td:
+                                    date_text = td.inner_text().strip()
+                                    year = extract_year_from_range(date_text)
+                                    if year:
+                                        return year
+                                break
+        
+        # 대체 방법: 페이지 전체에서 연도 패턴 찾기
+        page_content = page.content()
+        
+        year_patterns = [
+            r'(\d{4})년',
+            r'(\d{4})~(\d{4})',
+            r'(\d{4})-(\d{4})',
+            r'(\d{4})\.(\d{4})',
+            r'(\d{4})\s*년',
+            r'(\d{4})\s*~',
+            r'(\d{4})\s*-'
+        ]
+        
+        for pattern in year_patterns:
+            matches = re.findall(pattern, page_content)
+            if matches:
+                for match in matches:
+                    if isinstance(match, tuple):
+                        year = int(match[0])
+                    else:
+                        year = int(match)
+                    if 1000 <= year <= 2000:  # 합리적인 연도 범위
+                        return year
+        
+        # 제목에서 연도 추출 시도
+        title_element = page.query_selector("title")
+        if title_element:
+            title_text = title_element.inner_text()
+            title_year = extract_year_from_range(title_text)
+            if title_year:
+                return title_year
+        
+        # h1, h2 태그에서 연도 추출 시도
+        for tag in ["h1", "h2", "h3"]:
+            elements = page.query_selector_all(tag)
+            for element in elements:
+                text = element.inner_text().strip()
+                if text and any(keyword in text for keyword in ["년", "연대", "시기"]):
+                    year = extract_year_from_range(text)
+                    if year:
+                        return year
+                        
+    except Exception as e:
+        print(f"Playwright 연도 추출 오류: {e}")
+    finally:
+        browser_pool.release(page)
     
     return None
 
-# 상세 페이지에서 텍스트 추출
-def extract_text_from_detail(url):
-    # Playwright로 연도 추출
-    year = extract_year_with_playwright(url)
-    
-    # 기존 requests 방식으로 텍스트 추출
-    r = session.get(url, timeout=20)
-    r.encoding = r.apparent_encoding or "utf-8"
-    s = BeautifulSoup(r.text, "html.parser")
+# 원문/번역이 들어 있는 요소 셀렉터
+CANDIDATES = [
+    ("원문", ["div.org_text", "div.org-text", "div#org_text", "div[class*='org']"]),
+    ("번역", ["div.trans_text", "div.trans-text", "div#trans_text", "div[class*='trans']"]),
+]
+# 본문이 상세 페이지에 없을 때 dataId로 시도하는 엔드포인트
+PROBE_ENDPOINTS = ["/letter/view.do", "/letter/viewAjax.do", "/letter/contents.do"]
+
+
+# 본문에서 제외할 주석/각주 요소
+NOT_CONTENT = class_matcher("div.comment_box, dl.jusok-dl, span.kakju_num")
+
+# 상세 페이지에서 찾는 모든 요소를 한 번의 순회로 찾도록 묶은 셀렉터 집합
+LETTER_FIELDS = SelectorSet({
+    **dict(CANDIDATES),
+    "연대표": YEAR_TABLE_SELECTORS,
+    "iframe": ["iframe"],
+})
 
-    result = {"원문": "", "번역": ""}
 
-    candidates = [
-        ("원문", ["div.org_text", "div.org-text", "div#org_text", "div[class*='org']"]),
-        ("번역", ["div.trans_text", "div.trans-text", "div#trans_text", "div[class*='trans']"]),
-    ]
-
-    def clean_element(element):
-        if not element:
-            return
-        for el_to_remove in element.select("div.comment_box, dl.jusok-dl, span.kakju_num"):
-            el_to_remove.decompose()
-
-    for key, sels in candidates:
-        for sel in sels:
-            el = s.select_one(sel)
-            if el and el.get_text(strip=True):
-                clean_element(el)
-                result[key] = el.get_text(separator="\n", strip=True)
+def fill_from_doc(matches, result, source=None):
+    """
+    아직 비어 있는 원문/번역 항목을 찾아 둔 요소에서 채움 (주석/각주는 제외)
+    source(detail/iframe/probe)를 주면 어느 페이지의 어느 셀렉터로 채웠는지 계측에 기록
+    """
+    for key, selectors in CANDIDATES:
+        if result[key]:
+            continue
+        for selector, el in zip(selectors, matches[key]):
+            if el is not None and has_text(el):
+                result[key] = element_text(el, separator="\n", skip=NOT_CONTENT)
+                if source:
+                    metrics.count("field_source", field=key, source=source, selector=selector)
                 break
 
+
+def iframe_url_of(matches, url):
+    iframe = matches["iframe"][0]
+    if iframe is not None and iframe.get("src"):
+        return urljoin(url, iframe.get("src"))
+    return None
+
+
+def match_response(resp, source):
+    """응답을 파싱해 LETTER_FIELDS 일치 요소를 찾고 바이트 수/파싱 시간을 기록"""
+    metrics.count("bytes", len(resp.content), source=source)
+    with metrics.timer(f"{source}.parse"):
+        return LETTER_FIELDS.first_matches(parse_response(resp))
+
+
+def fill_from_response(resp, result, source):
+    fill_from_doc(match_response(resp, source), result, source)
+
+
+def data_id_of(url):
+    return parse_qs(urlparse(url).query).get("dataId", [None])[0]
+
+
+def item_key(link):
+    """상태 파일의 항목 키 (dataId, 없으면 링크)"""
+    return data_id_of(link) or link
+
+
+def content_hash(original, translation):
+    return hashlib.sha256(f"{original}\0{translation}".encode("utf-8")).hexdigest()
+
+
+def finish_result(result, year):
+    for key, _ in CANDIDATES:
+        if not result[key]:
+            metrics.count("field_source", field=key, source="missing")
+    # 주석문 제거
+    if "주석문" in result["원문"]:
+        result["원문"] = result["원문"].split("주석문", 1)[0].strip()
+    if "주석문" in result["번역"]:
+        result["번역"] = result["번역"].split("주석문", 1)[0].strip()
+
+    return result["원문"], result["번역"], year
+
+
+# 상세 페이지에서 텍스트 추출
+def extract_text_from_detail(url, browser_pool):
+    # requests로 상세 페이지를 한 번만 받아 옴
+    with metrics.timer("detail.fetch"):
+        r = session.get(url, timeout=20)
+    matches = match_response(r, "detail")
+
+    # 받아 온 HTML의 htable에서 연도 추출, 실패할 때만 브라우저 사용 (오프라인 모드는 브라우저 없음)
+    year = extract_year_from_doc(matches)
+    year_source = "html"
+    if year is None and browser_pool is not None:
+        with metrics.timer("year.browser"):
+            year = extract_year_with_playwright(url, browser_pool)
+        year_source = "browser"
+    metrics.count("year_source", source=year_source if year is not None else "missing")
+
+    result = {"원문": "", "번역": ""}
+    fill_from_doc(matches, result, "detail")
+
     if (not result["원문"] or not result["번역"]):
-        iframe = s.find("iframe")
-        if iframe and iframe.get("src"):
-            iframe_src = iframe["src"]
-            iframe_url = urljoin(url, iframe_src)
+        iframe_url = iframe_url_of(matches, url)
+        if iframe_url:
             try:
-                r2 = session.get(iframe_url, timeout=15)
-                r2.encoding = r2.apparent_encoding or "utf-8"
-                s2 = BeautifulSoup(r2.text, "html.parser")
-                for key, sels in candidates:
-                    if result[key]:
-                        continue
-                    for sel in sels:
-                        el = s2.select_one(sel)
-                        if el and el.get_text(strip=True):
-                            clean_element(el)
-                            result[key] = el.get_text(separator="\n", strip=True)
+                with metrics.timer("iframe.fetch"):
+                    r2 = session.get(iframe_url, timeout=15)
+                fill_from_response(r2, result, "iframe")
+            except Exception:
+                metrics.count("fetch_error", source="iframe")
+
+    if (not result["원문"] or not result["번역"]):
+        data_id = data_id_of(url)
+        if data_id:
+            for ep in PROBE_ENDPOINTS:
+                try:
+                    with metrics.timer("probe.fetch", endpoint=ep):
+                        r3 = session.get(urljoin(BASE, ep), params={"dataId": data_id},
+                                         headers={"X-Requested-With": "XMLHttpRequest"}, timeout=10)
+                    if r3.status_code == 200:
+                        fill_from_response(r3, result, "probe")
+                        if result["원문"] and result["번역"]:
                             break
+                except Exception:
+                    metrics.count("fetch_error", source="probe")
+                    continue
+
+    return finish_result(result, year)
+
+
+# 비동기 모드: 같은 절차를 공유 커넥션 풀 + 호스트별 속도 제한으로 수행
+async def extract_text_from_detail_async(fetcher, url, browser_year):
+    """
+    extract_text_from_detail의 비동기 버전.
+    browser_year는 HTML에서 연도를 못 찾았을 때 호출할 브라우저 대체 경로 (url -> awaitable)
+    """
+    with metrics.timer("detail.fetch"):
+        r = await fetcher.get(url, timeout=20)
+    matches = match_response(r, "detail")
+
+    year = extract_year_from_doc(matches)
+    year_source = "html"
+    if year is None:
+        with metrics.timer("year.browser"):
+            year = await browser_year(url)
+        year_source = "browser"
+    metrics.count("year_source", source=year_source if year is not None else "missing")
+
+    result = {"원문": "", "번역": ""}
+    fill_from_doc(matches, result, "detail")
+
+    if (not result["원문"] or not result["번역"]):
+        iframe_url = iframe_url_of(matches, url)
+        if iframe_url:
+            try:
+                with metrics.timer("iframe.fetch"):
+                    r2 = await fetcher.get(iframe_url, timeout=15)
+                fill_from_response(r2, result, "iframe")
             except Exception:
-                pass
+                metrics.count("fetch_error", source="iframe")
 
     if (not result["원문"] or not result["번역"]):
-        parsed = urlparse(url)
-        qs = parse_qs(parsed.query)
-        data_id = qs.get("dataId", [None])[0]
+        data_id = data_id_of(url)
         if data_id:
-            for ep in ["/letter/view.do", "/letter/viewAjax.do", "/letter/contents.do"]:
+            for ep in PROBE_ENDPOINTS:
                 try:
-                    r3 = session.get(urljoin(BASE, ep), params={"dataId": data_id},
-                                     headers={"X-Requested-With": "XMLHttpRequest"}, timeout=10)
-                    if r3.status_code == 200 and r3.text.strip():
-                        s3 = BeautifulSoup(r3.text, "html.parser")
-                        for key, sels in candidates:
-                            if result[key]:
-                                continue
-                            for sel in sels:
-                                el = s3.select_one(sel)
-                                if el and el.get_text(strip=True):
-                                    clean_element(el)
-                                    result[key] = el.get_text(separator="\n", strip=True)
-                                    break
+                    with metrics.timer("probe.fetch", endpoint=ep):
+                        r3 = await fetcher.get(urljoin(BASE, ep), params={"dataId": data_id},
+                                               headers={"X-Requested-With": "XMLHttpRequest"}, timeout=10)
+                    if r3.status_code == 200:
+                        fill_from_response(r3, result, "probe")
                         if result["원문"] and result["번역"]:
                             break
                 except Exception:
+                    metrics.count("fetch_error", source="probe")
                     continue
 
-    # 주석문 제거
-    if "주석문" in result["원문"]:
-        result["원문"] = result["원문"].split("주석문", 1)[0].strip()
-    if "주석문" in result["번역"]:
-        result["번역"] = result["번역"].split("주석문", 1)[0].strip()
+    return finish_result(result, year)
 
-    return result["원문"], result["번역"], year
 
-# 메인 루프
-for idx, (title, link) in enumerate(items, 1):
-    try:
-        norm = normalize_title(title)
-        unique_base = get_unique_title_once(norm)
+def group_of(year):
+    return "중세국어" if year and year < 1592 else "근대국어"  # 임진왜란 이전이면 중세국어
 
-        original, translation, year = extract_text_from_detail(link)
 
-        if not original and not translation:
-            print(f"[{idx}/{len(items)}] '{title}' 내용 없음 — 수동 확인 필요: {link}")
-            continue
+def catalog_letter(link, title, original_converted, translation, year):
+    """편지 하나의 원문/번역 카탈로그 행을 남김 (--catalog를 준 경우, 해시는 txt 파일 내용 기준)"""
+    if letter_catalog is None:
+        return
+    data_id, group = item_key(link), group_of(year)
+    for kind, text in (("원문", original_converted), ("번역", hNFD(translation) if translation else "")):
+        if text:
+            letter_catalog.put({"collection": "고문서", "source": data_id, "kind": kind, "path": link, "title": title,
+                                "years": [year] if year else [], "year": year, "period": group,
+                                **text_stats([text], count_tokens=catalog_tokens)})
+
+
+def store_letter(link, title, unique_base, original_converted, translation, year):
+    """편지 레코드 하나를 저장소와 팩, 카탈로그에 남김 (--store / --pack / --catalog를 준 경우)"""
+    if letter_store is not None:
+        letter_store.put({"dataId": item_key(link), "title": title, "year": year, "period": group_of(year),
+                          "원문": original_converted, "번역": translation, "url": link, "unique_base": unique_base})
+    if letter_pack is not None:
+        # 팩 항목은 txt 파일과 같은 내용 (번역도 hNFD 적용)
+        data_id, group = item_key(link), group_of(year)
+        if original_converted:
+            letter_pack.add(data_id, 1, original_converted, kind="원문", period=group, year=year)
+        if translation:
+            letter_pack.add(data_id, 1, hNFD(translation), kind="번역", period=group, year=year)
+    catalog_letter(link, title, original_converted, translation, year)
+
+
+def missing_from_stores(key, has_original, has_translation):
+    """저장소나 팩에 아직 없는 편지인지 (이번에 처음 쓰는 경우 등)"""
+    if letter_store is not None and key not in letter_store:
+        return True
+    if letter_pack is not None:
+        return ((has_original and (key, 1, "원문") not in letter_pack)
+                or (has_translation and (key, 1, "번역") not in letter_pack))
+    return False
+
+
+def save_letter(idx, total, title, link, unique_base, original, translation, year):
+    """시기 폴더를 정해 원문/번역 txt(와 저장소 레코드)를 저장하고 시기를 반환 (내용이 없으면 None)"""
+    if not original and not translation:
+        print(f"[{idx}/{total}] '{title}' 내용 없음 — 수동 확인 필요: {link}")
+        return None
+
+    group = group_of(year)
+    year_str = f"{year}년" if year else "연도미상"
+    print(f"[{idx}/{total}] '{title}' ({year_str}) -> '{group}'로 저장")
 
-        if year and year < 1592:  # 임진왜란 이전
-            group = "중세국어"
-            print(f"[{idx}/{len(items)}] '{title}' ({year}년) -> '{group}'로 저장")
+    # [OldHangeul 적용] 텍스트 정규화
+    original_converted = hNFD(original) if original else ""
+    if original and write_txt:
+        path = os.path.join(folders[group]["고문서"], f"{unique_base}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(original_converted)
+
+    if translation and write_txt:
+        translation_converted = hNFD(translation)
+        path = os.path.join(folders[group]["번역본"], f"{unique_base}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(translation_converted)
+
+    store_letter(link, title, unique_base, original_converted, translation, year)
+    return group
+
+
+def letter_outputs(group, unique_base, original, translation):
+    """완료 기록에 남길 결과: texts(원문/번역 중 있는 것)와 files(이번에 쓴 txt의 크기·해시, txt를 쓸 때만)"""
+    texts = [kind for kind, text in (("원문", original), ("번역", translation)) if text]
+    files = {}
+    if write_txt:
+        for kind in texts:
+            path = os.path.join(folders[group][TXT_FOLDER[kind]], f"{unique_base}.txt")
+            files[kind] = {"size": os.path.getsize(path), "sha256": file_digest(path)}
+    return {"texts": texts, "files": files}
+
+
+def outputs_intact(key, entry):
+    """
+    완료 기록의 결과가 그대로 남아 있는지: txt 파일(기록된 크기·해시까지), --store 레코드, --pack 항목.
+    texts가 없는 예전 기록은 txt 파일이나 팩 항목이 하나라도 있는지만 확인
+    """
+    texts = entry.get("texts")
+    if write_txt:
+        group, unique_base = entry.get("group"), entry.get("unique_base")
+        if group not in folders:
+            return False
+        paths = {kind: os.path.join(folders[group][folder], f"{unique_base}.txt") for kind, folder in TXT_FOLDER.items()}
+        if texts is None:
+            if not any(os.path.isfile(path) for path in paths.values()):
+                return False
         else:
-            group = "근대국어"
-            year_str = f"{year}년" if year else "연도미상"
-            print(f"[{idx}/{len(items)}] '{title}' ({year_str}) -> '{group}'로 저장")
+            files = entry.get("files") or {}
+            for kind in texts:
+                try:
+                    size = os.path.getsize(paths[kind])
+                except OSError:
+                    return False
+                info = files.get(kind)
+                if info and (size != info["size"] or file_digest(paths[kind]) != info["sha256"]):
+                    return False
+    if letter_store is not None and key not in letter_store:
+        return False
+    if letter_pack is not None:
+        present = [(key, 1, kind) in letter_pack for kind in (texts if texts is not None else TXT_FOLDER)]
+        if not (all(present) if texts is not None else any(present)):
+            return False
+    return True
 
-        # [OldHangeul 적용] 텍스트 정규화
-        if original:
-            original_converted = hNFD(original)
-            path = os.path.join(folders[group]["고문서"], f"{unique_base}.txt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(original_converted)
 
-        if translation:
-            translation_converted = hNFD(translation)
-            path = os.path.join(folders[group]["번역본"], f"{unique_base}.txt")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(translation_converted)
+def plan_items(items, state, incremental):
+    """
+    목록을 상태 파일과 비교해 처리할 (제목, 링크, 파일명) 목록을 만듭니다.
+    이미 파일명이 배정된 항목은 같은 파일명을 그대로 쓰고, 새 항목만 새 파일명을 받습니다.
+    incremental이면 완료 기록이 있고 제목이 같으며 결과(txt 파일, 저장소/팩 항목)가 그대로 남은 항목은 건너뜁니다.
+    """
+    seed_title_counter(state)
+    planned, seen = [], set()
+    new_count = changed_count = skipped_count = missing_count = 0
+    for title, link in items:
+        key = item_key(link)
+        seen.add(key)
+        entry = state.get(key)
+        if entry and entry.get("unique_base"):
+            if incremental and entry["status"] == DONE and entry.get("title") == title:
+                if outputs_intact(key, entry):
+                    skipped_count += 1
+                    continue
+                missing_count += 1
+            else:
+                changed_count += 1
+            unique_base = entry["unique_base"]
+        else:
+            new_count += 1
+            unique_base = get_unique_title_once(normalize_title(title))
+        planned.append((title, link, unique_base))
 
-        time.sleep(0.3)
+    removed = [key for key in state.entries if key not in seen]
+    print(f"새 항목 {new_count}개, 다시 받을 항목 {changed_count}개, 건너뛴 항목 {skipped_count}개")
+    if missing_count:
+        print(f"완료 기록은 있지만 파일/저장소/팩 결과가 없거나 달라져 다시 받을 항목 {missing_count}개")
+    if removed:
+        print(f"목록에서 사라진 항목 {len(removed)}개 (파일은 그대로 둠): {', '.join(removed[:5])}")
+    return planned
+
+
+def save_and_record(state, idx, total, title, link, unique_base, original, translation, year):
+    """내용이 바뀐 경우에만 파일을 다시 쓰고, 결과를 상태 파일에 기록"""
+    key = item_key(link)
+    entry = state.get(key)
+    # norm_title은 파일명을 배정할 때의 정규화 제목 (제목이 바뀌어도 유지해 title_counter 복원에 사용)
+    norm_title = entry["norm_title"] if entry and entry.get("unique_base") == unique_base else normalize_title(title)
+    fields = {"title": title, "norm_title": norm_title, "unique_base": unique_base, "year": year}
+
+    if not original and not translation:
+        save_letter(idx, total, title, link, unique_base, original, translation, year)
+        state.record(key, "empty", **fields)
+        metrics.count("letter", outcome="empty")
+        return
+
+    digest = content_hash(original, translation)
+    if (entry and entry["status"] == DONE and entry.get("sha256") == digest and entry.get("year") == year
+            and outputs_intact(key, entry)):
+        print(f"[{idx}/{total}] '{title}' 내용 변경 없음")
+        metrics.count("letter", outcome="unchanged")
+        # 저장소/팩을 이번에 처음 쓰는 경우 등, 저장소나 팩에 없는 편지는 채워 넣음
+        if missing_from_stores(key, bool(original), bool(translation)):
+            store_letter(link, title, unique_base, hNFD(original) if original else "", translation, year)
+        else:
+            # 카탈로그는 같은 행을 덮어쓰므로 새로 만드는 카탈로그에도 모든 편지가 들어가게 다시 기록
+            catalog_letter(link, title, hNFD(original) if original else "", translation, year)
+        if entry.get("title") != title:
+            state.record(key, DONE, **fields, group=entry.get("group"), sha256=digest,
+                         texts=entry.get("texts"), files=entry.get("files"))
+        return
+
+    # 연도가 바뀌어 시기 폴더가 달라지면 이전 파일 삭제
+    old_group = entry.get("group") if entry else None
+    if old_group and old_group != group_of(year):
+        for kind in ("고문서", "번역본"):
+            old_path = os.path.join(folders[old_group][kind], f"{unique_base}.txt")
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    with metrics.timer("letter.save"):
+        group = save_letter(idx, total, title, link, unique_base, original, translation, year)
+    state.record(key, DONE, **fields, group=group, sha256=digest,
+                 **letter_outputs(group, unique_base, original, translation))
+    metrics.count("letter", outcome="saved")
+
+
+def crawl_serial(items, state, use_browser=True, delay=REQUEST_DELAY):
+    browser_pool = BrowserPool() if use_browser else None
+    try:
+        for idx, (title, link, unique_base) in enumerate(items, 1):
+            try:
+                with metrics.timer("letter.total"):
+                    original, translation, year = extract_text_from_detail(link, browser_pool)
+                    save_and_record(state, idx, len(items), title, link, unique_base, original, translation, year)
+
+                if not session.offline:
+                    time.sleep(delay)
+
+            except Exception as e:
+                metrics.count("letter", outcome="error")
+                print(f"[{idx}/{len(items)}] '{title}' 처리 중 오류 발생: {e}, 링크: {link}")
+    finally:
+        if browser_pool is not None:
+            browser_pool.close()
+
+
+async def crawl_concurrent(items, state, concurrency, rate, burst):
+    """
+    상세 페이지들을 동시에 받아 처리.
+    파일명은 plan_items에서 목록 순서대로 미리 정하므로 완료 순서와 관계없이 직렬 모드와 같음.
+    """
+    # 동기 Playwright는 만든 스레드에서만 쓸 수 있으므로 전용 스레드 하나에서 실행
+    browser_pool = BrowserPool()
+    browser_thread = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+
+    def browser_year(url):
+        return loop.run_in_executor(browser_thread, extract_year_with_playwright, url, browser_pool)
+
+    async def process(idx, title, link, unique_base):
+        try:
+            with metrics.timer("letter.total"):
+                original, translation, year = await extract_text_from_detail_async(fetcher, link, browser_year)
+                save_and_record(state, idx, len(items), title, link, unique_base, original, translation, year)
+        except Exception as e:
+            metrics.count("letter", outcome="error")
+            print(f"[{idx}/{len(items)}] '{title}' 처리 중 오류 발생: {e}, 링크: {link}")
+
+    try:
+        # --cache-dir를 주면 직렬 모드와 같은 디스크 캐시를 거침
+        async with AsyncFetcher(concurrency=concurrency, rate=rate, burst=burst,
+                                headers=session.headers, cache=session) as fetcher:
+            await asyncio.gather(*(
+                process(idx, title, link, unique_base)
+                for idx, (title, link, unique_base) in enumerate(items, 1)
+            ))
+            metrics.count("retry", fetcher.retry_count)
+    finally:
+        await loop.run_in_executor(browser_thread, browser_pool.close)
+        browser_thread.shutdown()
+
+
+# 메인 루프
+def main():
+    parser = argparse.ArgumentParser(description="한국 고문서 자료관 편지 원문/번역 크롤러")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="동시에 처리할 요청 수 (1이면 기존처럼 한 건씩 처리)")
+    parser.add_argument("--rate", type=float, default=4.0, help="동시 모드에서 호스트당 초당 최대 요청 수")
+    parser.add_argument("--burst", type=int, default=4, help="동시 모드에서 한 번에 몰아 보낼 수 있는 요청 수")
+    parser.add_argument("--cache-dir", default=None,
+                        help="HTTP 응답을 저장할 캐시 폴더 (재실행 시 ETag/Last-Modified로 재검증)")
+    parser.add_argument("--offline", action="store_true",
+                        help="네트워크 없이 --cache-dir 캐시에서만 응답 (직렬 모드, 브라우저 사용 안 함)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="이전 실행에서 완료한 항목은 건너뛰고 새 항목/제목이 바뀐 항목만 받음")
+    parser.add_argument("--metrics", default=None,
+                        help="단계별 소요 시간/카운터 이벤트를 JSON 한 줄씩 기록할 파일 (.jsonl)")
+    parser.add_argument("--base-url", default=BASE,
+                        help="크롤링할 사이트 주소 (로컬 고정 응답 서버로 시험할 때 변경)")
+    parser.add_argument("--delay", type=float, default=REQUEST_DELAY, help="직렬 모드에서 상세 페이지 사이 딜레이(초)")
+    parser.add_argument("--store", default=None,
+                        help="편지마다 dataId/제목/연도/시기/원문/번역 레코드를 남길 파일 (.jsonl 또는 .sqlite)")
+    parser.add_argument("--pack", default=None,
+                        help="원문/번역 txt와 같은 내용을 말뭉치 팩 폴더(dataset_tools.corpus_pack)에 이어 씀")
+    parser.add_argument("--no-txt", action="store_true", help="txt 파일은 쓰지 않고 --store/--pack에만 저장")
+    parser.add_argument("--catalog", default=None,
+                        help="편지마다 제목/연도/시기/글자·자모 수/해시를 기록할 카탈로그 SQLite 파일 (dataset_tools.catalog)")
+    parser.add_argument("--tokens", action="store_true", help="--catalog: tiktoken 토큰 수도 셈")
+    args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error("--offline에는 --cache-dir가 필요합니다")
+    if args.no_txt and not (args.store or args.pack):
+        parser.error("--no-txt에는 --store나 --pack이 필요합니다")
+
+    global session, metrics, letter_store, letter_pack, letter_catalog, catalog_tokens, write_txt
+    set_base_url(args.base_url)
+    session = make_session(args.cache_dir, args.offline)
+    metrics = CrawlMetrics(args.metrics)
+    letter_store = LetterStore(args.store) if args.store else None
+    letter_pack = CorpusPackWriter(args.pack, mode="a") if args.pack else None
+    letter_catalog = Catalog(args.catalog) if args.catalog else None
+    catalog_tokens = token_counter(args.tokens)
+    write_txt = not args.no_txt
+
+    try:
+        items = collect_items()
+        print("수집된 항목:", len(items))
+
+        with CrawlJournal(STATE_FILE) as state:
+            planned = plan_items(items, state, args.incremental)
+
+            # 오프라인 재생은 브라우저 없이 직렬 모드로 (캐시에서 읽으므로 동시 요청이 필요 없음)
+            if args.concurrency > 1 and args.offline:
+                print("--offline: 캐시 재생은 직렬 모드로 실행합니다 (--concurrency 무시)")
+            if args.concurrency > 1 and not args.offline:
+                asyncio.run(crawl_concurrent(planned, state, args.concurrency, args.rate, args.burst))
+            else:
+                crawl_serial(planned, state, use_browser=not args.offline, delay=args.delay)
+    finally:
+        if letter_store is not None:
+            print(f"저장소 {args.store}: 편지 {len(letter_store.keys)}통")
+            letter_store.close()
+        if letter_pack is not None:
+            print(f"팩 {args.pack}: 이번에 쓴 항목 {letter_pack.count}개, 전체 {len(letter_pack.keys)}개")
+            letter_pack.close()
+        if letter_catalog is not None:
+            print(f"카탈로그 {args.catalog}: 이번에 쓴 행 {letter_catalog.count}개")
+            letter_catalog.close()
+        if args.cache_dir:
+            print(session.summary())
+            metrics.add_counts("http_cache", session.stats)
+        metrics.print_summary()
+        metrics.close()
+
+    print("모든 작업이 완료되었습니다.")
 
-    except Exception as e:
-        print(f"[{idx}/{len(items)}] '{title}' 처리 중 오류 발생: {e}, 링크: {link}")
 
-print("모든 작업이 완료되었습니다.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.catalog import read_catalog
+
+XML_FOLDER = Path(__file__).with_name("NIKL_Korean History Corpus_v1.0")
+
+
+# ---- 기존 방식: 시기 폴더의 _partNNN.txt를 모두 읽어 문서별 글자 수를 다시 셈 ----
+def filter_txt_tree(dataset, period, min_chars):
+    chars = defaultdict(int)
+    parts = defaultdict(int)
+    for path in (dataset / period).glob("*.txt"):
+        source = path.stem.rsplit("_part", 1)[0]
+        chars[source] += len(path.read_text(encoding="utf-8"))
+        parts[source] += 1
+    # 카탈로그의 chars와 같게 그룹 사이 구분자("\n\n")까지 셈
+    return sorted(source for source in chars if chars[source] + 2 * (parts[source] - 1) >= min_chars)
+
+
+def filter_catalog(catalog, period, min_chars):
+    return sorted(row["source"] for row in read_catalog(catalog, "NIKL", period) if row["chars"] >= min_chars)
+
+
+def bench(func, args, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시기/길이로 문서 고르기 비교: txt 파일을 다시 읽기 vs 카탈로그 조회")
+    parser.add_argument("folder", nargs="?", default=str(XML_FOLDER), help="NIKL XML 폴더")
+    parser.add_argument("--period", default="중세국어", help="고를 시기")
+    parser.add_argument("--min-chars", type=int, default=10000, help="문서의 최소 글자 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    args = parser.parse_args()
+
+    # 임시 폴더에서 추출 스크립트를 실행해 Dataset과 카탈로그를 함께 만듦
+    work = Path(tempfile.mkdtemp(prefix="bench_catalog_"))
+    try:
+        (work / XML_FOLDER.name).symlink_to(Path(args.folder).resolve())
+        script = Path(__file__).with_name("텍스트 추출.py")
+        for catalog in (None, "catalog.sqlite"):
+            command = [sys.executable, str(script)] + (["--catalog", catalog] if catalog else [])
+            start = time.perf_counter()
+            subprocess.run(command, cwd=work, stdout=subprocess.DEVNULL, check=True)
+            print(f"추출{' + 카탈로그' if catalog else ''}: {time.perf_counter() - start:.1f}s")
+
+        before, old = bench(filter_txt_tree, (work / "Dataset", args.period, args.min_chars), args.repeat)
+        after, new = bench(filter_catalog, (work / "catalog.sqlite", args.period, args.min_chars), args.repeat)
+        print(f"{args.period}, {args.min_chars:,}자 이상인 문서 고르기")
+        print(f"before (txt 파일을 모두 읽어 글자 수 계산): {before * 1000:,.1f}ms")
+        print(f"after  (카탈로그 조회):                     {after * 1000:,.1f}ms")
+        print(f"속도 향상: {before / after:.1f}x")
+        print(f"고른 문서가 같은지: {old == new} ({len(new):,}개)")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.corpus_pack import CorpusPack, CorpusPackWriter
+
+DATASET = Path(__file__).with_name("Dataset")
+
+
+# ---- 기존 방식: 폴더를 rglob로 훑고 _partNNN.txt를 하나씩 열어 읽음 ----
+def read_txt_tree(dataset):
+    texts = []
+    for path in sorted(dataset.rglob("*.txt")):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append((path.parent.name, path.stem, f.read()))
+    return texts
+
+
+def read_pack(pack_dir):
+    with CorpusPack(pack_dir) as pack:
+        return [(entry.period, f"{entry.source}_part{entry.part:03d}", entry.text) for entry in pack]
+
+
+def pack_txt_tree(dataset, pack_dir):
+    """Dataset/<시기>/<파일명>_partNNN.txt를 팩 하나로 (연도는 txt에 없으므로 null)"""
+    with CorpusPackWriter(pack_dir) as writer:
+        for path in sorted(dataset.rglob("*.txt")):
+            source, part = path.stem.rsplit("_part", 1)
+            writer.add(source, int(part), path.read_text(encoding="utf-8"), period=path.parent.name)
+        return writer.count
+
+
+def bench(func, arg, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="말뭉치 전체 읽기 비교: _partNNN.txt 파일들 vs 말뭉치 팩 (texts.bin + index.jsonl)")
+    parser.add_argument("dataset", nargs="?", default=str(DATASET), help="Dataset 폴더 (중세국어/근대국어 하위 폴더)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--random", type=int, default=10000, help="무작위 접근으로 읽을 항목 수")
+    args = parser.parse_args()
+
+    dataset = Path(args.dataset)
+    pack_dir = tempfile.mkdtemp(prefix="bench_corpus_pack_")
+    try:
+        start = time.perf_counter()
+        count = pack_txt_tree(dataset, pack_dir)
+        print(f"팩 만들기: {count:,}개 항목, {time.perf_counter() - start:.1f}s")
+
+        before, old_texts = bench(read_txt_tree, dataset, args.repeat)
+        after, new_texts = bench(read_pack, pack_dir, args.repeat)
+        print(f"before (rglob + 파일마다 open/read): {len(old_texts) / before:,.0f} files/sec ({before:.2f}s)")
+        print(f"after  (팩을 순서대로 한 번 읽기):   {len(new_texts) / after:,.0f} entries/sec ({after:.2f}s)")
+        print(f"속도 향상: {before / after:.2f}x")
+        print(f"내용이 같은지: {sorted(old_texts) == sorted(new_texts)}")
+
+        with CorpusPack(pack_dir) as pack:
+            step = max(1, len(pack) // args.random)
+            indices = list(range(0, len(pack), step))[:args.random]
+            start = time.perf_counter()
+            for i in indices:
+                pack[i]
+            seconds = time.perf_counter() - start
+        print(f"무작위 접근 pack[i]: {len(indices) / seconds:,.0f} entries/sec")
+    finally:
+        shutil.rmtree(pack_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import argparse
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 추출 스크립트 (실행하지 않고 함수만 불러옴)
+extractor = runpy.run_path(str(Path(__file__).with_name("텍스트 추출.py")), run_name="nikl_extract")
+
+XML_FOLDER = Path(__file__).with_name("NIKL_Korean History Corpus_v1.0")
+DATASET = Path(__file__).with_name("Dataset")
+
+
+# ---- 기존 방식: 파일을 텍스트로 한 번, ET.parse로 한 번 더 읽고 줄 단위로 <sent lang="kor"> 추출 ----
+def extract_by_lines(xml_file_path):
+    with open(xml_file_path, 'r', encoding='utf-8') as f:
+        xml_content = f.read()
+    root = ET.parse(xml_file_path).getroot()
+    date_element = root.find('.//date')
+    year = None
+    if date_element is not None and date_element.text:
+        year = extractor["extract_year_from_date"](date_element.text)
+    sentence_groups = []
+    current_group = []
+    for line in xml_content.split('\n'):
+        line = line.strip()
+        if '<sent' in line and 'lang="kor"' in line:
+            start_tag = line.find('>')
+            end_tag = line.rfind('</')
+            if start_tag != -1 and end_tag != -1 and start_tag < end_tag:
+                sentence_text = line[start_tag + 1:end_tag].strip()
+                if sentence_text:
+                    current_group.append(sentence_text)
+        elif line == '' and current_group:
+            sentence_groups.append(current_group)
+            current_group = []
+    if current_group:
+        sentence_groups.append(current_group)
+    return year, sentence_groups
+
+
+def safe(func):
+    def run(path):
+        try:
+            return func(path)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+    return run
+
+
+def bench(func, files, repeat, jobs=1):
+    best = float("inf")
+    outputs = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if jobs == 1:
+            outputs = [func(path) for path in files]
+        else:
+            with ProcessPoolExecutor(jobs) as executor:
+                outputs = list(executor.map(func, files, chunksize=8))
+        best = min(best, time.perf_counter() - start)
+    return len(files) / best, outputs
+
+
+def classify(old, new):
+    """두 결과가 다른 이유 (문서 하나)"""
+    if isinstance(old, str) or isinstance(new, str):
+        return "파싱 오류"
+    if old[0] != new[0]:
+        return "연도"
+    old_sentences = [s for group in old[1] for s in group]
+    new_sentences = [s for group in new[1] for s in group]
+    if old_sentences == new_sentences:
+        return "그룹 경계"
+    if len(new_sentences) > len(old_sentences):
+        return "기존 방식이 빠뜨린 문장 (여러 줄 문장 등)"
+    return "문장 내용"
+
+
+def new_extract(path):
+    year, groups, error = extractor["extract_file"](path)
+    return error or (year, groups)
+
+
+def run_pipeline(folder, fused, jobs):
+    """
+    임시 폴더에서 스크립트들을 실행해 Dataset을 새로 만들고 걸린 시간과 폴더를 돌려줌
+    fused=False면 예전처럼 추출(변환 없이) -> 텍스트 변환.py -> 태그 삭제.py 세 단계
+    """
+    work = Path(tempfile.mkdtemp(prefix="bench_nikl_"))
+    (work / XML_FOLDER.name).symlink_to(Path(folder).resolve())
+    here = Path(__file__).parent
+    commands = [[sys.executable, str(here / "텍스트 추출.py"), "--jobs", str(jobs)]]
+    if not fused:
+        commands[0].append("--no-convert")
+        commands += [[sys.executable, str(here / "텍스트 변환.py")], [sys.executable, str(here / "태그 삭제.py")]]
+    start = time.perf_counter()
+    for command in commands:
+        subprocess.run(command, cwd=work, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start, work / "Dataset"
+
+
+def compare_dataset(built, reference=DATASET):
+    """(같은 파일 수, 내용이 다른 파일 수, 한쪽에만 있는 파일 수)"""
+    built_files = {p.relative_to(built) for p in built.rglob("*.txt")}
+    reference_files = {p.relative_to(reference) for p in reference.rglob("*.txt")}
+    common = built_files & reference_files
+    differ = sum((built / p).read_bytes() != (reference / p).read_bytes() for p in common)
+    return len(common) - differ, differ, len(built_files ^ reference_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NIKL 한국어 문장 추출 비교: 줄 단위 + ET.parse 두 번 읽기 vs iterparse 한 번")
+    parser.add_argument("folder", nargs="?", default=str(XML_FOLDER), help="NIKL XML 폴더")
+    parser.add_argument("--repeat", type=int, default=1, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--jobs", type=int, default=4, help="병렬 측정에 쓸 프로세스 수")
+    parser.add_argument("--show", type=int, default=3, help="다른 문서를 몇 개까지 보여줄지")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Dataset 만들기 전체 비교: 추출 -> 텍스트 변환.py -> 태그 삭제.py vs 추출 한 번에 변환까지")
+    args = parser.parse_args()
+
+    if args.pipeline:
+        before, old_dataset = run_pipeline(args.folder, False, args.jobs)
+        after, new_dataset = run_pipeline(args.folder, True, args.jobs)
+        print(f"before (추출 -> 텍스트 변환.py -> 태그 삭제.py): {before:.1f}s")
+        print(f"after  (추출하면서 변환/태그 삭제, 한 번 저장):  {after:.1f}s")
+        print(f"속도 향상: {before / after:.2f}x")
+        for name, built in (("before", old_dataset), ("after", new_dataset)):
+            same, differ, missing = compare_dataset(built)
+            print(f"{name}: 저장소 Dataset과 같은 파일 {same:,}개, 다른 파일 {differ:,}개, 한쪽에만 있는 파일 {missing:,}개")
+            shutil.rmtree(built.parent)
+        return
+
+    files = sorted(Path(args.folder).glob("*.xml"))
+    print(f"입력: {args.folder} ({len(files):,}개 파일)")
+    before, old_outputs = bench(safe(extract_by_lines), files, args.repeat)
+    after, new_outputs = bench(new_extract, files, args.repeat)
+    parallel, _ = bench(new_extract, files, args.repeat, args.jobs)
+    print(f"before (텍스트 + ET.parse, 줄 단위):   {before:,.1f} files/sec")
+    print(f"after  (iterparse 한 번):              {after:,.1f} files/sec ({after / before:.2f}x)")
+    print(f"after  (iterparse, 프로세스 {args.jobs}개):     {parallel:,.1f} files/sec ({parallel / before:.2f}x)")
+
+    differences = [(path, classify(old, new)) for path, old, new in zip(files, old_outputs, new_outputs) if old != new]
+    print(f"\n결과가 같은 문서: {len(files) - len(differences):,}개 / {len(files):,}개")
+    for reason, count in Counter(reason for _, reason in differences).most_common():
+        print(f"  {reason}: {count}개")
+    for path, reason in differences[:args.show]:
+        old, new = old_outputs[files.index(path)], new_outputs[files.index(path)]
+        old_sentences = [s for group in old[1] for s in group] if not isinstance(old, str) else []
+        new_sentences = [s for group in new[1] for s in group] if not isinstance(new, str) else []
+        only_new = [s for s in new_sentences if s not in set(old_sentences)][:2]
+        only_old = [s for s in old_sentences if s not in set(new_sentences)][:2]
+        print(f"  - {path.name} ({reason}): 새로 나온 문장 {only_new!r}, 없어진 문장 {only_old!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
+import argparse
+import contextlib
+import functools
 import os
 import re
+import sys
+import tempfile
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # 저장소 루트 (dataset_tools)
+from dataset_tools.catalog import Catalog, text_stats, token_counter
+from dataset_tools.corpus_pack import CorpusPackWriter
+from dataset_tools.hnfd import hnfd
+
 def extract_year_from_date(date_text):
     """
     date 태그에서 연도를 추출하는 함수
@@ -36,59 +47,170 @@ def extract_year_from_date(date_text):
     
     return None
 
-def extract_korean_sentences_by_lines(xml_file_path):
+# 파서에 한 번에 넣을 바이트 수
+CHUNK_SIZE = 64 * 1024
+# 줄 전체가 공백뿐인 줄 (예전 줄 단위 추출에서 line.strip() == ''인 줄)
+BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+# 여러 줄에 걸친 문장 안의 줄바꿈
+LINE_BREAK = re.compile(r"\s*\n\s*")
+# 태그 삭제.py가 지우는 <add>〃</add> 같은 태그
+ADD_TAG = re.compile(r'<add>[^<]*</add>')
+
+
+def clean_sentence(text):
+    """문장 앞뒤 공백을 지우고 문장 안의 줄바꿈을 공백 하나로 바꿈"""
+    text = text.strip()
+    return LINE_BREAK.sub(" ", text) if "\n" in text else text
+
+
+def sentence_text(sent):
+    """<sent> 안의 내용 (<add>, <ruby> 같은 안쪽 태그와 주석은 원문 그대로 둠)"""
+    return clean_sentence((sent.text or "") + "".join(ET.tostring(child, encoding="unicode") for child in sent))
+
+
+class KoreanSentenceTarget:
     """
-    XML 파일에서 한국어 문장들을 줄바꿈 기준으로 추출하는 함수
+    ET.XMLParser의 target: 파서가 태그/텍스트를 읽는 대로 <date>의 연도, <title>의 제목과 한국어 문장 그룹을 모읍니다.
+
+    트리는 만들지 않고, 안쪽 태그가 있는 lang="kor" <sent>만 TreeBuilder로 요소를 만들어 sentence_text로 넘깁니다.
+    태그 사이 텍스트(문장 밖)에 빈 줄이 있으면 새 그룹을 시작합니다.
     """
-    try:
-        # XML 파일을 텍스트로 읽어서 줄바꿈 정보 보존
-        with open(xml_file_path, 'r', encoding='utf-8') as f:
-            xml_content = f.read()
-        
-        # XML 파싱
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        
-        # date 태그에서 연도 추출
-        date_element = root.find('.//date')
-        year = None
-        if date_element is not None and date_element.text:
-            year = extract_year_from_date(date_element.text)
-        
-        # XML 파일을 줄별로 분석하여 한국어 문장 그룹 추출
-        lines = xml_content.split('\n')
-        sentence_groups = []
-        current_group = []
-        
-        for line in lines:
-            line = line.strip()
-            # sent 태그에서 lang="kor"인 것만 추출
-            if '<sent' in line and 'lang="kor"' in line:
-                # 태그 내용 추출
-                start_tag = line.find('>')
-                end_tag = line.rfind('</')
-                if start_tag != -1 and end_tag != -1 and start_tag < end_tag:
-                    sentence_text = line[start_tag+1:end_tag].strip()
-                    if sentence_text:
-                        current_group.append(sentence_text)
-            elif line == '' and current_group:
-                # 빈 줄을 만나면 현재 그룹을 저장하고 새 그룹 시작
-                sentence_groups.append(current_group)
-                current_group = []
-        
+
+    def __init__(self):
+        self.year = None
+        self.title = None
+        self.sentence_groups = []
+        self.current_group = []
+        self.between = []       # 직전 태그 이후의 문장 밖 텍스트 조각
+        self.header = None      # 읽는 중인 첫 번째 <date>/<title> 태그 이름
+        self.header_text = []   # 그 안의 텍스트 조각
+        self.headers_found = set()
+        self.depth = 0          # lang="kor" <sent> 안의 깊이
+        self.attrib = None      # 읽는 중인 <sent>의 속성
+        self.pieces = []        # 읽는 중인 <sent>의 텍스트 (안쪽 태그가 나오기 전까지)
+        self.builder = None     # 안쪽 태그가 나온 <sent>의 TreeBuilder
+
+    def _check_blank_line(self):
+        if self.between:
+            if self.current_group and BLANK_LINE.search("".join(self.between)):
+                self.sentence_groups.append(self.current_group)
+                self.current_group = []
+            self.between = []
+
+    def _sentence_builder(self):
+        if self.builder is None:
+            self.builder = ET.TreeBuilder(insert_comments=True)
+            self.builder.start("sent", self.attrib)
+            self.builder.data("".join(self.pieces))
+        return self.builder
+
+    def start(self, tag, attrib):
+        if self.depth:
+            self.depth += 1
+            self._sentence_builder().start(tag, attrib)
+            return
+        self._check_blank_line()
+        if tag == "sent" and attrib.get("lang") == "kor":
+            self.depth = 1
+            self.attrib = attrib
+            self.pieces = []
+        elif tag in ("date", "title") and tag not in self.headers_found:
+            self.header = tag
+            self.header_text = []
+
+    def end(self, tag):
+        if self.depth:
+            self.depth -= 1
+            if self.depth:
+                self.builder.end(tag)
+                return
+            if self.builder is None:
+                text = clean_sentence("".join(self.pieces))
+            else:
+                self.builder.end(tag)
+                text = sentence_text(self.builder.close())
+                self.builder = None
+            if text:
+                self.current_group.append(text)
+            return
+        self._check_blank_line()
+        if self.header is not None:
+            text = "".join(self.header_text)
+            if self.header == "date":
+                self.year = extract_year_from_date(text)
+            else:
+                self.title = text.strip() or None
+            self.headers_found.add(self.header)
+            self.header = None
+
+    def data(self, data):
+        if self.depth:
+            if self.builder is None:
+                self.pieces.append(data)
+            else:
+                self.builder.data(data)
+        elif self.header is not None:
+            self.header_text.append(data)
+        else:
+            self.between.append(data)
+
+    def comment(self, text):
+        if self.depth:
+            self._sentence_builder().comment(text)
+        else:
+            self._check_blank_line()
+
+    def close(self):
         # 마지막 그룹 추가
-        if current_group:
-            sentence_groups.append(current_group)
-        
-        return year, sentence_groups
-    
+        if self.current_group:
+            self.sentence_groups.append(self.current_group)
+            self.current_group = []
+        return self
+
+
+def parse_document(xml_file_path, chunk_size=CHUNK_SIZE):
+    """XML 파일을 한 번 읽은 KoreanSentenceTarget (year, title, sentence_groups). 파싱 오류는 그대로 발생"""
+    parser = ET.XMLParser(target=KoreanSentenceTarget())
+    with open(xml_file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            parser.feed(chunk)
+    return parser.close()
+
+
+def extract_korean_sentences(xml_file_path, chunk_size=CHUNK_SIZE):
+    """
+    XML 파일을 한 번만 읽으면서 <date>의 연도와 한국어 문장들을 문단 그룹별로 추출하는 함수
+
+    - lang="kor"인 <sent> 태그 내용을 문장 하나로 추출
+    - 문장 밖 공백에 빈 줄이 있으면 새 그룹 시작 (한 줄에 문장이 여러 개이거나 한 문장이 여러 줄이어도 같음)
+    - 연도는 문서의 첫 번째 <date> 태그에서 추출
+
+    파싱 오류는 그대로 발생합니다.
+    """
+    document = parse_document(xml_file_path, chunk_size)
+    return document.year, document.sentence_groups
+
+
+def extract_file(xml_file_path):
+    """
+    작업자 프로세스에서 XML 하나를 추출합니다 (오류는 문자열로 돌려줌).
+
+    Returns:
+        tuple: (연도, 문장 그룹 목록, 오류 메시지 또는 None)
+    """
+    try:
+        year, sentence_groups = extract_korean_sentences(xml_file_path)
+        return year, sentence_groups, None
     except Exception as e:
-        print(f"오류 in {xml_file_path}: {e}")
-        return None, []
+        return None, [], str(e)
 
-def format_sentence_groups(sentence_groups):
+
+def format_sentence_groups(sentence_groups, convert=False):
     """
     문장 그룹들을 텍스트 형태로 변환하는 함수
+
+    convert=True면 저장 전에 메모리에서 그룹마다 PUA -> 첫가끝 변환(hNFD)과 <add> 태그 삭제를 차례로 적용
+    (지금 저장소의 Dataset 폴더와 같은 결과. hNFD는 줄이 바뀌어도 자모 묶음이 이어지므로 그룹 전체를 한 번에 변환)
     """
     if not sentence_groups:
         return []
@@ -96,45 +218,96 @@ def format_sentence_groups(sentence_groups):
     formatted_groups = []
     for group in sentence_groups:
         if group:  # 빈 그룹 제외
-            formatted_groups.append('\n'.join(group))
+            text = '\n'.join(group)
+            if convert:
+                text = ADD_TAG.sub('', hnfd(text))
+            formatted_groups.append(text)
     
     return formatted_groups
 
-def save_text_files(text_groups, year, filename_base):
+
+def prepare_file(xml_file_path, convert=True, stats=False, tokens=False):
+    """
+    작업자 프로세스에서 XML 하나를 추출하고 저장할 텍스트까지 만듭니다 (오류는 문자열로 돌려줌).
+    stats=True면 저장할 그룹들의 카탈로그 수치(dataset_tools.catalog.text_stats)도 셈 (tokens=True면 토큰 수까지)
+
+    Returns:
+        tuple: (연도, 제목, 문장 그룹 수, 총 문장 수, 텍스트 그룹 목록, 카탈로그 수치 또는 None, 오류 메시지 또는 None)
+    """
+    try:
+        document = parse_document(xml_file_path)
+    except Exception as e:
+        return None, None, 0, 0, [], None, str(e)
+    sentence_groups = document.sentence_groups
+    total_sentences = sum(len(group) for group in sentence_groups)
+    text_groups = format_sentence_groups(sentence_groups, convert)
+    values = None
+    if stats:
+        values = text_stats([text for text in text_groups if text.strip()], count_tokens=token_counter(tokens))
+    return document.year, document.title, len(sentence_groups), total_sentences, text_groups, values, None
+
+
+def write_text_atomic(path, text):
+    """임시 파일에 쓴 뒤 이름을 바꿔, 중간에 멈춰도 반쯤 쓴 파일이 남지 않게 저장"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def period_of_year(year):
+    """연도 -> 중세국어(900-1591년)/근대국어(1592-1894년), 범위 밖이면 None"""
+    if year and 900 <= year <= 1591:
+        return "중세국어"
+    if year and 1592 <= year <= 1894:
+        return "근대국어"
+    return None
+
+def save_text_files(text_groups, year, filename_base, pack=None, write_txt=True):
     """
     텍스트 그룹들을 개별 텍스트 파일로 저장하는 함수
+    pack(CorpusPackWriter)을 주면 그룹마다 (파일명, part 번호) 항목으로도 저장
     """
     if not text_groups:
         return
     
     # 연도에 따른 폴더 결정
-    if year and 900 <= year <= 1591:
-        folder_path = Path("Dataset/중세국어")
-    elif year and 1592 <= year <= 1894:
-        folder_path = Path("Dataset/근대국어")
-    else:
+    period = period_of_year(year)
+    if period is None:
         print(f"연도 {year}는 처리 범위를 벗어남: {filename_base}")
         return
+    folder_path = Path("Dataset") / period
     
     # 폴더 생성
-    folder_path.mkdir(parents=True, exist_ok=True)
+    if write_txt:
+        folder_path.mkdir(parents=True, exist_ok=True)
     
     # 각 텍스트 그룹을 개별 파일로 저장
     for i, text_group in enumerate(text_groups, 1):
         if text_group.strip():  # 빈 그룹 제외
+            if pack is not None:
+                pack.add(filename_base, i, text_group, period=period, year=year)
+            if not write_txt:
+                continue
             txt_filename = f"{filename_base}_part{i:03d}.txt"
             txt_path = folder_path / txt_filename
             
             try:
-                with open(txt_path, 'w', encoding='utf-8') as f:
-                    f.write(text_group)
+                write_text_atomic(txt_path, text_group)
                 print(f"저장됨: {txt_path}")
             except Exception as e:
                 print(f"파일 저장 오류 {txt_path}: {e}")
 
-def process_all_xml_files():
+def process_all_xml_files(jobs=None, convert=True, pack_path=None, write_txt=True, catalog_path=None, tokens=False):
     """
-    모든 XML 파일을 처리하는 메인 함수
+    모든 XML 파일을 처리하는 메인 함수 (추출/변환은 프로세스 jobs개가 나눠 하고, 저장과 출력은 여기서 파일 순서대로)
+    convert=False면 예전처럼 변환 전 텍스트를 저장 (텍스트 변환.py, 태그 삭제.py를 따로 실행할 때)
+    pack_path를 주면 문장 그룹을 말뭉치 팩(dataset_tools.corpus_pack)에도 저장, write_txt=False면 팩에만
+    catalog_path를 주면 문서마다 제목/연도/시기/글자·자모(tokens=True면 토큰) 수/해시를 카탈로그(dataset_tools.catalog)에 기록
     """
     xml_folder = Path("NIKL_Korean History Corpus_v1.0")
     
@@ -142,46 +315,72 @@ def process_all_xml_files():
         print(f"폴더를 찾을 수 없습니다: {xml_folder}")
         return
     
-    xml_files = list(xml_folder.glob("*.xml"))
+    xml_files = sorted(xml_folder.glob("*.xml"))
     print(f"총 {len(xml_files)}개의 XML 파일을 처리합니다.")
     
     processed_count = 0
     medieval_count = 0
     modern_count = 0
     
-    for xml_file in xml_files:
-        print(f"\n처리 중: {xml_file.name}")
-        
-        year, sentence_groups = extract_korean_sentences_by_lines(xml_file)
-        
-        if not sentence_groups:
-            print(f"한국어 문장이 없음: {xml_file.name}")
-            continue
-        
-        if year is None:
-            print(f"연도를 추출할 수 없음: {xml_file.name}")
-            continue
-        
-        total_sentences = sum(len(group) for group in sentence_groups)
-        print(f"추출된 연도: {year}, 한국어 문장 그룹 수: {len(sentence_groups)}, 총 문장 수: {total_sentences}")
-        
-        # 문장 그룹들을 텍스트 형태로 변환
-        text_groups = format_sentence_groups(sentence_groups)
-        
-        if text_groups:
-            filename_base = xml_file.stem
-            save_text_files(text_groups, year, filename_base)
-            processed_count += 1
+    with contextlib.ExitStack() as stack:
+        pack = stack.enter_context(CorpusPackWriter(pack_path)) if pack_path else None
+        catalog = stack.enter_context(Catalog(catalog_path)) if catalog_path else None
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+        prepare = functools.partial(prepare_file, convert=convert, stats=catalog is not None, tokens=tokens)
+        results = executor.map(prepare, xml_files, chunksize=8)
+        for xml_file, (year, title, group_count, total_sentences, text_groups, stats, error) in zip(xml_files, results):
+            print(f"\n처리 중: {xml_file.name}")
             
-            if 900 <= year <= 1591:
-                medieval_count += 1
-            elif 1592 <= year <= 1894:
-                modern_count += 1
+            if error is not None:
+                print(f"오류 in {xml_file}: {error}")
+                continue
+            
+            if catalog is not None:
+                catalog.put({"collection": "NIKL", "source": xml_file.stem, "path": xml_file.as_posix(), "title": title,
+                             "years": [year] if year else [], "year": year, "period": period_of_year(year), **stats})
+            
+            if not group_count:
+                print(f"한국어 문장이 없음: {xml_file.name}")
+                continue
+            
+            if year is None:
+                print(f"연도를 추출할 수 없음: {xml_file.name}")
+                continue
+            
+            print(f"추출된 연도: {year}, 한국어 문장 그룹 수: {group_count}, 총 문장 수: {total_sentences}")
+            
+            if text_groups:
+                filename_base = xml_file.stem
+                save_text_files(text_groups, year, filename_base, pack, write_txt)
+                processed_count += 1
+                
+                if 900 <= year <= 1591:
+                    medieval_count += 1
+                elif 1592 <= year <= 1894:
+                    modern_count += 1
     
     print(f"\n=== 처리 완료 ===")
     print(f"총 처리된 파일: {processed_count}")
     print(f"중세국어 파일: {medieval_count}")
     print(f"근대국어 파일: {modern_count}")
 
+def main():
+    parser = argparse.ArgumentParser(description="NIKL 역사 말뭉치 XML에서 연도별 한국어 문장 그룹 텍스트 추출 "
+                                                 "(PUA -> 첫가끝 변환과 <add> 태그 삭제까지 한 번에)")
+    parser.add_argument("--jobs", type=int, default=None, help="추출에 쓸 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--no-convert", action="store_true",
+                        help="변환/태그 삭제 없이 추출만 (텍스트 변환.py, 태그 삭제.py를 따로 실행할 때)")
+    parser.add_argument("--pack", default=None,
+                        help="문장 그룹을 말뭉치 팩 폴더(texts.bin + index.jsonl)에도 저장 (dataset_tools.corpus_pack)")
+    parser.add_argument("--no-txt", action="store_true", help="_partNNN.txt 파일은 쓰지 않고 --pack에만 저장")
+    parser.add_argument("--catalog", default=None,
+                        help="문서별 제목/연도/시기/글자·자모 수/해시를 기록할 카탈로그 SQLite 파일 (dataset_tools.catalog)")
+    parser.add_argument("--tokens", action="store_true", help="--catalog: tiktoken 토큰 수도 셈")
+    args = parser.parse_args()
+    if args.no_txt and not args.pack:
+        parser.error("--no-txt에는 --pack이 필요합니다")
+    process_all_xml_files(args.jobs, convert=not args.no_convert, pack_path=args.pack, write_txt=not args.no_txt,
+                          catalog_path=args.catalog, tokens=args.tokens)
+
 if __name__ == "__main__":
-    process_all_xml_files() 
\ No newline at end of file
+    main()